@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from auth.models import UserRegistration, UserConfirmation, Token
-from auth.utils import create_access_token, cognito_client
+from auth.utils import create_access_token
+from core.adapters import AsyncClientAdapter
 from fastapi.security import OAuth2PasswordRequestForm
 from botocore.exceptions import ClientError
 from typing import Dict, Any
@@ -21,9 +22,25 @@ def get_client_index(request: Request) -> Any:
     return request.app.state.CLIENT_ID
 
 
+def get_cognito_client(request: Request) -> AsyncClientAdapter:
+    """
+    Dependency to get the async Cognito client adapter from the app state.
+
+    Args:
+        request (Request): The FastAPI request object.
+
+    Returns:
+        AsyncClientAdapter: The async adapter around the Cognito client.
+    """
+    cognito_client: AsyncClientAdapter = request.app.state.cognito_client
+    return cognito_client
+
+
 @auth_router.post("/register/")
 async def register_user(
-    user: UserRegistration, client_id: str = Depends(get_client_index)
+    user: UserRegistration,
+    client_id: str = Depends(get_client_index),
+    cognito_client: AsyncClientAdapter = Depends(get_cognito_client),
 ) -> Dict[str, str]:
     """
     Register a new user.
@@ -31,6 +48,7 @@ async def register_user(
     Args:
         user (UserRegistration): The user registration data.
         client_id (str): The client ID for AWS Cognito.
+        cognito_client (AsyncClientAdapter): The async Cognito client adapter.
 
     Returns:
         dict: A message indicating successful registration and the user ID.
@@ -39,7 +57,7 @@ async def register_user(
         HTTPException: If there is an error with the Cognito client.
     """
     try:
-        response = cognito_client.sign_up(
+        response = await cognito_client.sign_up(
             ClientId=client_id,
             Username=user.name,
             Password=user.password,
@@ -58,15 +76,23 @@ async def register_user(
 
 @auth_router.post("/login", response_model=Token)
 async def login(
+    request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
     client_id: str = Depends(get_client_index),
+    cognito_client: AsyncClientAdapter = Depends(get_cognito_client),
 ) -> Dict[str, str]:
     """
     Authenticate a user and return an access token.
 
+    When the user pool's signing keys are configured, the Cognito access
+    token is returned and verified locally on later requests. Otherwise an
+    HS256 token signed with the application's secret key is issued.
+
     Args:
+        request (Request): The FastAPI request object.
         form_data (OAuth2PasswordRequestForm): The login form data.
         client_id (str): The client ID for AWS Cognito.
+        cognito_client (AsyncClientAdapter): The async Cognito client adapter.
 
     Returns:
         Token: The JWT access token.
@@ -75,8 +101,9 @@ async def login(
         HTTPException: If there is an error with the
         Cognito client or authentication fails.
     """
+    verifier = request.app.state.token_verifier
     try:
-        response = cognito_client.initiate_auth(
+        response = await cognito_client.initiate_auth(
             ClientId=client_id,
             AuthFlow="USER_PASSWORD_AUTH",
             AuthParameters={
@@ -84,10 +111,18 @@ async def login(
                 "PASSWORD": form_data.password,
             },
         )
-        print(f"{response}")
-        # access_token = response["AuthenticationResult"]["AccessToken"]
+        if verifier.jwks is not None:
+            result = response.get("AuthenticationResult") or {}
+            if "AccessToken" not in result:
+                raise HTTPException(
+                    status_code=401,
+                    detail="Login requires the "
+                    f"{response.get('ChallengeName', 'unknown')} challenge",
+                )
+            return {"access_token": result["AccessToken"], "token_type": "bearer"}
+
         token_data = {"sub": form_data.username}
-        jwt_token = create_access_token(token_data)
+        jwt_token = create_access_token(token_data, secret_key=verifier.secret_key)
         return {"access_token": jwt_token, "token_type": "bearer"}
     except ClientError as e:
         raise HTTPException(
@@ -97,7 +132,9 @@ async def login(
 
 @auth_router.post("/confirm/")
 async def confirm_user(
-    user: UserConfirmation, client_id: str = Depends(get_client_index)
+    user: UserConfirmation,
+    client_id: str = Depends(get_client_index),
+    cognito_client: AsyncClientAdapter = Depends(get_cognito_client),
 ) -> Dict[str, str]:
     """
     Confirm a user's registration with a confirmation code.
@@ -105,6 +142,7 @@ async def confirm_user(
     Args:
         user (UserConfirmation): The user confirmation data.
         client_id (str): The client ID for AWS Cognito.
+        cognito_client (AsyncClientAdapter): The async Cognito client adapter.
 
     Returns:
         dict: A message indicating successful confirmation.
@@ -113,7 +151,7 @@ async def confirm_user(
         HTTPException: If there is an error with the Cognito client.
     """
     try:
-        response = cognito_client.confirm_sign_up(
+        response = await cognito_client.confirm_sign_up(
             ClientId=client_id,
             Username=user.email,
             ConfirmationCode=user.confirmation_code,
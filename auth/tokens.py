@@ -0,0 +1,183 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import httpx
+from jose import JWTError, jwk, jwt
+from core.metrics import metrics
+
+# A token for an unknown key ID triggers a refresh at most this often
+MIN_REFRESH_INTERVAL = 60.0
+
+
+class JWKSCache:
+    """
+    The signing keys of a Cognito user pool, fetched once and kept current.
+
+    Keys are parsed into verification keys when fetched, so verifying a
+    token never parses a JWK. ``refresh_periodically`` picks up rotated keys
+    in the background; a token signed with an unknown key ID also triggers a
+    refresh, at most once per ``MIN_REFRESH_INTERVAL`` seconds.
+
+    Attributes:
+        url (str): The JWKS URL of the user pool.
+        refresh_interval (float): The seconds between background refreshes.
+    """
+
+    def __init__(self, url: str, refresh_interval: float) -> None:
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self._keys: Dict[str, Any] = {}
+        self._refreshed_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self) -> None:
+        """
+        Fetch the key set and replace the cached keys.
+
+        Raises:
+            httpx.HTTPError: If the key set cannot be fetched.
+        """
+        async with httpx.AsyncClient(timeout=10) as client:
+            response = await client.get(self.url)
+            response.raise_for_status()
+        keys = {
+            key["kid"]: jwk.construct(key, key.get("alg", "RS256"))
+            for key in response.json()["keys"]
+        }
+        self._keys = keys
+        self._refreshed_at = time.monotonic()
+
+    async def get_key(self, kid: str) -> Optional[Any]:
+        """
+        Return the verification key with the given key ID.
+
+        Args:
+            kid (str): The key ID from the token header.
+
+        Returns:
+            The verification key, or None if the user pool has no such key.
+        """
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        async with self._lock:
+            if kid not in self._keys and (
+                time.monotonic() - self._refreshed_at >= MIN_REFRESH_INTERVAL
+            ):
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    self._refreshed_at = time.monotonic()
+                    print(f"Failed to refresh JWKS: {e}")
+        return self._keys.get(kid)
+
+    async def refresh_periodically(self) -> None:
+        """
+        Refresh the key set every ``refresh_interval`` seconds until cancelled.
+        """
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Failed to refresh JWKS: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+class TokenVerifier:
+    """
+    Verifies bearer tokens and remembers the ones already verified.
+
+    Tokens signed by the Cognito user pool (RS256) are verified locally
+    against its cached JWKS: signature, expiry, issuer, ``token_use`` and
+    client ID. Without a user pool, tokens issued by this application (HS256)
+    are verified with the secret key instead; HS256 tokens are rejected
+    whenever a user pool is configured. A verified token is cached with its
+    user until its ``exp``, so repeated requests with the same token skip
+    decoding and signature checks. The cache holds at most ``cache_size``
+    tokens and evicts the least recently used.
+
+    Attributes:
+        jwks (Optional[JWKSCache]): The user pool's keys, or None when
+            Cognito is not configured.
+        issuer (Optional[str]): The user pool's issuer URL.
+        client_id (Optional[str]): The app client ID tokens must be issued to.
+        secret_key (Optional[str]): The HS256 secret of tokens issued by this
+            application, or None when only Cognito tokens are accepted.
+        cache_size (int): The maximum number of cached tokens; 0 disables it.
+    """
+
+    def __init__(
+        self,
+        jwks: Optional[JWKSCache],
+        issuer: Optional[str],
+        client_id: Optional[str],
+        secret_key: Optional[str],
+        cache_size: int,
+    ) -> None:
+        self.jwks = jwks
+        self.issuer = issuer
+        self.client_id = client_id
+        self.secret_key = secret_key
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    async def _decode(self, token: str) -> Tuple[str, float]:
+        header = jwt.get_unverified_header(token)
+        if header.get("alg") == "HS256":
+            if self.jwks is not None or not self.secret_key:
+                raise JWTError("HS256 tokens are not accepted")
+            claims = jwt.decode(token, self.secret_key, algorithms=["HS256"])
+            username = claims.get("sub")
+        else:
+            kid = header.get("kid")
+            key = None if self.jwks is None or not kid else await self.jwks.get_key(kid)
+            if key is None:
+                raise JWTError("Unknown signing key")
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=["RS256"],
+                issuer=self.issuer,
+                options={"verify_aud": False},
+            )
+            if claims.get("token_use") != "access":
+                raise JWTError("Not an access token")
+            if self.client_id and claims.get("client_id") != self.client_id:
+                raise JWTError("Token issued to another client")
+            username = claims.get("username")
+        if not isinstance(username, str) or "exp" not in claims:
+            raise JWTError("Missing claims")
+        return username, float(claims["exp"])
+
+    async def verify(self, token: str) -> str:
+        """
+        Verify a bearer token and return its user.
+
+        Args:
+            token (str): The encoded token.
+
+        Returns:
+            str: The username the token was issued to; for Cognito tokens,
+            the ``username`` claim, which is the user name even when the
+            user signed in with an email address or other alias.
+
+        Raises:
+            JWTError: If the token is malformed, expired, or fails
+            verification.
+        """
+        cached = self._cache.get(token)
+        if cached is not None:
+            if cached[1] > time.time():
+                self._cache.move_to_end(token)
+                metrics.record_lookups("token", "hit")
+                return cached[0]
+            del self._cache[token]
+
+        metrics.record_lookups("token", "miss")
+        username, expires = await self._decode(token)
+        if self.cache_size > 0:
+            self._cache[token] = (username, expires)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return username
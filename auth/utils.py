@@ -1,14 +1,13 @@
-import boto3
 from jose import JWTError, jwt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from typing import Dict, Any
+from core.metrics import metrics
 
-# Initialize OAuth2PasswordBearer and Cognito client
+# Initialize OAuth2PasswordBearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-cognito_client = boto3.client("cognito-idp", region_name="us-east-1")
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
@@ -40,13 +39,16 @@ def get_password_hash(password: str) -> Any:
 
 
 def create_access_token(
-    data: Dict[str, Any], expires_delta: timedelta = timedelta(minutes=15)
+    data: Dict[str, Any],
+    secret_key: str,
+    expires_delta: timedelta = timedelta(minutes=15),
 ) -> Any:
     """
     Create an access token with an expiration time.
 
     Args:
         data (dict): The data to encode in the token.
+        secret_key (str): The HS256 signing secret.
         expires_delta (timedelta): The token expiration time (default is 15 minutes).
 
     Returns:
@@ -55,15 +57,23 @@ def create_access_token(
     encode_data = data.copy()
     expire = datetime.utcnow() + expires_delta
     encode_data.update({"exp": expire})
-    encoded_jwt = jwt.encode(encode_data, "your-secret-key", algorithm="HS256")
+    encoded_jwt = jwt.encode(encode_data, secret_key, algorithm="HS256")
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
+async def get_current_user(
+    request: Request, token: str = Depends(oauth2_scheme)
+) -> str:
     """
     Extract and validate the current user from the provided token.
 
+    Cognito access tokens are verified locally against the user pool's
+    cached signing keys, and tokens issued by this application against the
+    secret key. Tokens verified before are answered from the token cache
+    until they expire.
+
     Args:
+        request (Request): The FastAPI request object.
         token (str): The JWT token from the Authorization header.
 
     Returns:
@@ -74,14 +84,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> str:
         credentials could not be validated.
     """
     try:
-        payload = jwt.decode(token, "your-secret-key", algorithms=["HS256"])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        with metrics.stage("auth"):
+            username: str = await request.app.state.token_verifier.verify(token)
         return username
     except JWTError:
         raise HTTPException(
@@ -0,0 +1,442 @@
+import asyncio
+import contextlib
+import random
+import threading
+import time
+import types
+import uuid
+import numpy as np
+import fakeredis
+import fakeredis.aioredis
+import redis.asyncio as redis
+from botocore.exceptions import ClientError
+from fakeredis._clients._async import FakeAsyncRedisConnection
+from numpy.typing import NDArray
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+from unittest import mock
+from embedding.local import hash_embed
+
+
+class Faults:
+    """
+    Latency and error injection for one fake backend.
+
+    Attributes:
+        name (str): The backend name, used in injected error messages.
+        latency (float): The mean latency of a call, in seconds.
+        jitter (float): The maximum random latency added or removed, as a
+            fraction of ``latency``.
+        error_rate (float): The probability that a call fails.
+        calls (int): Calls made so far.
+        errors (int): Errors injected so far.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: float = 0.0,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+
+    def _next(self) -> float:
+        self.calls += 1
+        if self._random.random() < self.error_rate:
+            self.errors += 1
+            raise FakeServiceError(self.name)
+        spread = self.latency * self.jitter
+        return max(0.0, self.latency + self._random.uniform(-spread, spread))
+
+    def block(self) -> None:
+        """
+        Sleep for one call's latency, or raise an injected error.
+
+        Raises:
+            FakeServiceError: When the call is chosen to fail.
+        """
+        delay = self._next()
+        if delay:
+            time.sleep(delay)
+
+    async def wait(self) -> None:
+        """
+        Await one call's latency, or raise an injected error.
+
+        Raises:
+            FakeServiceError: When the call is chosen to fail.
+        """
+        delay = self._next()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the call and error counters.
+
+        Returns:
+            dict: The backend's calls and injected errors.
+        """
+        return {"calls": self.calls, "errors": self.errors}
+
+
+class FakeServiceError(Exception):
+    """
+    A transient error injected by a fake backend.
+
+    It carries status 503, so the embedding scheduler retries it like a
+    real server error.
+
+    Attributes:
+        status_code (int): The HTTP status of the simulated failure.
+    """
+
+    status_code = 503
+
+    def __init__(self, name: str) -> None:
+        super().__init__(f"Injected {name} failure")
+
+
+class FakeEmbeddings:
+    """
+    Stand-in for ``AsyncOpenAI().embeddings``.
+
+    Embeddings are feature-hashed from the input text, so similar texts get
+    similar vectors and search results are meaningful.
+    """
+
+    def __init__(self, faults: Faults) -> None:
+        self.faults = faults
+
+    async def create(
+        self, input: Any, model: str, dimensions: Optional[int] = None
+    ) -> Any:
+        await self.faults.wait()
+        texts = [input] if isinstance(input, str) else list(input)
+        vectors = hash_embed(texts, dimensions or 1536)
+        return types.SimpleNamespace(
+            data=[
+                types.SimpleNamespace(index=i, embedding=vector)
+                for i, vector in enumerate(vectors)
+            ]
+        )
+
+
+class FakeAsyncOpenAI:
+    """
+    Stand-in for ``openai.AsyncOpenAI`` with only the embeddings API.
+    """
+
+    faults = Faults("openai")
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.embeddings = FakeEmbeddings(self.faults)
+
+
+class FakeIndex:
+    """
+    Stand-in for a Pinecone ``Index``: exact dot-product search in memory.
+
+    Calls block for the injected latency, like the real client, so they
+    exercise the async adapter's thread pool.
+    """
+
+    def __init__(self, faults: Faults) -> None:
+        self.faults = faults
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, Dict[str, Any]] = {}
+
+    def upsert(self, vectors: List[Any], namespace: str = "") -> Dict[str, int]:
+        self.faults.block()
+        with self._lock:
+            records = self._namespaces.setdefault(namespace, {})
+            for vector_id, values, metadata in vectors:
+                records[vector_id] = (np.asarray(values, dtype=np.float32), metadata)
+        return {"upserted_count": len(vectors)}
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> Dict[str, Any]:
+        self.faults.block()
+        with self._lock:
+            records = [
+                (vector_id, values, metadata)
+                for vector_id, (values, metadata) in self._namespaces.get(
+                    namespace, {}
+                ).items()
+                if all(
+                    metadata.get(field) == condition.get("$eq")
+                    for field, condition in (filter or {}).items()
+                )
+            ]
+        if not records:
+            return {"matches": []}
+        matrix: NDArray[np.float32] = np.stack([values for _, values, _ in records])
+        scores = matrix @ np.asarray(vector, dtype=np.float32)
+        best = np.argsort(-scores)[:top_k]
+        return {
+            "matches": [
+                {
+                    "id": records[i][0],
+                    "score": float(scores[i]),
+                    "metadata": records[i][2] if include_metadata else None,
+                }
+                for i in best
+            ]
+        }
+
+    def delete(self, ids: List[str], namespace: str = "") -> Dict[str, Any]:
+        self.faults.block()
+        with self._lock:
+            records = self._namespaces.get(namespace, {})
+            for vector_id in ids:
+                records.pop(vector_id, None)
+        return {}
+
+
+class FakePinecone:
+    """
+    Stand-in for the ``pinecone.Pinecone`` client.
+    """
+
+    faults = Faults("pinecone")
+    indexes: Dict[str, FakeIndex] = {}
+
+    def __init__(self, **kwargs: Any) -> None:
+        pass
+
+    def list_indexes(self) -> Any:
+        names = list(self.indexes)
+        return types.SimpleNamespace(names=lambda: names)
+
+    def create_index(self, name: str, **kwargs: Any) -> None:
+        self.indexes[name] = FakeIndex(self.faults)
+
+    def Index(self, name: str) -> FakeIndex:
+        return self.indexes[name]
+
+
+class FakeCognito:
+    """
+    Stand-in for the boto3 ``cognito-idp`` client.
+
+    Users are confirmed on sign-up, and authentication returns an opaque
+    access token, so login falls back to the application's own token unless
+    a user pool is configured.
+    """
+
+    faults = Faults("cognito")
+
+    def __init__(self) -> None:
+        self.users: Dict[str, str] = {}
+
+    def _error(self, code: str, operation: str) -> ClientError:
+        return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+    def sign_up(
+        self, ClientId: str, Username: str, Password: str, **kwargs: Any
+    ) -> Dict[str, Any]:
+        self.faults.block()
+        self.users[Username] = Password
+        return {"UserSub": uuid.uuid4().hex}
+
+    def confirm_sign_up(self, **kwargs: Any) -> Dict[str, Any]:
+        self.faults.block()
+        return {}
+
+    def initiate_auth(self, AuthParameters: Dict[str, str], **kwargs: Any) -> Any:
+        self.faults.block()
+        username = AuthParameters["USERNAME"]
+        if self.users.get(username) != AuthParameters["PASSWORD"]:
+            raise self._error("NotAuthorizedException", "InitiateAuth")
+        return {"AuthenticationResult": {"AccessToken": uuid.uuid4().hex}}
+
+
+class FakeS3:
+    """
+    Stand-in for an aioboto3 S3 client, keeping objects in memory.
+    """
+
+    faults = Faults("s3")
+    objects: Dict[str, bytes] = {}
+    exceptions = types.SimpleNamespace(ClientError=ClientError)
+
+    def __init__(self) -> None:
+        self._uploads: Dict[str, Dict[int, bytes]] = {}
+
+    async def head_object(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        await self.faults.wait()
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {"ContentLength": len(self.objects[Key])}
+
+    async def put_object(self, Bucket: str, Key: str, Body: bytes) -> Dict[str, Any]:
+        await self.faults.wait()
+        self.objects[Key] = Body
+        return {}
+
+    async def create_multipart_upload(self, Bucket: str, Key: str) -> Dict[str, Any]:
+        await self.faults.wait()
+        upload_id = uuid.uuid4().hex
+        self._uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    async def upload_part(
+        self, UploadId: str, PartNumber: int, Body: bytes, **kwargs: Any
+    ) -> Dict[str, Any]:
+        await self.faults.wait()
+        self._uploads[UploadId][PartNumber] = Body
+        return {"ETag": str(PartNumber)}
+
+    async def complete_multipart_upload(
+        self, Key: str, UploadId: str, MultipartUpload: Dict[str, Any], **kwargs: Any
+    ) -> Dict[str, Any]:
+        await self.faults.wait()
+        parts = self._uploads.pop(UploadId)
+        self.objects[Key] = b"".join(
+            parts[part["PartNumber"]] for part in MultipartUpload["Parts"]
+        )
+        return {}
+
+    async def abort_multipart_upload(self, UploadId: str, **kwargs: Any) -> None:
+        self._uploads.pop(UploadId, None)
+
+    async def generate_presigned_url(
+        self, operation: str, Params: Dict[str, str], ExpiresIn: int
+    ) -> str:
+        url = f"https://{Params['Bucket']}.s3.local/{Params['Key']}"
+        return f"{url}?expires={ExpiresIn}"
+
+    def get_paginator(self, operation: str) -> Any:
+        async def paginate(Bucket: str, Prefix: str = "") -> AsyncIterator[Any]:
+            await self.faults.wait()
+            keys = sorted(key for key in self.objects if key.startswith(Prefix))
+            for start in range(0, len(keys), 1000):
+                yield {"Contents": [{"Key": key} for key in keys[start:start + 1000]]}
+
+        return types.SimpleNamespace(paginate=paginate)
+
+
+class FakeSession:
+    """
+    Stand-in for ``aioboto3.Session``, handing out the fake S3 client.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        pass
+
+    @contextlib.asynccontextmanager
+    async def client(self, service: str, **kwargs: Any) -> AsyncIterator[FakeS3]:
+        yield FakeS3()
+
+
+class FaultyConnection(FakeAsyncRedisConnection):
+    """
+    In-memory Redis connection adding latency and errors to every round trip.
+
+    A pipeline is sent as one packed command, so it pays the latency once,
+    like a real network round trip.
+    """
+
+    faults = Faults("redis")
+
+    async def send_packed_command(self, *args: Any, **kwargs: Any) -> None:
+        try:
+            await self.faults.wait()
+        except FakeServiceError as e:
+            raise redis.ConnectionError(str(e))
+        await super().send_packed_command(*args, **kwargs)
+
+
+class FakeRedisModule:
+    """
+    Stand-in for the ``redis.asyncio`` module whose clients share one
+    in-memory server.
+
+    Only ``Redis`` is replaced; every other name, such as the exception
+    classes, resolves to the real module.
+
+    Attributes:
+        server (fakeredis.FakeServer): The server all clients connect to.
+    """
+
+    def __init__(self, server: fakeredis.FakeServer) -> None:
+        self.server = server
+
+    def Redis(self, **kwargs: Any) -> fakeredis.aioredis.FakeRedis:
+        return fakeredis.aioredis.FakeRedis(
+            server=self.server,
+            decode_responses=kwargs.get("decode_responses", False),
+            connection_class=FaultyConnection,
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(redis, name)
+
+
+def configure_faults(
+    latencies: Dict[str, float], error_rates: Dict[str, float], seed: int
+) -> Dict[str, Faults]:
+    """
+    Set the latency and error rate of each fake backend.
+
+    Args:
+        latencies (dict): The mean latency, in seconds, per backend name.
+        error_rates (dict): The error probability per backend name.
+        seed (int): Seeds the random latencies and errors.
+
+    Returns:
+        dict: The faults of each backend, by name.
+    """
+    faults = {
+        "openai": FakeAsyncOpenAI.faults,
+        "pinecone": FakePinecone.faults,
+        "cognito": FakeCognito.faults,
+        "s3": FakeS3.faults,
+        "redis": FaultyConnection.faults,
+    }
+    for i, (name, fault) in enumerate(faults.items()):
+        fault.latency = latencies.get(name, 0.0)
+        fault.error_rate = error_rates.get(name, 0.0)
+        fault.calls = fault.errors = 0
+        fault._random.seed(seed + i)
+    return faults
+
+
+@contextlib.contextmanager
+def install_fakes() -> Iterator[None]:
+    """
+    Route every external client created by ``core.config`` to a fake.
+
+    While active, ``setup_pinecone``, ``setup_cognito``, ``setup_aclient``,
+    ``setup_redis_client``, ``setup_s3_client`` and ``init_cache`` build the
+    application exactly as in production, but against in-memory backends.
+    """
+    FakePinecone.indexes = {}
+    FakeS3.objects = {}
+    redis_module = FakeRedisModule(fakeredis.FakeServer())
+    cognito = FakeCognito()
+    patches: Sequence[Any] = (
+        mock.patch("core.config.Pinecone", FakePinecone),
+        mock.patch("core.config.AsyncOpenAI", FakeAsyncOpenAI),
+        mock.patch("core.config.boto3.client", lambda *a, **k: cognito),
+        mock.patch("core.config.aioboto3.Session", FakeSession),
+        mock.patch("core.config.redis", redis_module),
+        mock.patch("aiocache.backends.redis.redis", redis_module),
+    )
+    with contextlib.ExitStack() as stack:
+        for patch in patches:
+            stack.enter_context(patch)
+        yield
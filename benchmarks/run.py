@@ -0,0 +1,592 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import httpx
+import numpy as np
+from pydantic import BaseModel
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from benchmarks.fakes import configure_faults, install_fakes
+
+SCENARIOS = ("ingest", "query", "batch", "upload")
+
+# Mean latency, in seconds, of each fake backend unless overridden
+DEFAULT_LATENCIES = {
+    "openai": 0.08,
+    "pinecone": 0.03,
+    "cognito": 0.05,
+    "s3": 0.02,
+    "redis": 0.0005,
+}
+
+# Settings that point the application at the fakes; other settings are read
+# from the environment as usual
+BENCHMARK_ENV = {
+    "VECTOR_STORE": "pinecone",
+    "EMBEDDING_PROVIDER": "openai",
+    "USER_POOL_ID": "",
+    "COGNITO_USER_POOL_ID": "",
+    "CLIENT_ID": "benchmark",
+    "SECRET_KEY": "benchmark",
+}
+
+# Defaults that keep the application's own limits out of the way
+BENCHMARK_ENV_DEFAULTS = {
+    "EMBEDDING_RPM": "1000000",
+    "EMBEDDING_TPM": "1000000000",
+}
+
+WORDS = (
+    "invoice total amount due date payment terms customer account number "
+    "balance tax shipping address order quantity price description item "
+    "contract agreement party signature effective term renewal notice clause "
+    "policy coverage premium claim deductible insured beneficiary period "
+    "report summary revenue expense profit quarter fiscal year growth margin"
+).split()
+
+
+class Result(BaseModel):
+    """
+    The measurements of one scenario at one concurrency level.
+
+    Attributes:
+        scenario (str): The scenario name.
+        concurrency (int): The number of concurrent clients.
+        requests (int): The number of requests sent.
+        errors (int): Requests that failed or returned an error status.
+        units (str): What the throughput counts, e.g. "pages" or "queries".
+        throughput (float): Units completed per second.
+        p50_ms (float): The median request latency, in milliseconds.
+        p95_ms (float): The 95th percentile request latency, in milliseconds.
+        p99_ms (float): The 99th percentile request latency, in milliseconds.
+        peak_rss_mb (float): The peak resident memory during the run, in MiB.
+        backends (dict): Calls and injected errors per fake backend.
+    """
+
+    scenario: str
+    concurrency: int
+    requests: int
+    errors: int
+    units: str
+    throughput: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    peak_rss_mb: float
+    backends: Dict[str, Dict[str, Any]] = {}
+
+
+class RSSSampler:
+    """
+    Samples the resident memory of the process while a scenario runs.
+
+    Memory is read from ``/proc/self/statm`` every ``interval`` seconds.
+    Where it is unavailable, the process-wide peak from ``getrusage`` is
+    reported instead.
+
+    Attributes:
+        interval (float): The seconds between samples.
+        peak (int): The largest resident size seen, in bytes.
+    """
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def sample(self) -> int:
+        try:
+            with open("/proc/self/statm") as f:
+                rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError):
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            scale = 1 if sys.platform == "darwin" else 1024
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+        self.peak = max(self.peak, rss)
+        return rss
+
+    async def _run(self) -> None:
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        self.peak = 0
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> int:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self.sample()
+        return self.peak
+
+
+def make_ocr_document(rng: random.Random, pages: int, words: int) -> bytes:
+    """
+    Build an OCR analyze result shaped like the ones the API ingests.
+
+    Each word has a bounding polygon, confidence and span, so the payload
+    size and parsing work match real OCR output, not just its text.
+
+    Args:
+        rng (random.Random): The source of the page text.
+        pages (int): The number of pages.
+        words (int): The number of words per page.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    result_pages = []
+    for page_number in range(1, pages + 1):
+        offset = 0
+        page_words = []
+        for i, content in enumerate(rng.choices(WORDS, weights, k=words)):
+            x, y = 0.5 + (i % 12) * 0.6, 0.5 + (i // 12) * 0.2
+            page_words.append(
+                {
+                    "content": content,
+                    "polygon": [x, y, x + 0.5, y, x + 0.5, y + 0.15, x, y + 0.15],
+                    "confidence": round(rng.uniform(0.9, 1.0), 3),
+                    "span": {"offset": offset, "length": len(content)},
+                }
+            )
+            offset += len(content) + 1
+        result_pages.append(
+            {
+                "pageNumber": page_number,
+                "width": 8.5,
+                "height": 11,
+                "unit": "inch",
+                "words": page_words,
+            }
+        )
+    return json.dumps({"analyzeResult": {"pages": result_pages}}).encode()
+
+
+def make_mix(rng: random.Random, pool: Sequence[Any], count: int) -> List[Any]:
+    """
+    Draw items from a pool with Zipf-like popularity.
+
+    A few items are drawn often and most rarely, like the repeated queries
+    and re-uploaded files of real traffic.
+
+    Args:
+        rng (random.Random): The source of randomness.
+        pool (Sequence): The distinct items.
+        count (int): The number of items to draw.
+
+    Returns:
+        list: The drawn items.
+    """
+    weights = [1 / (rank + 1) for rank in range(len(pool))]
+    return rng.choices(list(pool), weights, k=count)
+
+
+def make_queries(rng: random.Random, distinct: int) -> List[str]:
+    """
+    Build distinct query texts of two to four words.
+
+    Args:
+        rng (random.Random): The source of randomness.
+        distinct (int): The number of queries.
+
+    Returns:
+        list: The query texts.
+    """
+    queries: Dict[str, None] = {}
+    while len(queries) < distinct:
+        queries[" ".join(rng.sample(WORDS, rng.randint(2, 4)))] = None
+    return list(queries)
+
+
+async def run_load(
+    concurrency: int,
+    requests: int,
+    send: Callable[[int], Awaitable[httpx.Response]],
+) -> Tuple[List[float], int]:
+    """
+    Send requests from concurrent clients and time each of them.
+
+    Args:
+        concurrency (int): The number of clients sending at once.
+        requests (int): The total number of requests.
+        send (Callable): Sends the request with the given sequence number.
+
+    Returns:
+        tuple: The latency of each request in seconds, and the number of
+        requests that raised or returned an error status.
+    """
+    numbers = iter(range(requests))
+    latencies: List[float] = []
+    errors = 0
+
+    async def client() -> None:
+        nonlocal errors
+        for number in numbers:
+            start = time.perf_counter()
+            try:
+                response = await send(number)
+                if response.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return latencies, errors
+
+
+class Benchmark:
+    """
+    Drives the application's HTTP API in-process against fake backends.
+
+    Attributes:
+        client (httpx.AsyncClient): The client calling the ASGI application.
+        args (argparse.Namespace): The benchmark options.
+        workdir (str): A scratch directory for uploaded files.
+    """
+
+    def __init__(
+        self, client: httpx.AsyncClient, args: argparse.Namespace, workdir: str
+    ) -> None:
+        self.client = client
+        self.args = args
+        self.workdir = workdir
+        self.rng = random.Random(args.seed)
+        self.documents = 0
+        self.queries = make_queries(self.rng, args.distinct_queries)
+        self.query_mix: List[str] = []
+        self.files: List[str] = []
+        self.upload_mix: List[List[str]] = []
+
+    async def login(self) -> None:
+        """
+        Register a user with the fake Cognito and authenticate all requests.
+        """
+        user = {"name": "bench", "email": "bench@example.com", "password": "Bench1!"}
+        response = await self.client.post("/auth/register/", json=user)
+        response.raise_for_status()
+        response = await self.client.post(
+            "/auth/login", data={"username": "bench", "password": "Bench1!"}
+        )
+        response.raise_for_status()
+        token = response.json()["access_token"]
+        self.client.headers["Authorization"] = f"Bearer {token}"
+
+    async def ingest(self, number: int) -> httpx.Response:
+        document_id = f"doc-{self.documents}"
+        self.documents += 1
+        body = make_ocr_document(self.rng, self.args.pages, self.args.words)
+        return await self.client.post(
+            "/ocr/processOCR",
+            files={"file": (f"{document_id}.json", body, "application/json")},
+            data={"document_id": document_id},
+        )
+
+    async def seed(self) -> None:
+        """
+        Ingest the corpus the query scenarios search, without timing it.
+        """
+        for _ in range(self.args.seed_documents):
+            response = await self.ingest(0)
+            response.raise_for_status()
+
+    async def query(self, number: int) -> httpx.Response:
+        return await self.client.post(
+            "/ocr/queryOCR/", params={"query": self.query_mix[number]}
+        )
+
+    async def batch(self, number: int) -> httpx.Response:
+        size = self.args.batch_size
+        queries = self.query_mix[number * size:(number + 1) * size]
+        return await self.client.post("/ocr/queryOCR/batch", json={"queries": queries})
+
+    async def upload(self, number: int) -> httpx.Response:
+        paths = self.upload_mix[number]
+        return await self.client.post(
+            "/files/upload-files/", json={"files": [{"path": path} for path in paths]}
+        )
+
+    def prepare(self, scenario: str, requests: int) -> None:
+        """
+        Draw the queries or files a scenario's requests use.
+
+        Args:
+            scenario (str): The scenario name.
+            requests (int): The number of requests.
+        """
+        if scenario == "query":
+            self.query_mix = make_mix(self.rng, self.queries, requests)
+        elif scenario == "batch":
+            self.query_mix = make_mix(
+                self.rng, self.queries, requests * self.args.batch_size
+            )
+        elif scenario == "upload":
+            if not self.files:
+                self.files = self.make_files()
+            count = self.args.files_per_upload
+            self.upload_mix = [
+                make_mix(self.rng, self.files, count) for _ in range(requests)
+            ]
+
+    def make_files(self) -> List[str]:
+        paths = []
+        for i in range(self.args.distinct_files):
+            path = os.path.join(self.workdir, f"file-{i}.bin")
+            with open(path, "wb") as f:
+                f.write(self.rng.randbytes(self.args.file_size))
+            paths.append(path)
+        return paths
+
+    def units(self, scenario: str) -> Tuple[str, int]:
+        if scenario == "ingest":
+            return "pages", self.args.pages
+        if scenario == "batch":
+            return "queries", self.args.batch_size
+        if scenario == "upload":
+            return "files", self.args.files_per_upload
+        return "queries", 1
+
+    async def run(self, scenario: str, concurrency: int) -> Result:
+        """
+        Run one scenario at one concurrency level.
+
+        Args:
+            scenario (str): The scenario name.
+            concurrency (int): The number of concurrent clients.
+
+        Returns:
+            Result: The scenario's measurements.
+        """
+        requests = self.args.requests
+        self.prepare(scenario, requests)
+        faults = configure_faults(
+            self.args.latencies, self.args.error_rates, self.args.seed
+        )
+        send = getattr(self, scenario)
+        sampler = RSSSampler()
+        sampler.start()
+        start = time.perf_counter()
+        latencies, errors = await run_load(concurrency, requests, send)
+        elapsed = time.perf_counter() - start
+        peak = await sampler.stop()
+
+        units, per_request = self.units(scenario)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        return Result(
+            scenario=scenario,
+            concurrency=concurrency,
+            requests=requests,
+            errors=errors,
+            units=units,
+            throughput=(requests - errors) * per_request / elapsed,
+            p50_ms=float(p50),
+            p95_ms=float(p95),
+            p99_ms=float(p99),
+            peak_rss_mb=peak / 2**20,
+            backends={name: fault.stats() for name, fault in faults.items()},
+        )
+
+
+def disable_rate_limits(app: Any) -> None:
+    """
+    Remove the per-user rate limits from every route of the application.
+
+    Args:
+        app: The FastAPI application.
+    """
+    from fastapi_limiter.depends import RateLimiter
+
+    async def no_limit() -> None:
+        pass
+
+    for route in app.routes:
+        dependant = getattr(route, "dependant", None)
+        for dependency in dependant.dependencies if dependant else []:
+            if isinstance(dependency.call, RateLimiter):
+                app.dependency_overrides[dependency.call] = no_limit
+
+
+async def run_benchmarks(args: argparse.Namespace, report: Any) -> List[Result]:
+    """
+    Start the application against fake backends and run every scenario at
+    every concurrency level.
+
+    Args:
+        args (argparse.Namespace): The benchmark options.
+        report: The stream each result is printed to as it completes.
+
+    Returns:
+        list: The measurements of each run.
+    """
+    with tempfile.TemporaryDirectory() as workdir, install_fakes():
+        os.environ.update(BENCHMARK_ENV)
+        for name, value in BENCHMARK_ENV_DEFAULTS.items():
+            os.environ.setdefault(name, value)
+        os.environ["CONTENT_STORE_PATH"] = os.path.join(workdir, "content.sqlite3")
+        os.environ["INGEST_SPOOL_DIR"] = os.path.join(workdir, "spool")
+
+        from main import app, lifespan
+
+        disable_rate_limits(app)
+        results = []
+        async with lifespan(app):
+            transport = httpx.ASGITransport(app=app)  # type: ignore[arg-type]
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://benchmark", timeout=None
+            ) as client:
+                configure_faults({}, {}, args.seed)
+                benchmark = Benchmark(client, args, workdir)
+                await benchmark.login()
+                if {"query", "batch"} & set(args.scenarios):
+                    await benchmark.seed()
+                for scenario in args.scenarios:
+                    for concurrency in args.concurrency:
+                        result = await benchmark.run(scenario, concurrency)
+                        print(format_row(result), file=report, flush=True)
+                        results.append(result)
+        return results
+
+
+HEADER = (
+    f"{'scenario':<8} {'conc':>5} {'reqs':>6} {'errors':>6} "
+    f"{'throughput':>18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rss MiB':>8}"
+)
+
+
+def format_row(result: Result) -> str:
+    throughput = f"{result.throughput:.1f} {result.units}/s"
+    return (
+        f"{result.scenario:<8} {result.concurrency:>5} {result.requests:>6} "
+        f"{result.errors:>6} {throughput:>18} {result.p50_ms:>9.1f} "
+        f"{result.p95_ms:>9.1f} {result.p99_ms:>9.1f} {result.peak_rss_mb:>8.1f}"
+    )
+
+
+def format_comparison(results: List[Result], baseline: List[Result]) -> str:
+    """
+    Format the change of each measurement from a baseline run.
+
+    Runs are matched by scenario and concurrency; changes are percentages of
+    the baseline value.
+
+    Args:
+        results (list): The current measurements.
+        baseline (list): The baseline measurements.
+
+    Returns:
+        str: The comparison table.
+    """
+    fields = ("throughput", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+    previous = {(r.scenario, r.concurrency): r for r in baseline}
+    lines = [
+        f"{'scenario':<8} {'conc':>5} "
+        + " ".join(f"{field:>12}" for field in fields)
+    ]
+    for result in results:
+        before = previous.get((result.scenario, result.concurrency))
+        if before is None:
+            continue
+        changes = []
+        for field in fields:
+            old, new = getattr(before, field), getattr(result, field)
+            change = (new - old) / old * 100 if old else 0.0
+            changes.append(f"{change:>+11.1f}%")
+        lines.append(
+            f"{result.scenario:<8} {result.concurrency:>5} " + " ".join(changes)
+        )
+    return "\n".join(lines)
+
+
+def parse_rates(values: Sequence[str], defaults: Dict[str, float]) -> Dict[str, float]:
+    """
+    Parse ``backend=value`` options over a set of defaults.
+
+    Args:
+        values (Sequence[str]): The options.
+        defaults (dict): The value of each backend not given.
+
+    Returns:
+        dict: The value of each backend.
+
+    Raises:
+        argparse.ArgumentTypeError: If an option is malformed.
+    """
+    rates = dict(defaults)
+    for value in values:
+        name, _, number = value.partition("=")
+        if name not in DEFAULT_LATENCIES or not number:
+            raise argparse.ArgumentTypeError(f"Expected backend=value, got {value}")
+        rates[name] = float(number)
+    return rates
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the API in-process against fake backends."
+    )
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--words", type=int, default=300)
+    parser.add_argument("--seed-documents", type=int, default=20)
+    parser.add_argument("--distinct-queries", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--distinct-files", type=int, default=32)
+    parser.add_argument("--files-per-upload", type=int, default=4)
+    parser.add_argument("--file-size", type=int, default=1024 * 1024)
+    parser.add_argument(
+        "--latency",
+        nargs="*",
+        default=[],
+        metavar="BACKEND=SECONDS",
+        help=f"Mean latency per call of {', '.join(DEFAULT_LATENCIES)}",
+    )
+    parser.add_argument(
+        "--error-rate",
+        nargs="*",
+        default=[],
+        metavar="BACKEND=RATE",
+        help="Probability that a call to the backend fails",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--verbose", action="store_true", help="Show the application's output"
+    )
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Compare with results from --json")
+    args = parser.parse_args(argv)
+    args.latencies = parse_rates(args.latency, DEFAULT_LATENCIES)
+    args.error_rates = parse_rates(args.error_rate, {})
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    print(HEADER, flush=True)
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            devnull = stack.enter_context(open(os.devnull, "w"))
+            stack.enter_context(contextlib.redirect_stdout(devnull))
+        results = asyncio.run(run_benchmarks(args, sys.__stdout__))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([result.model_dump() for result in results], f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = [Result(**item) for item in json.load(f)]
+        print()
+        print(format_comparison(results, baseline))
+
+
+if __name__ == "__main__":
+    main()
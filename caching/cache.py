@@ -1,8 +1,12 @@
 import hashlib
 from aiocache import caches
-import numpy as np
-from numpy.typing import NDArray
 from fastapi import FastAPI
+from typing import Optional
+from caching.embeddings import EmbeddingCache, normalize_text
+from caching.semantic import SemanticCache
+from caching.generation import GenerationCache
+from caching.singleflight import SingleFlight
+from caching.tiered import TieredCache
 
 
 def init_cache(app: FastAPI) -> None:
@@ -13,6 +17,14 @@ def init_cache(app: FastAPI) -> None:
         app (FastAPI): The FastAPI application instance.
 
     Sets the cache configuration using Redis and attaches it to the application state.
+    Values are stored as msgpack, and embeddings as raw little-endian vectors
+    behind an optional in-process LRU. Query embeddings may be quantized to
+    float16 or int8; page embeddings, which are upserted, stay float32. The
+    query result cache adds its own in-process tier and a semantic tier
+    matching rephrased queries by embedding, and concurrent misses on the
+    same query are coalesced through a Redis lease. Index generations,
+    which scope query cache keys, are reused per worker for
+    GENERATION_CACHE_TTL seconds.
     """
     caches.set_config(
         {
@@ -21,23 +33,109 @@ def init_cache(app: FastAPI) -> None:
                 "endpoint": app.state.redis_host,
                 "port": app.state.redis_port,
                 "timeout": 10,
-                "serializer": {"class": "aiocache.serializers.JsonSerializer"},
-            }
+                "namespace": "ocr",
+                "serializer": {"class": "caching.serializers.BinarySerializer"},
+            },
+            "embeddings": {
+                "cache": "aiocache.RedisCache",
+                "endpoint": app.state.redis_host,
+                "port": app.state.redis_port,
+                "timeout": 10,
+                "namespace": "emb2",
+                "serializer": {"class": "caching.serializers.BytesSerializer"},
+            },
         }
     )
     app.state.caches = caches.get("default")
+    app.state.query_cache = TieredCache(
+        app.state.caches,
+        local_size=app.state.query_cache_local_size,
+        local_ttl=app.state.query_cache_local_ttl,
+        ttl=app.state.query_cache_ttl,
+    )
+    app.state.semantic_cache = SemanticCache(
+        app.state.embedding_dimension,
+        capacity=app.state.semantic_cache_size,
+        threshold=app.state.semantic_cache_threshold,
+        ttl=app.state.query_cache_ttl or None,
+    )
+    app.state.generations = GenerationCache(
+        app.state.redis_client, app.state.generation_cache_ttl
+    )
+    app.state.query_flight = SingleFlight(
+        app.state.redis_client,
+        lease_ttl=app.state.query_lease_ttl,
+        wait_timeout=app.state.query_lease_wait,
+        poll_interval=app.state.query_lease_poll_interval,
+    )
+    app.state.embedding_cache = EmbeddingCache(
+        caches.get("embeddings"),
+        local_size=app.state.embedding_cache_local_size,
+        ttl=app.state.embedding_cache_ttl or None,
+        quantization=app.state.embedding_cache_quantization,
+    )
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a query string for use in cache keys and embedding.
+
+    Args:
+        query (str): The raw query text.
+
+    Returns:
+        str: The lower-cased query with whitespace collapsed.
+    """
+    return normalize_text(query).lower()
 
 
-async def get_cache_key(query_embedding: NDArray[np.float64]) -> str:
+def get_cache_scope(
+    index_version: str,
+    namespace: str = "",
+    document_id: Optional[str] = None,
+    generation: int = 0,
+) -> str:
     """
-    Generate a cache key from a query embedding.
+    Build the scope a cached query result is valid for.
+
+    Args:
+        index_version (str): The version of the index the results came from.
+        namespace (str): The vector store namespace searched.
+        document_id (Optional[str]): The document the search was limited to.
+        generation (int): The namespace's index generation, bumped whenever
+            its vectors change.
+
+    Returns:
+        str: The index version and generation, namespace and document ID,
+        one per line.
+    """
+    return f"{index_version}.{generation}\n{namespace}\n{document_id or ''}"
+
+
+def get_cache_key(
+    query: str,
+    index_version: str,
+    namespace: str = "",
+    document_id: Optional[str] = None,
+    generation: int = 0,
+) -> str:
+    """
+    Generate a query result cache key from the normalized query text.
+
+    The key is derived from the text rather than its embedding, so a cached
+    result can be found before any embedding call is made.
 
     Args:
-        query_embedding (np.ndarray): The query embedding as a NumPy array.
+        query (str): The normalized query text.
+        index_version (str): The version of the index the results came from.
+        namespace (str): The vector store namespace searched.
+        document_id (Optional[str]): The document the search was limited to.
+        generation (int): The namespace's index generation.
 
     Returns:
         str: The generated cache key as a hexadecimal string.
     """
-    embedding_str = np.array(query_embedding).tobytes()
-    cache_key = hashlib.md5(embedding_str).hexdigest()
-    return cache_key
+    scope = get_cache_scope(index_version, namespace, document_id, generation)
+    payload = f"{scope}\n{query}".encode("utf-8")
+    cache_key = hashlib.md5(payload).hexdigest()
+    return f"query:{cache_key}"
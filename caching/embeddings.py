@@ -0,0 +1,157 @@
+import hashlib
+import unicodedata
+from aiocache import Cache
+from typing import List, Optional, Sequence, Tuple
+from caching.local import LRUCache
+from core.metrics import metrics
+from caching.pipeline import pipelined_get, pipelined_set
+from caching.serializers import (
+    VECTOR_FORMATS,
+    decode_vector,
+    encode_vector,
+    is_exact_vector,
+)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalize text so trivially different renderings share a cache entry.
+
+    Applies NFKC unicode normalization and collapses runs of whitespace.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def get_embedding_cache_key(text: str, model: str) -> str:
+    """
+    Generate a content-addressed cache key for the embedding of a text.
+
+    Args:
+        text (str): The embedded text.
+        model (str): The embedding model's ``identity``.
+
+    Returns:
+        str: The SHA-256 hex digest of the model identity and normalized text.
+    """
+    payload = f"{model}\n{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-level embedding cache: an optional in-process LRU in front of Redis.
+
+    Vectors are stored in Redis quantized as configured, except those stored
+    with ``exact=True``, which are kept at float32. Lookups with
+    ``exact=True`` treat quantized entries as misses, so vectors written to
+    the vector store are never degraded by the cache.
+
+    Attributes:
+        cache (aiocache.Cache): The Redis-backed cache storing encoded vectors.
+        local (LRUCache): The in-process LRU tier, holding each vector and
+            whether it is at full precision.
+        ttl (Optional[int]): The Redis entry lifetime in seconds, or None.
+        quantization (str): One of "float32", "float16" or "int8".
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        local_size: int,
+        ttl: Optional[int],
+        quantization: str = "float32",
+    ) -> None:
+        if quantization not in VECTOR_FORMATS:
+            raise ValueError(f"Unknown vector quantization: {quantization}")
+        self.cache = cache
+        self.local: LRUCache[Tuple[List[float], bool]] = LRUCache(local_size)
+        self.ttl = ttl
+        self.quantization = quantization
+
+    async def get_many(
+        self, texts: Sequence[str], model: str, exact: bool = False
+    ) -> List[Optional[List[float]]]:
+        """
+        Look up the embeddings of several texts.
+
+        Redis is queried once, with a pipelined multi-get, for the keys missing
+        from the in-process tier. Redis errors are logged and treated as misses.
+
+        Args:
+            texts (Sequence[str]): The texts to look up.
+            model (str): The embedding model's ``identity``.
+            exact (bool): Whether only full-precision vectors count as hits.
+
+        Returns:
+            list: The cached embedding, or None, for each text.
+        """
+        keys = [get_embedding_cache_key(text, model) for text in texts]
+        vectors: List[Optional[List[float]]] = []
+        for key in keys:
+            entry = self.local.get(key)
+            if entry is None or (exact and not entry[1]):
+                vectors.append(None)
+            else:
+                vectors.append(entry[0])
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        metrics.record_lookups("embedding", "local_hit", len(keys) - len(missing))
+        if not missing:
+            return vectors
+
+        try:
+            with metrics.stage("embedding_cache_get"):
+                found = await pipelined_get(self.cache, [keys[i] for i in missing])
+        except Exception as e:
+            print(f"Embedding cache lookup failed: {e}")
+            metrics.record_lookups("embedding", "miss", len(missing))
+            return vectors
+
+        hits = 0
+        for i, data in zip(missing, found):
+            if data is None:
+                continue
+            lossless = is_exact_vector(data)
+            if exact and not lossless:
+                continue
+            hits += 1
+            vector = decode_vector(data)
+            vectors[i] = vector
+            self.local.set(keys[i], (vector, lossless))
+        metrics.record_lookups("embedding", "hit", hits)
+        metrics.record_lookups("embedding", "miss", len(missing) - hits)
+        return vectors
+
+    async def set_many(
+        self,
+        texts: Sequence[str],
+        vectors: Sequence[List[float]],
+        model: str,
+        exact: bool = False,
+    ) -> None:
+        """
+        Store the embeddings of several texts in both tiers.
+
+        Args:
+            texts (Sequence[str]): The embedded texts.
+            vectors (Sequence[list]): The embedding of each text.
+            model (str): The embedding model's ``identity``.
+            exact (bool): Whether to store full precision in Redis regardless
+                of the configured quantization.
+        """
+        quantization = "float32" if exact else self.quantization
+        pairs = []
+        for text, vector in zip(texts, vectors):
+            key = get_embedding_cache_key(text, model)
+            self.local.set(key, (vector, True))
+            pairs.append((key, encode_vector(vector, quantization)))
+        try:
+            with metrics.stage("embedding_cache_set"):
+                await pipelined_set(self.cache, pairs, ttl=self.ttl)
+        except Exception as e:
+            print(f"Embedding cache store failed: {e}")
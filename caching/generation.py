@@ -0,0 +1,106 @@
+import redis.asyncio as redis
+from caching.local import LRUCache
+
+# The most namespaces whose generation a worker remembers
+GENERATION_CACHE_SIZE = 10000
+
+
+def generation_key(namespace: str) -> str:
+    """
+    Return the Redis key of a namespace's index generation counter.
+
+    Args:
+        namespace (str): The vector store namespace.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"ocr:generation:{namespace}"
+
+
+async def get_generation(redis_client: redis.Redis, namespace: str) -> int:
+    """
+    Return the current index generation of a namespace.
+
+    Args:
+        redis_client: The Redis client.
+        namespace (str): The vector store namespace.
+
+    Returns:
+        int: The generation, or 0 if the namespace was never written to.
+    """
+    generation = await redis_client.get(generation_key(namespace))
+    return int(generation or 0)
+
+
+async def bump_generation(redis_client: redis.Redis, namespace: str) -> int:
+    """
+    Advance the index generation of a namespace after its vectors changed.
+
+    Query cache keys include the generation, so every result cached before
+    the change becomes unreachable at once.
+
+    Args:
+        redis_client: The Redis client.
+        namespace (str): The vector store namespace.
+
+    Returns:
+        int: The new generation.
+    """
+    generation: int = await redis_client.incr(generation_key(namespace))
+    return generation
+
+
+class GenerationCache:
+    """
+    A per-worker copy of namespace index generations, refreshed from Redis.
+
+    A generation read from Redis is reused for ``ttl`` seconds, so a query
+    answered from the in-process query cache tier needs no I/O at all. A
+    generation bumped by this worker is seen at once; one bumped by another
+    worker, such as a Celery ingestion, is seen within ``ttl`` seconds.
+
+    Attributes:
+        redis_client (Redis): The Redis client holding the counters.
+        ttl (float): How long a generation is reused, in seconds; 0 reads
+            Redis on every lookup.
+    """
+
+    def __init__(self, redis_client: redis.Redis, ttl: float) -> None:
+        self.redis_client = redis_client
+        self.ttl = ttl
+        self._generations: LRUCache[int] = LRUCache(GENERATION_CACHE_SIZE, ttl)
+
+    async def get(self, namespace: str) -> int:
+        """
+        Return the index generation of a namespace.
+
+        Args:
+            namespace (str): The vector store namespace.
+
+        Returns:
+            int: The generation, or 0 if the namespace was never written to.
+        """
+        if self.ttl > 0:
+            generation = self._generations.get(namespace)
+            if generation is not None:
+                return generation
+        generation = await get_generation(self.redis_client, namespace)
+        if self.ttl > 0:
+            self._generations.set(namespace, generation)
+        return generation
+
+    async def bump(self, namespace: str) -> int:
+        """
+        Advance the index generation of a namespace and remember the new one.
+
+        Args:
+            namespace (str): The vector store namespace.
+
+        Returns:
+            int: The new generation.
+        """
+        generation = await bump_generation(self.redis_client, namespace)
+        if self.ttl > 0:
+            self._generations.set(namespace, generation)
+        return generation
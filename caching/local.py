@@ -0,0 +1,83 @@
+import time
+from collections import OrderedDict
+from typing import Any, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class LRUCache(Generic[V]):
+    """
+    A bounded in-process least-recently-used cache with optional expiry.
+
+    Attributes:
+        maxsize (int): The maximum number of entries kept; 0 disables the cache.
+        ttl (Optional[float]): The lifetime of an entry in seconds, or None to
+            keep entries until they are evicted.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Optional[V] = None) -> Optional[V]:
+        """
+        Return the value for a key and mark it as recently used.
+
+        Args:
+            key: The cache key.
+            default: The value returned when the key is missing or expired.
+
+        Returns:
+            The cached value, or ``default``.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: V, ttl: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry when full.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl (Optional[float]): Overrides the cache-wide entry lifetime.
+        """
+        if self.maxsize <= 0:
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl else 0.0
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove a key and return its value.
+
+        Args:
+            key: The cache key.
+            default: The value returned when the key is missing.
+
+        Returns:
+            The removed value, or ``default``.
+        """
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+        """
+        self._data.clear()
@@ -0,0 +1,70 @@
+from aiocache import Cache
+from typing import Any, List, Optional, Sequence, Tuple
+
+# Keys fetched per MGET, so one large lookup does not block Redis for long
+MGET_CHUNK_SIZE = 500
+
+
+async def pipelined_get(cache: Cache, keys: Sequence[str]) -> List[Any]:
+    """
+    Fetch several keys from a cache in one round trip.
+
+    On Redis the keys are split into MGET chunks sent through a single
+    non-transactional pipeline. Other backends fall back to ``multi_get``.
+
+    Args:
+        cache (aiocache.Cache): The cache to read from.
+        keys (Sequence[str]): The cache keys.
+
+    Returns:
+        list: The deserialized value, or None, for each key.
+    """
+    if not keys:
+        return []
+    client = getattr(cache, "client", None)
+    if client is None:
+        values: List[Any] = await cache.multi_get(list(keys))
+        return values
+
+    pipe = client.pipeline(transaction=False)
+    for start in range(0, len(keys), MGET_CHUNK_SIZE):
+        chunk = keys[start:start + MGET_CHUNK_SIZE]
+        pipe.mget([cache.build_key(key) for key in chunk])
+    chunks = await pipe.execute()
+    encoding = cache.serializer.encoding
+    return [
+        cache.serializer.loads(
+            raw if raw is None or encoding is None else raw.decode(encoding)
+        )
+        for chunk in chunks
+        for raw in chunk
+    ]
+
+
+async def pipelined_set(
+    cache: Cache, pairs: Sequence[Tuple[str, Any]], ttl: Optional[int] = None
+) -> None:
+    """
+    Store several values in a cache in one round trip.
+
+    On Redis each value is written with its own ``SET ... EX`` through a
+    single non-transactional pipeline, avoiding the MULTI/EXEC wrapper that
+    ``multi_set`` uses when a TTL is given. Other backends fall back to
+    ``multi_set``.
+
+    Args:
+        cache (aiocache.Cache): The cache to write to.
+        pairs (Sequence[tuple]): The ``(key, value)`` pairs to store.
+        ttl (Optional[int]): The entry lifetime in seconds, or None.
+    """
+    if not pairs:
+        return
+    client = getattr(cache, "client", None)
+    if client is None:
+        await cache.multi_set(list(pairs), ttl=ttl)
+        return
+
+    pipe = client.pipeline(transaction=False)
+    for key, value in pairs:
+        pipe.set(cache.build_key(key), cache.serializer.dumps(value), ex=ttl or None)
+    await pipe.execute()
@@ -0,0 +1,148 @@
+import time
+import numpy as np
+from numpy.typing import NDArray
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class SemanticCache:
+    """
+    In-process cache of query results keyed by query embedding.
+
+    Recent query embeddings are kept, L2-normalized, as rows of a fixed-size
+    float32 matrix used as a ring buffer. A lookup scores every row with one
+    matrix-vector product and reuses the results of the most similar query
+    in the same scope when its cosine similarity reaches the threshold, so
+    rephrased queries skip the vector store.
+
+    Attributes:
+        capacity (int): The number of queries kept; 0 disables the cache.
+        threshold (float): The minimum cosine similarity of a near hit.
+        ttl (Optional[float]): The lifetime of an entry in seconds, or None.
+        hits (int): Exact cache hits, recorded by the caller.
+        near_hits (int): Lookups answered by a similar query.
+        misses (int): Lookups with no similar query.
+    """
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int,
+        threshold: float,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._vectors: NDArray[np.float32] = np.zeros(
+            (capacity, dimension), dtype=np.float32
+        )
+        self._expires: NDArray[np.float64] = np.zeros(capacity, dtype=np.float64)
+        self._scopes: List[Optional[str]] = [None] * capacity
+        self._values: List[Any] = [None] * capacity
+        self._next = 0
+
+    @staticmethod
+    def _normalize(vectors: NDArray[np.float32]) -> NDArray[np.float32]:
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        normalized: NDArray[np.float32] = vectors / np.maximum(norms, 1e-12)
+        return normalized
+
+    def record_hit(self, count: int = 1) -> None:
+        """
+        Count exact cache hits, so hit rates cover both cache tiers.
+
+        Args:
+            count (int): The number of hits to record.
+        """
+        self.hits += count
+
+    def lookup_many(
+        self, scope: str, vectors: Sequence[Sequence[float]]
+    ) -> List[Optional[Any]]:
+        """
+        Find cached results for queries similar to the given embeddings.
+
+        Args:
+            scope (str): The search scope the results must belong to.
+            vectors (Sequence[list]): The query embeddings.
+
+        Returns:
+            list: The results of the most similar cached query in the scope,
+            or None when none reaches the threshold, for each embedding.
+        """
+        found: List[Optional[Any]] = [None] * len(vectors)
+        if self.capacity == 0 or not vectors:
+            self.misses += len(vectors)
+            return found
+
+        queries = self._normalize(np.asarray(vectors, dtype=np.float32))
+        valid = np.fromiter(
+            (stored == scope for stored in self._scopes),
+            dtype=bool,
+            count=self.capacity,
+        )
+        valid &= self._expires > time.monotonic()
+        if not valid.any():
+            self.misses += len(vectors)
+            return found
+
+        scores = self._vectors @ queries.T
+        scores[~valid] = -np.inf
+        best = np.argmax(scores, axis=0)
+        for i, row in enumerate(best):
+            if scores[row, i] >= self.threshold:
+                found[i] = self._values[row]
+                self.near_hits += 1
+            else:
+                self.misses += 1
+        return found
+
+    def lookup(self, scope: str, vector: Sequence[float]) -> Optional[Any]:
+        """
+        Find cached results for a query similar to the given embedding.
+
+        Args:
+            scope (str): The search scope the results must belong to.
+            vector (Sequence[float]): The query embedding.
+
+        Returns:
+            The results of the most similar cached query, or None.
+        """
+        return self.lookup_many(scope, [vector])[0]
+
+    def add(self, scope: str, vector: Sequence[float], value: Any) -> None:
+        """
+        Store the results of a query, replacing the oldest entry when full.
+
+        Args:
+            scope (str): The search scope the results belong to.
+            vector (Sequence[float]): The query embedding.
+            value: The query results.
+        """
+        if self.capacity == 0:
+            return
+        row = self._next
+        self._next = (row + 1) % self.capacity
+        self._vectors[row] = self._normalize(np.asarray(vector, dtype=np.float32))
+        self._expires[row] = time.monotonic() + self.ttl if self.ttl else np.inf
+        self._scopes[row] = scope
+        self._values[row] = value
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the hit, near-hit and miss counters.
+
+        Returns:
+            dict: The counters, the number of entries and the overall hit rate.
+        """
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "entries": sum(scope is not None for scope in self._scopes),
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,162 @@
+import asyncio
+import time
+import uuid
+from redis.asyncio import Redis
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+# Deletes the lease only if it still holds this worker's token
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations of the same cache entry.
+
+    Within a worker, callers asking for a key that is already being computed
+    await the same future. Across workers, a short Redis lease elects one
+    worker to compute; the others poll the cache until the result appears,
+    the lease is released or expires, or they give up waiting and compute
+    it themselves.
+
+    Attributes:
+        redis_client (Redis): The Redis client holding the leases.
+        lease_ttl (float): How long a lease is held at most, in seconds.
+        wait_timeout (float): How long a worker waits for another worker's
+            result before computing it itself, in seconds.
+        poll_interval (float): The delay between cache lookups while waiting.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        lease_ttl: float,
+        wait_timeout: float,
+        poll_interval: float,
+    ) -> None:
+        self.redis_client = redis_client
+        self.lease_ttl = lease_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, "asyncio.Future[Any]"] = {}
+
+    async def run(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return the value for a key, computing it at most once per worker and,
+        while the lease holds, once across workers.
+
+        Callers waiting on a computation share its result or exception. If the
+        computing caller is cancelled, one waiting caller takes over instead.
+
+        Args:
+            key (str): The cache key being computed.
+            compute: Computes the value and stores it in the cache.
+            lookup: Reads the value from the cache, returning None on a miss.
+
+        Returns:
+            The computed or cached value.
+        """
+        while True:
+            future = self._inflight.get(key)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled rather than this caller: retry, so
+                # the first caller to wake takes over the computation
+                task = asyncio.current_task()
+                if not future.cancelled() or (task and task.cancelling()):
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._lead(key, compute, lookup)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no other caller is waiting
+            future.exception()
+            raise
+        except BaseException:
+            # Cancellation belongs to the leader alone; waiting callers retry
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _lead(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        lookup: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        lease_key = f"lease:{key}"
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                acquired = await self.redis_client.set(
+                    lease_key, token, nx=True, px=int(self.lease_ttl * 1000)
+                )
+            except Exception as e:
+                print(f"Failed to acquire lease for {key}: {e}")
+                return await compute()
+
+            if acquired:
+                try:
+                    return await compute()
+                finally:
+                    await self._release(lease_key, token)
+
+            value = await self._wait(key, lease_key, lookup, deadline)
+            if value is not None:
+                return value
+            if time.monotonic() >= deadline:
+                return await compute()
+
+    async def _wait(
+        self,
+        key: str,
+        lease_key: str,
+        lookup: Callable[[], Awaitable[Any]],
+        deadline: float,
+    ) -> Optional[Any]:
+        """
+        Poll the cache while another worker holds the lease.
+
+        Returns:
+            The cached value, or None once the lease is gone or the deadline
+            has passed without a result.
+        """
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            value = await lookup()
+            if value is not None:
+                return value
+            try:
+                if not await self.redis_client.exists(lease_key):
+                    return await lookup()
+            except Exception as e:
+                print(f"Failed to check lease for {key}: {e}")
+                return None
+        return None
+
+    async def _release(self, lease_key: str, token: str) -> None:
+        try:
+            await self.redis_client.eval(  # type: ignore[misc]
+                RELEASE_SCRIPT, 1, lease_key, token
+            )
+        except Exception as e:
+            print(f"Failed to release lease {lease_key}: {e}")
@@ -0,0 +1,109 @@
+from aiocache import Cache
+from typing import Any, List, Optional, Sequence, Tuple
+from caching.local import LRUCache
+from caching.pipeline import pipelined_get, pipelined_set
+from core.metrics import metrics
+
+
+class TieredCache:
+    """
+    Result cache with a bounded in-process LRU/TTL tier in front of Redis.
+
+    Local hits are answered without any I/O. Redis hits are copied into the
+    local tier so later lookups on the same worker stay in-process. Lookups
+    and their latency are recorded in the metrics under ``name``.
+
+    Attributes:
+        cache (aiocache.Cache): The shared Redis-backed cache.
+        local (LRUCache): The in-process tier.
+        ttl (Optional[int]): The Redis entry lifetime in seconds.
+        name (str): The cache name used in metrics.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        local_size: int,
+        local_ttl: Optional[float],
+        ttl: Optional[int],
+        name: str = "query",
+    ) -> None:
+        self.cache = cache
+        self.local: LRUCache[Any] = LRUCache(local_size, ttl=local_ttl)
+        self.ttl = ttl
+        self.name = name
+        self._get_stage = f"{name}_cache_get"
+        self._set_stage = f"{name}_cache_set"
+
+    async def get(self, key: str) -> Any:
+        """
+        Look up a key in the local tier, then in Redis.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            The cached value, or None when neither tier has it.
+        """
+        value = self.local.get(key)
+        if value is not None:
+            metrics.record_lookups(self.name, "local_hit")
+            return value
+        with metrics.stage(self._get_stage):
+            value = await self.cache.get(key)
+        if value is not None:
+            metrics.record_lookups(self.name, "hit")
+            self.local.set(key, value)
+        else:
+            metrics.record_lookups(self.name, "miss")
+        return value
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Store a value in both tiers.
+
+        Args:
+            key (str): The cache key.
+            value: The value to store.
+        """
+        self.local.set(key, value)
+        with metrics.stage(self._set_stage):
+            await self.cache.set(key, value, ttl=self.ttl)
+
+    async def get_many(self, keys: Sequence[str]) -> List[Any]:
+        """
+        Look up several keys, querying Redis once for the local misses.
+
+        Args:
+            keys (Sequence[str]): The cache keys.
+
+        Returns:
+            list: The cached value, or None, for each key.
+        """
+        values = [self.local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        metrics.record_lookups(self.name, "local_hit", len(keys) - len(missing))
+        if missing:
+            with metrics.stage(self._get_stage):
+                found = await pipelined_get(self.cache, [keys[i] for i in missing])
+            hits = 0
+            for i, value in zip(missing, found):
+                if value is not None:
+                    hits += 1
+                    values[i] = value
+                    self.local.set(keys[i], value)
+            metrics.record_lookups(self.name, "hit", hits)
+            metrics.record_lookups(self.name, "miss", len(missing) - hits)
+        return values
+
+    async def set_many(self, pairs: Sequence[Tuple[str, Any]]) -> None:
+        """
+        Store several values in both tiers with one Redis round trip.
+
+        Args:
+            pairs (Sequence[tuple]): The ``(key, value)`` pairs to store.
+        """
+        for key, value in pairs:
+            self.local.set(key, value)
+        with metrics.stage(self._set_stage):
+            await pipelined_set(self.cache, pairs, ttl=self.ttl)
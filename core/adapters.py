@@ -0,0 +1,101 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict
+
+
+class AsyncClientAdapter:
+    """
+    Async facade for a blocking client such as the Pinecone index or boto3.
+
+    Client methods run on a dedicated, size-limited thread pool so they never
+    block the event loop. A semaphore bounds the calls handed to the pool,
+    and callers waiting for a slot are counted as the queue depth.
+
+    Any public method of the wrapped client can be awaited on the adapter,
+    e.g. ``await adapter.query(vector=..., top_k=10)``.
+
+    Attributes:
+        client: The wrapped blocking client.
+        name (str): The backend name used in thread names and metrics.
+        max_workers (int): The size of the thread pool.
+        waiting (int): Calls currently queued for a free slot.
+        in_flight (int): Calls currently running on the pool.
+        peak_waiting (int): The largest queue depth seen.
+        completed (int): Calls finished, successfully or not.
+        failed (int): Calls that raised an exception.
+    """
+
+    def __init__(self, client: Any, name: str, max_workers: int) -> None:
+        self.client = client
+        self.name = name
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{name}-io"
+        )
+        self._semaphore = asyncio.Semaphore(max_workers)
+        self.waiting = 0
+        self.in_flight = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.failed = 0
+
+    def __getattr__(self, method: str) -> Callable[..., Awaitable[Any]]:
+        if method.startswith("_"):
+            raise AttributeError(method)
+        return functools.partial(self.call, method)
+
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a method of the wrapped client on the adapter's thread pool.
+
+        Args:
+            method (str): The name of the client method.
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            The method's return value.
+        """
+        func = functools.partial(getattr(self.client, method), *args, **kwargs)
+
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.completed += 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the adapter's concurrency and queue-depth counters.
+
+        Returns:
+            dict: The current and cumulative call counters.
+        """
+        return {
+            "max_workers": self.max_workers,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+    def shutdown(self) -> None:
+        """
+        Shut down the thread pool without waiting for queued calls.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
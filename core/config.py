@@ -1,11 +1,23 @@
 import os
+from contextlib import AsyncExitStack
 from dotenv import load_dotenv
 from fastapi import FastAPI
 import redis.asyncio as redis
 from fastapi_limiter import FastAPILimiter
 from pinecone import Pinecone, ServerlessSpec
 from openai import AsyncOpenAI
+import aioboto3
 import boto3
+from aiobotocore.config import AioConfig
+from auth.tokens import JWKSCache, TokenVerifier
+from core.adapters import AsyncClientAdapter
+from embedding.local import HashingEmbeddingProvider
+from embedding.openai_provider import OpenAIEmbeddingProvider
+from embedding.scheduler import RateLimitScheduler
+from files.index import UploadIndex
+from ocr.content import ContentStore
+from vectorstore.local import LocalVectorStore
+from vectorstore.pinecone_store import PineconeVectorStore
 
 load_dotenv()
 
@@ -19,15 +31,111 @@ def setup_env(app: FastAPI) -> None:
 
     Reads environment variables and assigns them to the application state.
     """
-    app.state.USER_POOL_ID = os.getenv("USER_POOL_ID")
-    app.state.CLIENT_ID = os.getenv("CLIENT_ID")
-    app.state.REGION = os.getenv("REGION")
+    app.state.USER_POOL_ID = os.getenv("USER_POOL_ID") or os.getenv(
+        "COGNITO_USER_POOL_ID"
+    )
+    app.state.CLIENT_ID = os.getenv("CLIENT_ID") or os.getenv("COGNITO_CLIENT_ID")
+    app.state.REGION = os.getenv("REGION") or os.getenv("AWS_REGION")
     app.state.SECRET_KEY = os.getenv("SECRET_KEY")
+    app.state.auth_token_cache_size = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", 10000))
+    app.state.jwks_refresh_interval = float(os.getenv("JWKS_REFRESH_INTERVAL", 3600))
     app.state.ALGORITHM = "HS256"
 
     app.state.redis_host = os.getenv("REDIS_HOST", "localhost")
     app.state.redis_port = int(os.getenv("REDIS_PORT", 6379))
-    app.state.pinecone_page_count = int(os.getenv("PINECONE_PAGE_COUNT", 10))
+    app.state.vector_store_backend = os.getenv("VECTOR_STORE", "pinecone")
+    app.state.local_vector_store_path = os.getenv(
+        "LOCAL_VECTOR_STORE_PATH", "./data/vectors"
+    )
+    app.state.local_vector_store_dtype = os.getenv(
+        "LOCAL_VECTOR_STORE_DTYPE", "float32"
+    )
+    app.state.embedding_dimension = int(os.getenv("EMBEDDING_DIMENSION", 1536))
+    app.state.content_store_path = os.getenv(
+        "CONTENT_STORE_PATH", "./data/content.sqlite3"
+    )
+    app.state.content_compression_level = int(
+        os.getenv("CONTENT_COMPRESSION_LEVEL", 6)
+    )
+    app.state.query_snippet_chars = int(os.getenv("QUERY_SNIPPET_CHARS", 300))
+    app.state.server_timing = os.getenv("SERVER_TIMING", "true").lower() == "true"
+
+    app.state.pinecone_max_workers = int(os.getenv("PINECONE_MAX_WORKERS", 10))
+    app.state.s3_max_pool_connections = int(os.getenv("S3_MAX_POOL_CONNECTIONS", 50))
+    app.state.s3_keepalive_timeout = float(os.getenv("S3_KEEPALIVE_TIMEOUT", 60))
+    app.state.upload_index_prefix = os.getenv("UPLOAD_INDEX_PREFIX", "")
+    app.state.upload_index_reconcile_interval = float(
+        os.getenv("UPLOAD_INDEX_RECONCILE_INTERVAL", 60 * 60)
+    )
+    app.state.upload_part_size = int(os.getenv("UPLOAD_PART_SIZE", 8 * 1024 * 1024))
+    app.state.upload_part_concurrency = int(os.getenv("UPLOAD_PART_CONCURRENCY", 4))
+    app.state.upload_max_inflight_bytes = int(
+        os.getenv("UPLOAD_MAX_INFLIGHT_BYTES", 64 * 1024 * 1024)
+    )
+    app.state.cognito_max_workers = int(os.getenv("COGNITO_MAX_WORKERS", 4))
+    app.state.backends = {}
+
+    app.state.ingest_max_pages = int(os.getenv("INGEST_MAX_PAGES", 0))
+    app.state.pinecone_upsert_batch_size = int(
+        os.getenv("PINECONE_UPSERT_BATCH_SIZE", 100)
+    )
+
+    app.state.index_version = os.getenv("INDEX_VERSION", "1")
+    app.state.query_batch_max = int(os.getenv("QUERY_BATCH_MAX", 100))
+    app.state.query_cache_ttl = int(os.getenv("QUERY_CACHE_TTL", 60 * 60 * 6))
+    app.state.query_cache_local_size = int(os.getenv("QUERY_CACHE_LOCAL_SIZE", 1024))
+    app.state.query_cache_local_ttl = float(os.getenv("QUERY_CACHE_LOCAL_TTL", 30))
+    app.state.generation_cache_ttl = float(os.getenv("GENERATION_CACHE_TTL", 1))
+    app.state.semantic_cache_size = int(os.getenv("SEMANTIC_CACHE_SIZE", 4096))
+    app.state.semantic_cache_threshold = float(
+        os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.95)
+    )
+    app.state.query_lease_ttl = float(os.getenv("QUERY_LEASE_TTL", 10))
+    app.state.query_lease_wait = float(os.getenv("QUERY_LEASE_WAIT", 5))
+    app.state.query_lease_poll_interval = float(
+        os.getenv("QUERY_LEASE_POLL_INTERVAL", 0.05)
+    )
+
+    app.state.ingest_spool_dir = os.getenv("INGEST_SPOOL_DIR", "/tmp/tek-ocr-spool")
+    app.state.ingest_job_ttl = int(os.getenv("INGEST_JOB_TTL", 60 * 60 * 24))
+    app.state.ingest_job_poll_interval = float(
+        os.getenv("INGEST_JOB_POLL_INTERVAL", 0.5)
+    )
+
+    app.state.embedding_provider = os.getenv("EMBEDDING_PROVIDER", "openai")
+    app.state.embedding_model = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
+    # The local embedder has no provider quota, so it is not limited by default
+    remote = app.state.embedding_provider != "local"
+    app.state.embedding_rpm = int(os.getenv("EMBEDDING_RPM", 3000 if remote else 0))
+    app.state.embedding_tpm = int(
+        os.getenv("EMBEDDING_TPM", 1000000 if remote else 0)
+    )
+    app.state.embedding_bulk_reserve = float(os.getenv("EMBEDDING_BULK_RESERVE", 0.2))
+    app.state.embedding_max_retries = int(os.getenv("EMBEDDING_MAX_RETRIES", 6))
+    app.state.embedding_retry_base_delay = float(
+        os.getenv("EMBEDDING_RETRY_BASE_DELAY", 0.5)
+    )
+    app.state.embedding_retry_max_delay = float(
+        os.getenv("EMBEDDING_RETRY_MAX_DELAY", 30)
+    )
+    app.state.local_embedding_workers = int(
+        os.getenv("LOCAL_EMBEDDING_WORKERS", os.cpu_count() or 1)
+    )
+    app.state.embedding_batch_size = int(os.getenv("EMBEDDING_BATCH_SIZE", 256))
+    app.state.embedding_batch_tokens = int(os.getenv("EMBEDDING_BATCH_TOKENS", 100000))
+    app.state.embedding_concurrency = int(os.getenv("EMBEDDING_CONCURRENCY", 4))
+    app.state.upsert_concurrency = int(os.getenv("UPSERT_CONCURRENCY", 2))
+    app.state.ingest_embed_queue_size = int(os.getenv("INGEST_EMBED_QUEUE_SIZE", 4))
+    app.state.ingest_upsert_queue_size = int(os.getenv("INGEST_UPSERT_QUEUE_SIZE", 4))
+    app.state.embedding_cache_local_size = int(
+        os.getenv("EMBEDDING_CACHE_LOCAL_SIZE", 10000)
+    )
+    app.state.embedding_cache_ttl = int(
+        os.getenv("EMBEDDING_CACHE_TTL", 60 * 60 * 24 * 30)
+    )
+    app.state.embedding_cache_quantization = os.getenv(
+        "EMBEDDING_CACHE_QUANTIZATION", "float32"
+    )
 
 
 def setup_cognito(app: FastAPI) -> None:
@@ -37,9 +145,52 @@ def setup_cognito(app: FastAPI) -> None:
     Args:
         app (FastAPI): The FastAPI application instance.
 
-    Initializes the AWS Cognito client and assigns it to the application state.
+    Initializes the AWS Cognito client and assigns it to the application state,
+    wrapped in an async adapter with its own bounded thread pool.
+    """
+    client = boto3.client("cognito-idp", region_name=app.state.REGION or "us-east-1")
+    app.state.cognito_client = AsyncClientAdapter(
+        client, "cognito", app.state.cognito_max_workers
+    )
+    app.state.backends["cognito"] = app.state.cognito_client
+
+
+def setup_token_verifier(app: FastAPI) -> None:
+    """
+    Set up verification of bearer tokens.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    When the Cognito user pool and region are configured, its access tokens
+    are verified locally against the pool's JWKS, which the caller refreshes
+    in the background with ``app.state.token_verifier.jwks``, and no other
+    tokens are accepted. Otherwise login issues HS256 tokens signed with
+    SECRET_KEY. Up to AUTH_TOKEN_CACHE_SIZE verified tokens are cached until
+    they expire.
+
+    Raises:
+        ValueError: If neither the user pool nor SECRET_KEY is configured.
     """
-    app.state.cognito_client = boto3.client("cognito-idp", region_name=app.state.REGION)
+    jwks = None
+    issuer = None
+    if app.state.USER_POOL_ID and app.state.REGION:
+        issuer = (
+            f"https://cognito-idp.{app.state.REGION}.amazonaws.com/"
+            f"{app.state.USER_POOL_ID}"
+        )
+        jwks = JWKSCache(
+            f"{issuer}/.well-known/jwks.json", app.state.jwks_refresh_interval
+        )
+    elif not app.state.SECRET_KEY:
+        raise ValueError("SECRET_KEY must be set when no Cognito user pool is set")
+    app.state.token_verifier = TokenVerifier(
+        jwks,
+        issuer,
+        app.state.CLIENT_ID,
+        None if jwks is not None else app.state.SECRET_KEY,
+        app.state.auth_token_cache_size,
+    )
 
 
 def setup_pinecone(app: FastAPI) -> None:
@@ -50,20 +201,74 @@ def setup_pinecone(app: FastAPI) -> None:
         app (FastAPI): The FastAPI application instance.
 
     Initializes the Pinecone client and creates the index if it does not exist.
+    The index is wrapped in an async adapter with its own bounded thread pool.
     """
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     PINECONE_ENV = os.getenv("PINECONE_ENV")
     pc = Pinecone(api_key=PINECONE_API_KEY, environment=PINECONE_ENV, pool_threads=10)
     pinecone_index_name = "tek-ocr-embeddings"
+    app.state.pinecone_index_name = pinecone_index_name
 
     if pinecone_index_name not in pc.list_indexes().names():
         pc.create_index(
             name=pinecone_index_name,
-            dimension=1536,  # The dimension of the embeddings
+            dimension=app.state.embedding_dimension,
             metric="dotproduct",  # Similarity metric
             spec=ServerlessSpec(cloud="aws", region="us-east-1"),
         )
-    app.state.pinecone_index = pc.Index(pinecone_index_name)
+    app.state.pinecone_index = AsyncClientAdapter(
+        pc.Index(pinecone_index_name), "pinecone", app.state.pinecone_max_workers
+    )
+    app.state.backends["pinecone"] = app.state.pinecone_index
+
+
+def setup_vector_store(app: FastAPI) -> None:
+    """
+    Set up the vector store selected by the VECTOR_STORE setting.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    "pinecone" uses the remote Pinecone index; "local" keeps vectors in an
+    in-process memory-mapped matrix under LOCAL_VECTOR_STORE_PATH.
+
+    Page manifests are scoped to the backend, its index and INDEX_VERSION, so
+    switching stores, or bumping INDEX_VERSION after emptying an index, makes
+    the next ingestion write every page instead of skipping it.
+
+    Raises:
+        ValueError: If the configured backend is unknown.
+    """
+    backend = app.state.vector_store_backend
+    if backend == "pinecone":
+        setup_pinecone(app)
+        app.state.vector_store = PineconeVectorStore(app.state.pinecone_index)
+        index = app.state.pinecone_index_name
+    elif backend == "local":
+        app.state.vector_store = LocalVectorStore(
+            app.state.local_vector_store_path,
+            app.state.embedding_dimension,
+            app.state.local_vector_store_dtype,
+        )
+        index = os.path.abspath(app.state.local_vector_store_path)
+    else:
+        raise ValueError(f"Unknown vector store backend: {backend}")
+    app.state.manifest_scope = f"{backend}:{index}:{app.state.index_version}"
+
+
+def setup_content_store(app: FastAPI) -> None:
+    """
+    Set up the store of compressed page text.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    Opens the SQLite database at CONTENT_STORE_PATH, which must be shared
+    between the API and the ingestion workers.
+    """
+    app.state.content_store = ContentStore(
+        app.state.content_store_path, app.state.content_compression_level
+    )
 
 
 def setup_aclient(app: FastAPI) -> None:
@@ -74,8 +279,65 @@ def setup_aclient(app: FastAPI) -> None:
         app (FastAPI): The FastAPI application instance.
 
     Initializes the OpenAI client and assigns it to the application state.
+    The client's own retries are disabled; embedding calls are retried by the
+    embedding scheduler, which also enforces the shared rate limits.
+    """
+    app.state.aclient = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+
+
+def setup_embedder(app: FastAPI) -> None:
     """
-    app.state.aclient = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    Set up the embedding provider selected by the EMBEDDING_PROVIDER setting.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    "openai" calls the OpenAI embeddings API with EMBEDDING_MODEL through the
+    client from ``setup_aclient``; "local" hashes text into embeddings on
+    LOCAL_EMBEDDING_WORKERS processes. Both produce EMBEDDING_DIMENSION values,
+    the dimension the vector store is set up with.
+
+    Raises:
+        ValueError: If the provider is unknown or cannot produce embeddings
+            of the configured dimension.
+    """
+    provider = app.state.embedding_provider
+    if provider == "openai":
+        app.state.embedder = OpenAIEmbeddingProvider(
+            app.state.aclient,
+            app.state.embedding_model,
+            app.state.embedding_dimension,
+        )
+    elif provider == "local":
+        app.state.embedder = HashingEmbeddingProvider(
+            app.state.embedding_dimension, app.state.local_embedding_workers
+        )
+    else:
+        raise ValueError(f"Unknown embedding provider: {provider}")
+
+
+def setup_embedding_scheduler(app: FastAPI) -> None:
+    """
+    Set up the scheduler shared by all outbound embedding calls.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    Calls are admitted by Redis token buckets holding EMBEDDING_RPM requests
+    and EMBEDDING_TPM tokens per minute across all workers, and retried on
+    429, 5xx and connection errors. Both limits default to 0, which skips
+    Redis, for the local embedder. Requires the Redis client and embedder.
+    """
+    app.state.embedding_scheduler = RateLimitScheduler(
+        app.state.redis_client,
+        f"embeddings:{app.state.embedder.model}",
+        requests_per_minute=app.state.embedding_rpm,
+        tokens_per_minute=app.state.embedding_tpm,
+        bulk_reserve=app.state.embedding_bulk_reserve,
+        max_retries=app.state.embedding_max_retries,
+        base_delay=app.state.embedding_retry_base_delay,
+        max_delay=app.state.embedding_retry_max_delay,
+    )
 
 
 async def setup_redis_client(app: FastAPI) -> None:
@@ -94,3 +356,39 @@ async def setup_redis_client(app: FastAPI) -> None:
         decode_responses=True,
     )
     await FastAPILimiter.init(app.state.redis_client)
+
+
+async def setup_s3_client(app: FastAPI) -> None:
+    """
+    Set up the S3 client shared by all requests and the upload index.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    The client keeps up to S3_MAX_POOL_CONNECTIONS connections alive for
+    S3_KEEPALIVE_TIMEOUT seconds, so uploads reuse warm connections instead
+    of opening a session per request. Requires the Redis client, which holds
+    the index of uploaded object keys. Close it with ``close_s3_client``.
+    """
+    session = aioboto3.Session(region_name=os.getenv("AWS_REGION"))
+    config = AioConfig(
+        max_pool_connections=app.state.s3_max_pool_connections,
+        connector_args={"keepalive_timeout": app.state.s3_keepalive_timeout},
+    )
+    app.state.s3_exit_stack = AsyncExitStack()
+    app.state.s3_client = await app.state.s3_exit_stack.enter_async_context(
+        session.client("s3", config=config)
+    )
+    app.state.upload_index = UploadIndex(
+        app.state.redis_client, app.state.upload_index_prefix
+    )
+
+
+async def close_s3_client(app: FastAPI) -> None:
+    """
+    Close the S3 client and its connection pool.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+    """
+    await app.state.s3_exit_stack.aclose()
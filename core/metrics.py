@@ -0,0 +1,449 @@
+import bisect
+import time
+from contextvars import ContextVar
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from types import TracebackType
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+# Upper bounds, in seconds, of the latency histogram buckets
+BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+# Time spent in each stage by the current request, for its Server-Timing header
+request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with fixed buckets.
+
+    Attributes:
+        buckets (Sequence[float]): The bucket upper bounds, ascending.
+        counts (List[int]): Observations per bucket, plus one overflow bucket;
+            not cumulative.
+        sum (float): The sum of all observations.
+        count (int): The number of observations.
+    """
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one observation.
+
+        Args:
+            value (float): The observed value, in seconds.
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Stage:
+    """
+    Times one stage of request handling, e.g. an embedding call.
+
+    Use as ``with metrics.stage("embed"): ...``; the stage may contain
+    awaits. On exit the duration is added to the stage's histogram and to
+    the current request's Server-Timing entry.
+    """
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics: "Metrics", name: str) -> None:
+        self.metrics = metrics
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> None:
+        in_flight = self.metrics.in_flight
+        in_flight[self.name] = in_flight.get(self.name, 0) + 1
+        self.start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        elapsed = time.perf_counter() - self.start
+        self.metrics.in_flight[self.name] -= 1
+        histogram = self.metrics.stages.get(self.name)
+        if histogram is None:
+            histogram = self.metrics.stages[self.name] = Histogram()
+        histogram.observe(elapsed)
+        timings = request_timings.get()
+        if timings is not None:
+            timings[self.name] = timings.get(self.name, 0.0) + elapsed
+
+
+class Metrics:
+    """
+    In-process registry of stage latencies, request latencies and cache
+    lookups, rendered in the Prometheus text format.
+
+    Recording is a few dictionary updates, with no locks or I/O, so it is
+    cheap enough for every cache lookup. Each worker process keeps its own
+    registry; Prometheus scrapes every worker.
+
+    Attributes:
+        stages (dict): The latency histogram of each stage.
+        in_flight (dict): The number of calls currently in each stage.
+        requests (dict): The latency histogram per method, route and status.
+        requests_in_flight (int): HTTP requests currently being handled.
+        lookups (dict): Cache lookups per ``(cache, result)``.
+        failures (dict): Failed operations per operation name.
+    """
+
+    def __init__(self) -> None:
+        self.stages: Dict[str, Histogram] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.requests: Dict[Tuple[str, str, str], Histogram] = {}
+        self.requests_in_flight = 0
+        self.lookups: Dict[Tuple[str, str], int] = {}
+        self.failures: Dict[str, int] = {}
+
+    def stage(self, name: str) -> Stage:
+        """
+        Time a stage of request handling.
+
+        Args:
+            name (str): The stage name, used as a metric label and as the
+                Server-Timing metric name.
+
+        Returns:
+            Stage: A context manager timing its body.
+        """
+        return Stage(self, name)
+
+    def record_lookups(self, cache: str, result: str, count: int = 1) -> None:
+        """
+        Count cache lookups with the same outcome.
+
+        Args:
+            cache (str): The cache name, e.g. "query" or "embedding".
+            result (str): "local_hit", "hit" or "miss".
+            count (int): The number of lookups.
+        """
+        if count:
+            key = (cache, result)
+            self.lookups[key] = self.lookups.get(key, 0) + count
+
+    def record_failures(self, operation: str, count: int = 1) -> None:
+        """
+        Count failed operations, in place of logging each one.
+
+        Args:
+            operation (str): The operation name, e.g. "batch_query".
+            count (int): The number of failures.
+        """
+        if count:
+            self.failures[operation] = self.failures.get(operation, 0) + count
+
+    def record_request(
+        self, method: str, route: str, status: int, elapsed: float
+    ) -> None:
+        """
+        Record the latency of a handled HTTP request.
+
+        Args:
+            method (str): The HTTP method.
+            route (str): The route path template, so IDs don't add labels.
+            status (int): The response status code.
+            elapsed (float): The handling time in seconds.
+        """
+        key = (method, route, str(status))
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = Histogram()
+        histogram.observe(elapsed)
+
+    def render(self) -> List[str]:
+        """
+        Render the recorded metrics in the Prometheus text format.
+
+        Returns:
+            list: The exposition lines.
+        """
+        lines: List[str] = []
+        add_histograms(
+            lines,
+            "tekocr_stage_duration_seconds",
+            "Time spent in each stage of request handling.",
+            [({"stage": name}, h) for name, h in sorted(self.stages.items())],
+        )
+        add_family(
+            lines,
+            "tekocr_stage_in_flight",
+            "gauge",
+            "Calls currently in each stage.",
+            [({"stage": name}, n) for name, n in sorted(self.in_flight.items())],
+        )
+        add_histograms(
+            lines,
+            "tekocr_http_request_duration_seconds",
+            "Time to handle HTTP requests, until the response body is sent.",
+            [
+                ({"method": method, "route": route, "status": status}, h)
+                for (method, route, status), h in sorted(self.requests.items())
+            ],
+        )
+        add_family(
+            lines,
+            "tekocr_http_requests_in_flight",
+            "gauge",
+            "HTTP requests currently being handled.",
+            [({}, self.requests_in_flight)],
+        )
+        add_family(
+            lines,
+            "tekocr_cache_lookups_total",
+            "counter",
+            "Cache lookups by outcome; local hits are served in-process.",
+            [
+                ({"cache": cache, "result": result}, count)
+                for (cache, result), count in sorted(self.lookups.items())
+            ],
+        )
+        totals: Dict[str, List[int]] = {}
+        for (cache, result), count in self.lookups.items():
+            total = totals.setdefault(cache, [0, 0])
+            total[0] += count if result != "miss" else 0
+            total[1] += count
+        add_family(
+            lines,
+            "tekocr_cache_hit_ratio",
+            "gauge",
+            "Fraction of cache lookups served from either tier.",
+            [
+                ({"cache": cache}, hits / lookups)
+                for cache, (hits, lookups) in sorted(totals.items())
+            ],
+        )
+        add_family(
+            lines,
+            "tekocr_failures_total",
+            "counter",
+            "Failed operations whose errors are returned rather than logged.",
+            [
+                ({"operation": operation}, count)
+                for operation, count in sorted(self.failures.items())
+            ],
+        )
+        return lines
+
+
+metrics = Metrics()
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def add_family(
+    lines: List[str],
+    name: str,
+    kind: str,
+    help: str,
+    samples: Sequence[Tuple[Dict[str, str], float]],
+) -> None:
+    """
+    Append a counter or gauge family to exposition lines.
+
+    Args:
+        lines (list): The exposition lines.
+        name (str): The metric name.
+        kind (str): "counter" or "gauge".
+        help (str): The metric description.
+        samples (Sequence[tuple]): The ``(labels, value)`` of each series.
+    """
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{format_labels(labels)} {value}")
+
+
+def add_histograms(
+    lines: List[str],
+    name: str,
+    help: str,
+    samples: Sequence[Tuple[Dict[str, str], Histogram]],
+) -> None:
+    """
+    Append a histogram family to exposition lines.
+
+    Args:
+        lines (list): The exposition lines.
+        name (str): The metric name.
+        help (str): The metric description.
+        samples (Sequence[tuple]): The ``(labels, histogram)`` of each series.
+    """
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, histogram in samples:
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            bucket = format_labels({**labels, "le": str(bound)})
+            lines.append(f"{name}_bucket{bucket} {cumulative}")
+        bucket = format_labels({**labels, "le": "+Inf"})
+        lines.append(f"{name}_bucket{bucket} {histogram.count}")
+        lines.append(f"{name}_sum{format_labels(labels)} {histogram.sum}")
+        lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+
+
+def render_metrics(app: FastAPI) -> str:
+    """
+    Render this worker's metrics, including the state of its clients and
+    caches, in the Prometheus text format.
+
+    Args:
+        app (FastAPI): The FastAPI application instance.
+
+    Returns:
+        str: The exposition text.
+    """
+    state = app.state
+    lines = metrics.render()
+
+    backends = {
+        name: backend.stats() for name, backend in sorted(state.backends.items())
+    }
+    for field, kind, help in (
+        ("in_flight", "gauge", "Calls running on the backend's thread pool."),
+        ("waiting", "gauge", "Calls queued for a free thread."),
+        ("peak_waiting", "gauge", "The longest queue seen."),
+        ("max_workers", "gauge", "The size of the backend's thread pool."),
+        ("completed", "counter", "Calls finished, successfully or not."),
+        ("failed", "counter", "Calls that raised an exception."),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        add_family(
+            lines,
+            f"tekocr_backend_{field}{suffix}",
+            kind,
+            help,
+            [({"backend": name}, stats[field]) for name, stats in backends.items()],
+        )
+
+    semantic = state.semantic_cache.stats()
+    add_family(
+        lines,
+        "tekocr_semantic_cache_lookups_total",
+        "counter",
+        "Query lookups answered by exact, near-identical or no cached results.",
+        [
+            ({"result": result}, semantic[field])
+            for result, field in (
+                ("hit", "hits"),
+                ("near_hit", "near_hits"),
+                ("miss", "misses"),
+            )
+        ],
+    )
+    add_family(
+        lines,
+        "tekocr_semantic_cache_entries",
+        "gauge",
+        "Queries held by the semantic cache.",
+        [({}, semantic["entries"])],
+    )
+    add_family(
+        lines,
+        "tekocr_semantic_cache_hit_ratio",
+        "gauge",
+        "Fraction of query lookups answered from cached results.",
+        [({}, semantic["hit_rate"])],
+    )
+
+    scheduler = state.embedding_scheduler.stats()
+    add_family(
+        lines,
+        "tekocr_embedding_throttled_total",
+        "counter",
+        "Embedding calls delayed by the shared rate limits.",
+        [({}, scheduler["throttled"])],
+    )
+    add_family(
+        lines,
+        "tekocr_embedding_retries_total",
+        "counter",
+        "Embedding calls retried after a transient failure.",
+        [({}, scheduler["retries"])],
+    )
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request and reporting its stages.
+
+    The time spent in each stage while handling a request is sent in the
+    response's ``Server-Timing`` header, together with the total handling
+    time up to the headers, when ``app.state.server_timing`` is set.
+    Stages of a streamed body run after the headers are sent, so they only
+    appear in ``/metrics``.
+
+    Being plain ASGI rather than ``BaseHTTPMiddleware``, it adds no task or
+    body buffering to streamed responses.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        token = request_timings.set(timings)
+        status = 500
+        server_timing = getattr(scope["app"].state, "server_timing", True)
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if server_timing:
+                    timings["total"] = time.perf_counter() - start
+                    value = ", ".join(
+                        f"{name};dur={seconds * 1000:.2f}"
+                        for name, seconds in timings.items()
+                    )
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", value.encode()))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        metrics.requests_in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.requests_in_flight -= 1
+            request_timings.reset(token)
+            route: Any = scope.get("route")
+            metrics.record_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status,
+                time.perf_counter() - start,
+            )
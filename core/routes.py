@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+from core.metrics import render_metrics
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(request: Request) -> PlainTextResponse:
+    """
+    Expose this worker's metrics for Prometheus to scrape.
+
+    Args:
+        request (Request): The FastAPI request object.
+
+    Returns:
+        PlainTextResponse: The metrics in the Prometheus text format.
+    """
+    return PlainTextResponse(
+        render_metrics(request.app), media_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,85 @@
+import asyncio
+import os
+from celery import Celery
+from fastapi import FastAPI
+from typing import Awaitable, Callable, Optional, TypeVar
+from core.config import (
+    setup_env,
+    setup_vector_store,
+    setup_content_store,
+    setup_aclient,
+    setup_embedder,
+    setup_redis_client,
+    setup_embedding_scheduler,
+)
+from caching.cache import init_cache
+
+T = TypeVar("T")
+
+celery_app = Celery(
+    "tek_ocr",
+    broker=os.getenv(
+        "CELERY_BROKER_URL",
+        f"redis://{os.getenv('REDIS_HOST', 'localhost')}:"
+        f"{os.getenv('REDIS_PORT', 6379)}/1",
+    ),
+    include=["ocr.tasks"],
+)
+celery_app.conf.update(
+    task_acks_late=True,
+    task_ignore_result=True,
+    worker_prefetch_multiplier=1,
+)
+
+_worker_app: Optional[FastAPI] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_in_worker(func: Callable[[FastAPI], Awaitable[T]]) -> T:
+    """
+    Run a coroutine against the worker process's application state.
+
+    The first call sets up the same clients the API uses, through the
+    ``core.config.setup_*`` functions, on a FastAPI instance used only as a
+    state container. The clients and their connection pools are bound to one
+    event loop, which is kept for the lifetime of the worker process. If any
+    setup step fails, nothing is kept and the next call sets up again.
+
+    Args:
+        func (callable): Called with the worker application state holder;
+            its result is awaited on the worker event loop.
+
+    Returns:
+        The coroutine's result.
+
+    Raises:
+        ValueError: If the local vector store is configured; it belongs to
+            the API process, so background ingestion needs Pinecone.
+    """
+    global _worker_app, _worker_loop
+    if _worker_app is None or _worker_loop is None:
+        app = FastAPI()
+        setup_env(app)
+        if app.state.vector_store_backend == "local":
+            raise ValueError(
+                "Background ingestion is not available with VECTOR_STORE=local"
+            )
+        # Celery's pool processes are daemonic and cannot start the local
+        # embedder's process pool, so it embeds in a thread instead
+        app.state.local_embedding_workers = 0
+        loop = asyncio.new_event_loop()
+        try:
+            setup_vector_store(app)
+            setup_content_store(app)
+            setup_aclient(app)
+            setup_embedder(app)
+            loop.run_until_complete(setup_redis_client(app))
+            setup_embedding_scheduler(app)
+            init_cache(app)
+        except BaseException:
+            # Keep the worker unset, so the next task retries the setup
+            loop.close()
+            raise
+        _worker_loop = loop
+        _worker_app = app
+    return _worker_loop.run_until_complete(func(_worker_app))
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from typing import List, Sequence
+
+
+class EmbeddingProvider(ABC):
+    """
+    Interface of the embedding models used for OCR pages and queries.
+
+    Attributes:
+        model (str): The name of the model.
+        dimension (int): The length of every embedding returned.
+        identity (str): The model and, where it can vary, the dimension, used
+            in cache keys and page hashes so embeddings from different models
+            or of different sizes are never mixed.
+    """
+
+    model: str
+    dimension: int
+    identity: str
+
+    @abstractmethod
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """
+        Embed several texts in one batch.
+
+        Args:
+            texts (Sequence[str]): The texts to embed.
+
+        Returns:
+            list: One embedding per text, in input order.
+        """
+
+    def close(self) -> None:
+        """
+        Release the resources held by the provider.
+        """
@@ -0,0 +1,100 @@
+import asyncio
+import functools
+import hashlib
+import math
+import re
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from embedding.base import EmbeddingProvider
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+# Batches with fewer characters are embedded inline; a process pool round
+# trip costs more than hashing a short query
+INLINE_MAX_CHARS = 4096
+
+
+@functools.lru_cache(maxsize=1 << 18)
+def _feature(token: str, dimension: int) -> Tuple[int, float]:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dimension, 1.0 if value >> 63 else -1.0
+
+
+def hash_embed(texts: Sequence[str], dimension: int) -> List[List[float]]:
+    """
+    Embed texts by hashing their words and word bigrams into a fixed space.
+
+    Each feature is mapped by a stable hash to one dimension and a sign, term
+    frequencies are damped logarithmically, and every vector is normalized to
+    unit length, so dot products are cosine similarities.
+
+    Args:
+        texts (Sequence[str]): The texts to embed.
+        dimension (int): The embedding dimension.
+
+    Returns:
+        list: One embedding per text, in input order.
+    """
+    embeddings = np.zeros((len(texts), dimension), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = TOKEN_PATTERN.findall(text.lower())
+        counts: Dict[str, int] = {}
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            counts[feature] = counts.get(feature, 0) + 1
+        for feature, count in counts.items():
+            index, sign = _feature(feature, dimension)
+            embeddings[row, index] += sign * (1.0 + math.log(count))
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    embeddings /= np.maximum(norms, 1e-12)
+    vectors: List[List[float]] = embeddings.tolist()
+    return vectors
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """
+    Embedding provider computing feature-hashing embeddings on local CPUs.
+
+    No network calls are made, so it suits air-gapped deployments and
+    offline load tests. Large batches are split across a process pool; small
+    ones, such as single queries, are embedded in a thread to avoid the
+    inter-process round trip.
+
+    Attributes:
+        model (str): The model name, which includes the dimension.
+        dimension (int): The embedding dimension.
+        identity (str): The model name.
+        workers (int): The number of worker processes; 0 embeds every batch
+            in a thread instead, as required inside daemonic worker processes.
+    """
+
+    def __init__(self, dimension: int, workers: int) -> None:
+        self.model = f"local-hashing-{dimension}"
+        self.dimension = dimension
+        self.identity = self.model
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = (
+            ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+        )
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        texts = list(texts)
+        if self._pool is None or sum(map(len, texts)) <= INLINE_MAX_CHARS:
+            return await asyncio.to_thread(hash_embed, texts, self.dimension)
+
+        loop = asyncio.get_running_loop()
+        size = math.ceil(len(texts) / self.workers)
+        chunks = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self._pool, hash_embed, texts[start:start + size], self.dimension
+                )
+                for start in range(0, len(texts), size)
+            )
+        )
+        return [vector for chunk in chunks for vector in chunk]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
@@ -0,0 +1,43 @@
+from openai import AsyncOpenAI
+from typing import Any, Dict, List, Sequence
+from embedding.base import EmbeddingProvider
+
+# Models with a fixed output size, which reject the ``dimensions`` parameter
+FIXED_DIMENSIONS = {"text-embedding-ada-002": 1536}
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """
+    Embedding provider calling the OpenAI embeddings API.
+
+    Models that support shortened embeddings are asked for ``dimension``
+    values directly; fixed-size models must match it.
+
+    Attributes:
+        client (AsyncOpenAI): The OpenAI client.
+        model (str): The embedding model name.
+        dimension (int): The embedding dimension.
+        identity (str): The model name, with the dimension for models whose
+            output size is configurable.
+    """
+
+    def __init__(self, client: AsyncOpenAI, model: str, dimension: int) -> None:
+        fixed = FIXED_DIMENSIONS.get(model)
+        if fixed is not None and fixed != dimension:
+            raise ValueError(
+                f"{model} embeddings have {fixed} dimensions, not {dimension}"
+            )
+        self.client = client
+        self.model = model
+        self.dimension = dimension
+        self.identity = model if fixed is not None else f"{model}:{dimension}"
+
+    async def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        options: Dict[str, Any] = {}
+        if self.model not in FIXED_DIMENSIONS:
+            options["dimensions"] = self.dimension
+        response = await self.client.embeddings.create(
+            input=list(texts), model=self.model, **options
+        )
+        data = sorted(response.data, key=lambda item: item.index)
+        return [item.embedding for item in data]
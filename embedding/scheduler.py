@@ -0,0 +1,223 @@
+import asyncio
+import random
+import openai
+import redis.asyncio as redis
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+PRIORITIES = ("interactive", "bulk")
+
+# Seconds of traffic each bucket can absorb as a burst
+BURST_SECONDS = 10
+
+# Refills the request and token buckets, then either takes the cost from both
+# and returns 0 or leaves them untouched and returns the milliseconds to wait.
+# ARGV: request rate/ms, capacity, cost, token rate/ms, capacity, cost, and
+# the fraction of each bucket the caller must leave for higher priorities.
+ACQUIRE_SCRIPT = """
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local state = redis.call("HMGET", KEYS[1], "ts", "requests", "tokens")
+local elapsed = math.max(0, now - (tonumber(state[1]) or now))
+local reserve = tonumber(ARGV[7])
+local levels = {}
+local wait = 0
+for i = 0, 1 do
+    local rate = tonumber(ARGV[i * 3 + 1])
+    local capacity = tonumber(ARGV[i * 3 + 2])
+    local cost = tonumber(ARGV[i * 3 + 3])
+    local level = math.min(capacity, (tonumber(state[i + 2]) or capacity)
+        + elapsed * rate)
+    levels[i + 1] = level
+    local needed = cost + reserve * capacity - level
+    if rate > 0 and needed > 0 then
+        wait = math.max(wait, math.ceil(needed / rate))
+    end
+end
+if wait == 0 then
+    levels[1] = levels[1] - tonumber(ARGV[3])
+    levels[2] = levels[2] - tonumber(ARGV[6])
+end
+redis.call("HSET", KEYS[1], "ts", now, "requests", levels[1], "tokens", levels[2])
+redis.call("PEXPIRE", KEYS[1], 60000)
+return wait
+"""
+
+
+def retry_delay(error: Exception) -> Optional[float]:
+    """
+    Return the server-requested delay before retrying a failed call.
+
+    Args:
+        error (Exception): The error raised by the call.
+
+    Returns:
+        Optional[float]: The Retry-After delay in seconds, if one was sent.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return None if value is None else float(value)
+    except ValueError:
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    Whether a failed provider call may succeed when retried.
+
+    Args:
+        error (Exception): The error raised by the call.
+
+    Returns:
+        bool: True for rate limiting (429), server errors (5xx) and
+        connection failures.
+    """
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+class RateLimitScheduler:
+    """
+    Schedules outbound provider calls under limits shared by all workers.
+
+    Each call takes one request and its estimated tokens from two Redis token
+    buckets refilled at the per-minute limits, so every API process and
+    Celery worker together stays under the provider's RPM and TPM. Bulk
+    calls must leave a fraction of both buckets untouched, which keeps
+    capacity free for interactive calls while ingestion saturates the rest.
+
+    Calls failing with 429, 5xx or connection errors are retried with full
+    jitter exponential backoff, honouring any Retry-After header.
+
+    Attributes:
+        redis_client: The Redis client holding the buckets.
+        key (str): The Redis key of the buckets.
+        requests_per_minute (int): The request limit; 0 disables it.
+        tokens_per_minute (int): The token limit; 0 disables it.
+        bulk_reserve (float): The fraction of each bucket bulk calls leave.
+        max_retries (int): Retries after the first attempt.
+        base_delay (float): The first backoff ceiling, in seconds.
+        max_delay (float): The largest backoff ceiling, in seconds.
+        throttled (int): Acquisitions that had to wait for the buckets.
+        retries (int): Calls retried after a retryable error.
+    """
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        bulk_reserve: float,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float,
+    ) -> None:
+        self.redis_client = redis_client
+        self.key = f"ratelimit:{name}"
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.bulk_reserve = bulk_reserve
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.throttled = 0
+        self.retries = 0
+
+    @staticmethod
+    def _bucket(
+        per_minute: int, cost: int, reserve: float
+    ) -> Tuple[float, float, float]:
+        if per_minute <= 0:
+            return 0.0, 0.0, 0.0
+        capacity = per_minute * BURST_SECONDS / 60
+        # A call larger than the usable bucket would otherwise never fit
+        return per_minute / 60000, capacity, min(cost, capacity * (1 - reserve))
+
+    async def acquire(self, tokens: int, priority: str = "interactive") -> None:
+        """
+        Wait until the shared buckets admit a call.
+
+        Redis errors are logged and the call is admitted, so an unavailable
+        Redis never blocks embedding.
+
+        Args:
+            tokens (int): The estimated tokens of the call.
+            priority (str): "interactive" or "bulk".
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        if self.requests_per_minute <= 0 and self.tokens_per_minute <= 0:
+            return
+        reserve = self.bulk_reserve if priority == "bulk" else 0.0
+        args = [
+            str(value)
+            for value in (
+                *self._bucket(self.requests_per_minute, 1, reserve),
+                *self._bucket(self.tokens_per_minute, tokens, reserve),
+                reserve,
+            )
+        ]
+        while True:
+            try:
+                wait_ms = await self.redis_client.eval(  # type: ignore[misc]
+                    ACQUIRE_SCRIPT, 1, self.key, *args
+                )
+            except Exception as e:
+                print(f"Rate limiter unavailable, admitting call: {e}")
+                return
+            if not wait_ms:
+                return
+            self.throttled += 1
+            # Jitter keeps workers woken by the same refill from colliding
+            await asyncio.sleep(int(wait_ms) / 1000 * random.uniform(1.0, 1.25))
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        tokens: int,
+        priority: str = "interactive",
+    ) -> T:
+        """
+        Run a provider call once the buckets admit it, retrying failures.
+
+        Args:
+            call (callable): Makes the provider call; invoked once per attempt.
+            tokens (int): The estimated tokens of the call.
+            priority (str): "interactive" or "bulk".
+
+        Returns:
+            The call's result.
+
+        Raises:
+            Exception: The last error, once retries are exhausted or the
+            error is not retryable.
+        """
+        attempt = 0
+        while True:
+            await self.acquire(tokens, priority)
+            try:
+                return await call()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                ceiling = min(self.max_delay, self.base_delay * 2**attempt)
+                delay = retry_delay(e) or random.uniform(0, ceiling)
+                attempt += 1
+                self.retries += 1
+                print(f"Retrying provider call in {delay:.2f}s ({attempt}): {e}")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the throttling and retry counters.
+
+        Returns:
+            dict: The number of throttled acquisitions and retried calls.
+        """
+        return {"throttled": self.throttled, "retries": self.retries}
@@ -0,0 +1,177 @@
+import asyncio
+import redis.asyncio as redis
+from typing import Any, List, Sequence
+from core.metrics import metrics
+from files.utils import bucket_name, file_exists
+
+# Keys per Redis command when adding to or rebuilding the index
+INDEX_CHUNK_SIZE = 1000
+
+# How long a rebuild may go without listing a page before keys added by
+# uploads stop being journaled for it, in seconds
+REBUILD_TTL = 600
+
+# Adds keys to the index and, while a rebuild runs, to its journal
+ADD_SCRIPT = """
+redis.call("sadd", KEYS[1], unpack(ARGV))
+if redis.call("exists", KEYS[2]) == 1 then
+    redis.call("sadd", KEYS[3], unpack(ARGV))
+end
+return 0
+"""
+
+# Merges the keys added during a rebuild and replaces the index with it
+REPLACE_SCRIPT = """
+redis.call("sunionstore", KEYS[1], KEYS[1], KEYS[3])
+if redis.call("exists", KEYS[1]) == 1 then
+    redis.call("rename", KEYS[1], KEYS[2])
+else
+    redis.call("del", KEYS[2])
+end
+redis.call("del", KEYS[3], KEYS[4])
+return 0
+"""
+
+
+class UploadIndex:
+    """
+    Redis set of the object keys already uploaded to the file bucket.
+
+    Object keys start with the MD5 of the file content, so membership tells
+    whether a file's content was uploaded under its name. Checking a whole
+    batch of files is one SMISMEMBER instead of one HEAD request per file.
+    The index is rebuilt from a listing of the bucket by ``reconcile``, so
+    objects written or deleted by other tools are picked up. A key missing
+    from the index only costs an idempotent re-upload of identical content.
+
+    Each prefix has its own index, so workers indexing different prefixes
+    never replace each other's keys.
+
+    Attributes:
+        redis_client: The Redis client holding the index.
+        key (str): The Redis key of the index set.
+        prefix (str): Only objects under this key prefix are indexed.
+    """
+
+    def __init__(self, redis_client: redis.Redis, prefix: str = "") -> None:
+        self.redis_client = redis_client
+        self.key = f"s3:uploaded:{bucket_name}"
+        if prefix:
+            self.key += f":{prefix}"
+        self.prefix = prefix
+
+    async def contains_many(
+        self, s3_client: Any, file_keys: Sequence[str]
+    ) -> List[bool]:
+        """
+        Check which object keys were already uploaded.
+
+        If Redis is unavailable, each key is checked with a HEAD request.
+
+        Args:
+            s3_client: The S3 client, used when Redis is unavailable.
+            file_keys (Sequence[str]): The object keys to check.
+
+        Returns:
+            list: Whether each object key is already uploaded.
+        """
+        if not file_keys:
+            return []
+        try:
+            with metrics.stage("upload_index"):
+                found: List[int] = await self.redis_client.smismember(
+                    self.key, list(file_keys)
+                )  # type: ignore[misc]
+            hits = sum(bool(member) for member in found)
+            metrics.record_lookups("upload_index", "hit", hits)
+            metrics.record_lookups("upload_index", "miss", len(found) - hits)
+            return [bool(member) for member in found]
+        except redis.RedisError as e:
+            print(f"Upload index unavailable, checking S3 directly: {e}")
+            return list(
+                await asyncio.gather(
+                    *(file_exists(s3_client, file_key) for file_key in file_keys)
+                )
+            )
+
+    async def add_many(self, file_keys: Sequence[str]) -> None:
+        """
+        Record newly uploaded object keys under the prefix.
+
+        Keys added while the index is being rebuilt are also journaled, so
+        the rebuilt index keeps them even if the listing missed them.
+
+        Args:
+            file_keys (Sequence[str]): The object keys.
+        """
+        file_keys = [key for key in file_keys if key.startswith(self.prefix)]
+        if not file_keys:
+            return
+        try:
+            for start in range(0, len(file_keys), INDEX_CHUNK_SIZE):
+                await self.redis_client.eval(  # type: ignore[misc]
+                    ADD_SCRIPT,
+                    3,
+                    self.key,
+                    f"{self.key}:rebuilding",
+                    f"{self.key}:added",
+                    *file_keys[start:start + INDEX_CHUNK_SIZE],
+                )
+        except redis.RedisError as e:
+            print(f"Failed to update upload index: {e}")
+
+    async def reconcile(self, s3_client: Any) -> int:
+        """
+        Rebuild the index from a listing of the bucket under the prefix.
+
+        The listing is written to a staging set that atomically replaces the
+        index, so lookups never see a partial index. Keys recorded by
+        ``add_many`` while the bucket is listed are merged into it first.
+
+        Args:
+            s3_client: The S3 client instance.
+
+        Returns:
+            int: The number of indexed objects.
+        """
+        staging = f"{self.key}:rebuild"
+        rebuilding = f"{self.key}:rebuilding"
+        added = f"{self.key}:added"
+        await self.redis_client.delete(staging, added)
+        await self.redis_client.set(rebuilding, 1, ex=REBUILD_TTL)
+        count = 0
+        paginator = s3_client.get_paginator("list_objects_v2")
+        async for page in paginator.paginate(Bucket=bucket_name, Prefix=self.prefix):
+            file_keys = [item["Key"] for item in page.get("Contents", [])]
+            for start in range(0, len(file_keys), INDEX_CHUNK_SIZE):
+                chunk = file_keys[start:start + INDEX_CHUNK_SIZE]
+                await self.redis_client.sadd(staging, *chunk)  # type: ignore[misc]
+            await self.redis_client.expire(rebuilding, REBUILD_TTL)
+            count += len(file_keys)
+        await self.redis_client.eval(  # type: ignore[misc]
+            REPLACE_SCRIPT, 4, staging, self.key, added, rebuilding
+        )
+        return count
+
+    async def reconcile_periodically(self, s3_client: Any, interval: float) -> None:
+        """
+        Reconcile the index every ``interval`` seconds until cancelled.
+
+        A Redis lock held for the interval lets only one of the API workers
+        list the bucket each period.
+
+        Args:
+            s3_client: The S3 client instance.
+            interval (float): The seconds between reconciliations.
+        """
+        lock = f"{self.key}:reconcile"
+        while True:
+            try:
+                if await self.redis_client.set(
+                    lock, 1, nx=True, ex=max(1, int(interval))
+                ):
+                    count = await self.reconcile(s3_client)
+                    print(f"Upload index reconciled: {count} objects")
+            except Exception as e:
+                print(f"Upload index reconciliation failed: {e}")
+            await asyncio.sleep(interval)
@@ -1,10 +1,9 @@
-from fastapi import APIRouter, Depends
-from files.utils import upload_file_async
+from fastapi import APIRouter, Depends, Request
+from files.index import UploadIndex
+from files.utils import ByteLimiter, get_file_key, upload_file_async
 from files.models import FileLocations
 from auth.utils import get_current_user
-import os
 import asyncio
-import aioboto3
 from typing import Dict, List
 
 file_router = APIRouter()
@@ -12,12 +11,22 @@ file_router = APIRouter()
 
 @file_router.post("/upload-files/")
 async def upload_files(
-    file_locations: FileLocations, current_user: str = Depends(get_current_user)
+    request: Request,
+    file_locations: FileLocations,
+    current_user: str = Depends(get_current_user),
 ) -> Dict[str, List[str]]:
     """
     Endpoint to upload multiple files and get signed URLs.
 
+    All files are hashed first, and the upload index answers which of them
+    are already in the bucket with a single Redis lookup. The remaining
+    files are uploaded concurrently through the shared S3 client, each in
+    parts of ``UPLOAD_PART_SIZE`` bytes with up to ``UPLOAD_PART_CONCURRENCY``
+    parts in flight, and all files of the request together hold at most
+    ``UPLOAD_MAX_INFLIGHT_BYTES`` of file data in memory.
+
     Args:
+        request (Request): The FastAPI request object.
         file_locations (FileLocations): A list of file locations
         with paths and optional descriptions.
         current_user (str): The username of the currently authenticated user.
@@ -25,17 +34,39 @@ async def upload_files(
     Returns:
         dict: A dictionary containing the signed URLs of the uploaded files.
     """
-    signed_urls = []
+    state = request.app.state
+    s3_client = state.s3_client
+    upload_index: UploadIndex = state.upload_index
+    limiter = ByteLimiter(state.upload_max_inflight_bytes)
+    paths = [file_path.path for file_path in file_locations.files]
+
+    file_keys = await asyncio.gather(
+        *(get_file_key(path, limiter, state.upload_part_size) for path in paths)
+    )
+    uploaded = await upload_index.contains_many(s3_client, file_keys)
 
-    session = aioboto3.Session(region_name=os.getenv("AWS_REGION"))
-    async with session.client("s3") as s3_client:
-        # Create a list of upload tasks
-        upload_tasks = [
-            upload_file_async(file_path.path, s3_client)
-            for file_path in file_locations.files
-        ]
+    # Create a list of upload tasks for files not uploaded before
+    upload_tasks = [
+        upload_file_async(
+            path,
+            file_key,
+            s3_client,
+            limiter,
+            state.upload_part_size,
+            state.upload_part_concurrency,
+        )
+        for path, file_key, exists in zip(paths, file_keys, uploaded)
+        if not exists
+    ]
 
-        # Await and gather all upload tasks
-        signed_urls = await asyncio.gather(*upload_tasks)
+    # Await and gather all upload tasks
+    urls = iter(await asyncio.gather(*upload_tasks))
+    await upload_index.add_many(
+        [file_key for file_key, exists in zip(file_keys, uploaded) if not exists]
+    )
 
+    signed_urls = [
+        f"File already exists: {file_key}" if exists else next(urls)
+        for file_key, exists in zip(file_keys, uploaded)
+    ]
     return {"signed_urls": signed_urls}
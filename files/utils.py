@@ -1,12 +1,97 @@
+import asyncio
 import hashlib
 import os
+from contextlib import asynccontextmanager
 from fastapi import HTTPException
-from typing import Any
+from typing import Any, AsyncIterator, Dict, List
 import boto3
+from core.metrics import metrics
 
 # AWS S3 Configuration
 bucket_name = "tek-file-bucket"
 
+# S3 rejects multipart parts smaller than this, except the last one
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class ByteLimiter:
+    """
+    Bounds the number of file bytes held in memory by concurrent uploads.
+
+    Every part read from disk reserves its size before the read and releases
+    it once the part is uploaded, so all uploads sharing a limiter together
+    hold at most ``limit`` bytes, however many files or parts are in flight.
+
+    Attributes:
+        limit (int): The maximum number of bytes reserved at once.
+        used (int): The number of bytes currently reserved.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def reserve(self, size: int) -> AsyncIterator[None]:
+        """
+        Wait until ``size`` bytes are available and hold them.
+
+        A reservation larger than the limit waits for all others to finish,
+        then proceeds alone.
+
+        Args:
+            size (int): The number of bytes to reserve.
+        """
+        size = min(size, self.limit)
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.used + size <= self.limit)
+            self.used += size
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.used -= size
+                self._condition.notify_all()
+
+
+def hash_file(file_path: str, chunk_size: int) -> str:
+    """
+    Compute the MD5 digest of a file, reading it in chunks.
+
+    Blocking; run it in a worker thread. hashlib releases the GIL while
+    hashing large chunks, so several files hash in parallel.
+
+    Args:
+        file_path (str): The path of the file.
+        chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.md5()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_part(file_path: str, offset: int, size: int) -> bytes:
+    """
+    Read one part of a file.
+
+    Args:
+        file_path (str): The path of the file.
+        offset (int): The position of the first byte of the part.
+        size (int): The maximum number of bytes to read.
+
+    Returns:
+        bytes: The part's bytes.
+    """
+    with open(file_path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
 
 async def file_exists(s3_client: boto3.client, file_key: str) -> bool:
     """
@@ -23,7 +108,8 @@ async def file_exists(s3_client: boto3.client, file_key: str) -> bool:
         HTTPException: If an error occurs while checking file existence.
     """
     try:
-        await s3_client.head_object(Bucket=bucket_name, Key=file_key)
+        with metrics.stage("s3_head"):
+            await s3_client.head_object(Bucket=bucket_name, Key=file_key)
         return True
     except s3_client.exceptions.ClientError as e:
         if e.response["Error"]["Code"] == "404":
@@ -33,36 +119,160 @@ async def file_exists(s3_client: boto3.client, file_key: str) -> bool:
             raise HTTPException(status_code=500, detail="Error checking file existence")
 
 
-async def upload_file_async(file_path: str, s3_client: boto3.client) -> Any:
+async def upload_multipart(
+    file_path: str,
+    file_key: str,
+    size: int,
+    s3_client: boto3.client,
+    limiter: ByteLimiter,
+    part_size: int,
+    concurrency: int,
+) -> None:
     """
-    Upload a file to S3 asynchronously and return a signed URL.
+    Upload a file to S3 as a multipart upload with parts sent concurrently.
+
+    Parts are read from disk off the event loop only when they are about to
+    be sent, so memory is bounded by the limiter rather than the file size.
+    The upload is aborted if any part fails, so no orphaned parts are billed.
 
     Args:
         file_path (str): The path of the file to upload.
+        file_key (str): The object key.
+        size (int): The size of the file in bytes.
         s3_client: The S3 client instance.
+        limiter (ByteLimiter): The limit on bytes in memory shared by the
+            request's uploads.
+        part_size (int): The size of each part but the last.
+        concurrency (int): The maximum number of parts sent at once.
+    """
+    upload = await s3_client.create_multipart_upload(Bucket=bucket_name, Key=file_key)
+    upload_id = upload["UploadId"]
+    offsets = iter(range(0, size, part_size))
+    parts: List[Dict[str, Any]] = []
+
+    async def send_parts() -> None:
+        for offset in offsets:
+            async with limiter.reserve(part_size):
+                body = await asyncio.to_thread(read_part, file_path, offset, part_size)
+                part_number = offset // part_size + 1
+                response = await s3_client.upload_part(
+                    Bucket=bucket_name,
+                    Key=file_key,
+                    PartNumber=part_number,
+                    UploadId=upload_id,
+                    Body=body,
+                )
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+
+    try:
+        try:
+            async with asyncio.TaskGroup() as group:
+                for _ in range(concurrency):
+                    group.create_task(send_parts())
+        except ExceptionGroup as e:
+            raise e.exceptions[0]
+        await s3_client.complete_multipart_upload(
+            Bucket=bucket_name,
+            Key=file_key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": sorted(parts, key=lambda part: part["PartNumber"])
+            },
+        )
+    except BaseException:
+        try:
+            await s3_client.abort_multipart_upload(
+                Bucket=bucket_name, Key=file_key, UploadId=upload_id
+            )
+        except Exception as e:
+            print(f"Failed to abort multipart upload of {file_key}: {e}")
+        raise
+
+
+async def get_file_key(file_path: str, limiter: ByteLimiter, part_size: int) -> str:
+    """
+    Build the S3 object key of a file from its content hash and name.
+
+    The file is hashed in chunks in a worker thread, so neither the file
+    nor the hashing is held in or blocks the event loop.
+
+    Args:
+        file_path (str): The path of the file.
+        limiter (ByteLimiter): The limit on bytes in memory shared by the
+            request's uploads.
+        part_size (int): The hashing chunk size.
 
     Returns:
-        str: The signed URL for the uploaded file.
+        str: The key, ``"<md5>/<file name>"``.
 
     Raises:
-        HTTPException: If the file does not exist or if the upload fails.
+        HTTPException: If the file does not exist or cannot be read.
     """
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=400, detail=f"File not found: {file_path}")
+
+    print(f"Got file path {file_path}")
+
     try:
-        if not os.path.isfile(file_path):
-            raise HTTPException(status_code=400, detail=f"File not found: {file_path}")
+        chunk_size = max(part_size, MIN_PART_SIZE)
+        async with limiter.reserve(chunk_size):
+            with metrics.stage("hash"):
+                file_hash = await asyncio.to_thread(hash_file, file_path, chunk_size)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to read {file_path}: {str(e)}"
+        )
+    return f"{file_hash}/{os.path.basename(file_path)}"
 
-        print(f"Got file path {file_path}")
 
-        # Compute file hash
-        with open(file_path, "rb") as f:
-            file_hash = hashlib.md5(f.read()).hexdigest()
+async def upload_file_async(
+    file_path: str,
+    file_key: str,
+    s3_client: boto3.client,
+    limiter: ByteLimiter,
+    part_size: int,
+    concurrency: int,
+) -> Any:
+    """
+    Upload a file to S3 asynchronously and return a signed URL.
+
+    Files larger than one part are sent as a concurrent multipart upload.
 
-        file_key = f"{file_hash}/{os.path.basename(file_path)}"
+    Args:
+        file_path (str): The path of the file to upload.
+        file_key (str): The object key, from ``get_file_key``.
+        s3_client: The S3 client instance.
+        limiter (ByteLimiter): The limit on bytes in memory shared by the
+            request's uploads.
+        part_size (int): The multipart part size.
+        concurrency (int): The maximum number of parts of the file sent at once.
 
-        if await file_exists(s3_client, file_key):
-            return f"File already exists: {file_key}"
+    Returns:
+        str: The signed URL for the uploaded file.
 
-        await s3_client.upload_file(file_path, bucket_name, file_key)
+    Raises:
+        HTTPException: If the upload fails.
+    """
+    try:
+        part_size = max(part_size, MIN_PART_SIZE)
+        size = os.path.getsize(file_path)
+        with metrics.stage("s3_upload"):
+            if size > part_size:
+                await upload_multipart(
+                    file_path,
+                    file_key,
+                    size,
+                    s3_client,
+                    limiter,
+                    part_size,
+                    concurrency,
+                )
+            else:
+                async with limiter.reserve(size):
+                    body = await asyncio.to_thread(read_part, file_path, 0, size)
+                    await s3_client.put_object(
+                        Bucket=bucket_name, Key=file_key, Body=body
+                    )
 
         signed_url = await s3_client.generate_presigned_url(
             "get_object",
@@ -1,13 +1,22 @@
+import asyncio
 from fastapi import FastAPI
 from auth.routes import auth_router
 from ocr.routes import ocr_router
 from files.routes import file_router
+from core.routes import metrics_router
+from core.metrics import MetricsMiddleware
 from core.config import (
     setup_env,
     setup_cognito,
-    setup_pinecone,
+    setup_token_verifier,
+    setup_vector_store,
+    setup_content_store,
     setup_aclient,
+    setup_embedder,
     setup_redis_client,
+    setup_embedding_scheduler,
+    setup_s3_client,
+    close_s3_client,
 )
 from caching.cache import init_cache
 from contextlib import asynccontextmanager
@@ -30,12 +39,38 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     """
     setup_env(app)
     setup_cognito(app)
-    setup_pinecone(app)
+    setup_token_verifier(app)
+    setup_vector_store(app)
+    setup_content_store(app)
     setup_aclient(app)
+    setup_embedder(app)
     await setup_redis_client(app)
+    setup_embedding_scheduler(app)
     init_cache(app)
+    await setup_s3_client(app)
+    jwks = app.state.token_verifier.jwks
+    refresher = None
+    if jwks is not None:
+        refresher = asyncio.create_task(jwks.refresh_periodically())
+    interval = app.state.upload_index_reconcile_interval
+    reconciler = None
+    if interval > 0:
+        reconciler = asyncio.create_task(
+            app.state.upload_index.reconcile_periodically(
+                app.state.s3_client, interval
+            )
+        )
     yield
+    for task in (refresher, reconciler):
+        if task is not None:
+            task.cancel()
+    await close_s3_client(app)
     await app.state.redis_client.close()
+    app.state.vector_store.close()
+    app.state.content_store.close()
+    app.state.embedder.close()
+    for backend in app.state.backends.values():
+        backend.shutdown()
 
 
 app.router.lifespan_context = lifespan
@@ -44,6 +79,8 @@ app.router.lifespan_context = lifespan
 app.include_router(auth_router, prefix="/auth")
 app.include_router(ocr_router, prefix="/ocr")
 app.include_router(file_router, prefix="/files")
+app.include_router(metrics_router)
+app.add_middleware(MetricsMiddleware)
 
 if __name__ == "__main__":
     import uvicorn
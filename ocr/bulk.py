@@ -0,0 +1,189 @@
+import asyncio
+import posixpath
+import tarfile
+import zipfile
+import aiofiles
+import orjson
+from typing import IO, Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from ocr.ingest import iter_ocr_pages
+
+BulkDocument = Tuple[str, AsyncIterator[Dict[str, Any]]]
+
+
+class ThreadedReader:
+    """
+    Async ``read(size)`` adapter over a blocking file object.
+
+    Reads run in a worker thread, so decompressing archive members never
+    blocks the event loop.
+
+    Attributes:
+        file: The blocking file object.
+    """
+
+    def __init__(self, file: IO[bytes]) -> None:
+        self.file = file
+
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Read up to ``size`` bytes.
+
+        Args:
+            size (int): The maximum number of bytes to read; -1 reads all.
+
+        Returns:
+            bytes: The data read, empty at the end of the file.
+        """
+        return await asyncio.to_thread(self.file.read, size)
+
+
+def get_member_document_id(name: str) -> str:
+    """
+    Derive a document ID from the path of an archive member.
+
+    Args:
+        name (str): The member path, such as ``"batch-1/invoice-42.json"``.
+
+    Returns:
+        str: The path without its extension, e.g. ``"batch-1/invoice-42"``.
+    """
+    return posixpath.splitext(posixpath.normpath(name).lstrip("/"))[0]
+
+
+def iter_zip_members(path: str) -> Iterator[Tuple[str, IO[bytes]]]:
+    """
+    Open the JSON members of a zip archive one at a time.
+
+    Args:
+        path (str): The path of the zip archive.
+
+    Yields:
+        tuple: The name and an open file object of each ``.json`` member.
+    """
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith(".json"):
+                continue
+            with archive.open(info) as member:
+                yield info.filename, member
+
+
+def iter_tar_members(path: str) -> Iterator[Tuple[str, IO[bytes]]]:
+    """
+    Open the JSON members of a tar archive, optionally compressed, in order.
+
+    The archive is read as a stream, so each member must be consumed before
+    the next one is requested.
+
+    Args:
+        path (str): The path of the tar archive.
+
+    Yields:
+        tuple: The name and an open file object of each ``.json`` member.
+    """
+    with tarfile.open(path, "r|*") as archive:
+        for info in archive:
+            if not info.isfile() or not info.name.endswith(".json"):
+                continue
+            member = archive.extractfile(info)
+            if member is not None:
+                yield info.name, member
+
+
+async def iter_archive_documents(
+    members: Iterator[Tuple[str, IO[bytes]]]
+) -> AsyncIterator[BulkDocument]:
+    """
+    Stream the documents of an archive, each parsed incrementally.
+
+    Args:
+        members (Iterator[tuple]): The names and file objects of the members.
+
+    Yields:
+        tuple: The document ID and page iterator of each member.
+    """
+    while True:
+        found = await asyncio.to_thread(next, members, None)
+        if found is None:
+            return
+        name, member = found
+        pages = iter_ocr_pages(ThreadedReader(member))
+        yield get_member_document_id(name), pages
+
+
+async def iter_listed_pages(
+    pages: List[Dict[str, Any]], error: Optional[Exception] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield already parsed pages, or raise the error that prevented parsing.
+
+    Args:
+        pages (list): The page objects.
+        error (Optional[Exception]): The parse error of the document, if any.
+
+    Yields:
+        dict: Each page object.
+    """
+    if error is not None:
+        raise error
+    for page in pages:
+        yield page
+
+
+async def iter_ndjson_documents(path: str) -> AsyncIterator[BulkDocument]:
+    """
+    Stream the documents of an NDJSON file, one OCR result per line.
+
+    Each line is an OCR analyze result with a ``document_id`` field. A line
+    that cannot be parsed or has no ``document_id`` becomes a document whose
+    pages raise the error, reported as ``line-<n>``, so it fails without
+    stopping the rest of the file. Lines are never named by position, as the
+    same name in a later upload would overwrite the document.
+
+    Args:
+        path (str): The path of the NDJSON file.
+
+    Yields:
+        tuple: The document ID and page iterator of each line.
+    """
+    async with aiofiles.open(path, "rb") as file:
+        number = 0
+        async for line in file:
+            if not line.strip():
+                continue
+            number += 1
+            document_id = f"line-{number}"
+            try:
+                document = orjson.loads(line)
+                if not document.get("document_id"):
+                    raise ValueError(f"Line {number} has no document_id")
+                document_id = str(document["document_id"])
+                pages = document["analyzeResult"]["pages"]
+            except Exception as e:
+                yield document_id, iter_listed_pages([], ValueError(str(e)))
+                continue
+            yield document_id, iter_listed_pages(pages)
+
+
+def iter_bulk_documents(path: str) -> AsyncIterator[BulkDocument]:
+    """
+    Stream the documents of a bulk upload.
+
+    The format is detected from the file contents: a zip or (optionally
+    compressed) tar archive of OCR JSON files, each one document named after
+    its path, or otherwise NDJSON with one OCR result per line. Documents are
+    yielded one at a time, so memory does not grow with the number of
+    documents.
+
+    Args:
+        path (str): The path of the spooled upload.
+
+    Returns:
+        AsyncIterator[tuple]: The document ID and page iterator of each
+        document.
+    """
+    if zipfile.is_zipfile(path):
+        return iter_archive_documents(iter_zip_members(path))
+    if tarfile.is_tarfile(path):
+        return iter_archive_documents(iter_tar_members(path))
+    return iter_ndjson_documents(path)
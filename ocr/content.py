@@ -0,0 +1,137 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import zlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# IDs per statement, below SQLite's limit on bound parameters
+SQL_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    namespace TEXT NOT NULL,
+    id TEXT NOT NULL,
+    content BLOB NOT NULL,
+    PRIMARY KEY (namespace, id)
+) WITHOUT ROWID
+"""
+
+
+class ContentStore:
+    """
+    Compressed page text keyed by namespace and vector ID.
+
+    Page text is kept out of vector metadata, so upserts and searches only
+    move IDs and small filterable fields, and is loaded only for the matches
+    a client asks snippets for. Texts are zlib-compressed rows of a SQLite
+    database in WAL mode, so API processes and ingestion workers sharing the
+    file can read while one of them writes.
+
+    Attributes:
+        path (str): The path of the SQLite database.
+        level (int): The zlib compression level, 1 (fastest) to 9 (smallest).
+    """
+
+    def __init__(self, path: str, level: int = 6) -> None:
+        self.path = path
+        self.level = level
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(SCHEMA)
+
+    def _put(self, namespace: str, items: Sequence[Tuple[str, str]]) -> None:
+        rows = [
+            (namespace, vector_id, zlib.compress(text.encode("utf-8"), self.level))
+            for vector_id, text in items
+        ]
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO pages VALUES (?, ?, ?)", rows
+                )
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+            self._connection.execute("COMMIT")
+
+    def _get(self, namespace: str, ids: Sequence[str]) -> Dict[str, str]:
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            for start in range(0, len(ids), SQL_CHUNK_SIZE):
+                chunk = ids[start:start + SQL_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(
+                    self._connection.execute(
+                        "SELECT id, content FROM pages "
+                        f"WHERE namespace = ? AND id IN ({placeholders})",
+                        (namespace, *chunk),
+                    )
+                )
+        return {
+            vector_id: zlib.decompress(content).decode("utf-8")
+            for vector_id, content in found.items()
+        }
+
+    def _delete(self, namespace: str, ids: Sequence[str]) -> None:
+        with self._lock:
+            for start in range(0, len(ids), SQL_CHUNK_SIZE):
+                chunk = ids[start:start + SQL_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                self._connection.execute(
+                    f"DELETE FROM pages WHERE namespace = ? AND id IN ({placeholders})",
+                    (namespace, *chunk),
+                )
+
+    async def put_many(self, namespace: str, items: Sequence[Tuple[str, str]]) -> None:
+        """
+        Store the text of several pages in one transaction.
+
+        Args:
+            namespace (str): The namespace of the pages.
+            items (Sequence[tuple]): The ``(vector_id, text)`` of each page.
+        """
+        if items:
+            await asyncio.to_thread(self._put, namespace, items)
+
+    async def get_many(self, namespace: str, ids: Sequence[str]) -> List[Optional[str]]:
+        """
+        Load the text of several pages.
+
+        Args:
+            namespace (str): The namespace of the pages.
+            ids (Sequence[str]): The vector IDs of the pages.
+
+        Returns:
+            list: The text of each page, or None if it is not stored.
+        """
+        if not ids:
+            return []
+        found = await asyncio.to_thread(self._get, namespace, list(set(ids)))
+        return [found.get(vector_id) for vector_id in ids]
+
+    async def delete_many(self, namespace: str, ids: Sequence[str]) -> None:
+        """
+        Delete the text of several pages.
+
+        Args:
+            namespace (str): The namespace of the pages.
+            ids (Sequence[str]): The vector IDs of the pages.
+        """
+        if ids:
+            await asyncio.to_thread(self._delete, namespace, ids)
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
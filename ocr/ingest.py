@@ -0,0 +1,584 @@
+import asyncio
+import ijson
+from fastapi import FastAPI
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Any,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from core.metrics import metrics
+from ocr.manifest import get_page_hash, load_manifest, record_pages, remove_pages
+from ocr.models import IngestionStats
+from ocr.utils import (
+    get_page_content,
+    get_vector_id,
+    estimate_tokens,
+    create_embeddings,
+)
+from vectorstore.base import Vector, VectorStore
+
+PageText = Tuple[int, str]
+DocumentPage = Tuple[str, int, str]
+EmbeddedBatch = Tuple[List[DocumentPage], List[Vector]]
+ProgressCallback = Callable[[str, List[int], Optional[Exception]], Awaitable[None]]
+DocumentCallback = Callable[
+    [str, IngestionStats, Optional[Exception]], Awaitable[None]
+]
+
+
+async def iter_ocr_pages(file: Any) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Incrementally parse ``analyzeResult.pages[*]`` from an OCR JSON stream.
+
+    Only one page object is materialised at a time, so memory does not grow
+    with the size of the upload.
+
+    Args:
+        file: An object with an async ``read(size)`` method, such as an
+            ``UploadFile``.
+
+    Yields:
+        dict: Each page object from the OCR analyze result.
+    """
+    async for page in ijson.items_async(
+        file, "analyzeResult.pages.item", use_float=True
+    ):
+        yield page
+
+
+async def iter_page_texts(
+    pages: AsyncIterable[Dict[str, Any]]
+) -> AsyncIterator[PageText]:
+    """
+    Reduce OCR page objects to their page number and content.
+
+    Each page is reduced as soon as it arrives, so the word polygons of the
+    OCR payload are released before batching.
+
+    Args:
+        pages (AsyncIterable[dict]): The page objects from the OCR analyze result.
+
+    Yields:
+        tuple: The ``(page_number, content)`` of each page.
+    """
+    async for page in pages:
+        yield page["pageNumber"], get_page_content(page)
+
+
+async def pack_batches(
+    pages: AsyncIterable[DocumentPage], max_items: int, max_tokens: int
+) -> AsyncIterator[List[DocumentPage]]:
+    """
+    Greedily pack pages into batches bounded by item count and token total.
+
+    Pages keep their original order, and a batch may hold pages of several
+    documents. A page whose estimate alone exceeds ``max_tokens`` is placed
+    in a batch of its own.
+
+    Args:
+        pages (AsyncIterable[tuple]): The ``(document_id, page_number, content)``
+            tuples.
+        max_items (int): The maximum number of pages per batch.
+        max_tokens (int): The maximum total estimated tokens per batch.
+
+    Yields:
+        list: Batches of ``(document_id, page_number, content)`` tuples.
+    """
+    current: List[DocumentPage] = []
+    current_tokens = 0
+    async for page in pages:
+        tokens = estimate_tokens(page[2])
+        if current and (
+            len(current) >= max_items or current_tokens + tokens > max_tokens
+        ):
+            yield current
+            current = []
+            current_tokens = 0
+        current.append(page)
+        current_tokens += tokens
+    if current:
+        yield current
+
+
+async def embed_batch(
+    batch: Sequence[DocumentPage], app: FastAPI
+) -> Tuple[List[Vector], int]:
+    """
+    Embed a batch of pages with at most one embeddings request.
+
+    Embeddings are first looked up in the embedding cache; only pages whose
+    normalized content was not embedded before are sent to the model, and
+    their new embeddings are written back to the cache.
+
+    Args:
+        batch (Sequence[tuple]): The ``(document_id, page_number, content)``
+            tuples to embed.
+        app: The FastAPI application object for accessing external services.
+
+    Returns:
+        tuple: The ``(id, embedding, metadata)`` vectors in batch order and
+        the number of pages served from the cache.
+    """
+    model = app.state.embedder.identity
+    contents = [content for _, _, content in batch]
+    embeddings = await app.state.embedding_cache.get_many(
+        contents, model, exact=True
+    )
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+
+    if missing:
+        texts = [contents[i] for i in missing]
+        created = await create_embeddings(texts, app)
+        for i, embedding in zip(missing, created):
+            embeddings[i] = embedding
+        await app.state.embedding_cache.set_many(texts, created, model, exact=True)
+
+    vectors = [
+        (
+            get_vector_id(document_id, page_number),
+            embedding,
+            {"document_id": document_id, "page_number": page_number},
+        )
+        for (document_id, page_number, _), embedding in zip(batch, embeddings)
+    ]
+    return vectors, len(batch) - len(missing)
+
+
+async def upsert_vectors(
+    vectors: Sequence[Vector], store: VectorStore, namespace: str, batch_size: int
+) -> int:
+    """
+    Upsert vectors into the vector store in bulk batches.
+
+    Args:
+        vectors (Sequence[tuple]): The ``(id, embedding, metadata)`` vectors.
+        store (VectorStore): The vector store where embeddings are upserted.
+        namespace (str): The namespace to write to.
+        batch_size (int): The maximum number of vectors per upsert request.
+
+    Returns:
+        int: The number of upsert requests made.
+    """
+    requests = 0
+    for start in range(0, len(vectors), batch_size):
+        with metrics.stage("vector_upsert"):
+            await store.upsert(vectors[start:start + batch_size], namespace)
+        requests += 1
+    return requests
+
+
+async def delete_pages(
+    store: VectorStore,
+    namespace: str,
+    document_id: str,
+    page_numbers: Sequence[int],
+    batch_size: int,
+) -> int:
+    """
+    Delete the vectors of a document's pages in bulk batches.
+
+    Args:
+        store (VectorStore): The vector store to delete from.
+        namespace (str): The namespace of the document.
+        document_id (str): The identifier of the document.
+        page_numbers (Sequence[int]): The numbers of the pages to delete.
+        batch_size (int): The maximum number of IDs per delete request.
+
+    Returns:
+        int: The number of delete requests made.
+    """
+    ids = [get_vector_id(document_id, page_number) for page_number in page_numbers]
+    requests = 0
+    for start in range(0, len(ids), batch_size):
+        with metrics.stage("vector_delete"):
+            await store.delete(ids[start:start + batch_size], namespace)
+        requests += 1
+    return requests
+
+
+class DocumentState:
+    """
+    Progress of one document through the ingestion pipeline.
+
+    Attributes:
+        document_id (str): The identifier of the document.
+        manifest (dict): The stored content hash of each page.
+        seen (set): The page numbers read from the upload so far.
+        hashes (dict): The content hashes of pages waiting to be upserted.
+        replaced (set): The pages waiting to be upserted that replace a
+            stored page.
+        stats (IngestionStats): The document's page counts.
+        pending (int): Pages read but not yet upserted or failed.
+        parsed (bool): Whether all of the document's pages have been read.
+        truncated (bool): Whether reading stopped at the page limit before
+            the end of the document.
+        error (Optional[Exception]): The error that stopped reading the
+            document, if any.
+    """
+
+    def __init__(self, document_id: str, manifest: Dict[int, str]) -> None:
+        self.document_id = document_id
+        self.manifest = manifest
+        self.seen: Set[int] = set()
+        self.hashes: Dict[int, str] = {}
+        self.replaced: Set[int] = set()
+        self.stats = IngestionStats()
+        self.pending = 0
+        self.parsed = False
+        self.truncated = False
+        self.error: Optional[Exception] = None
+
+
+def _group_pages(pages: Sequence[DocumentPage]) -> Dict[str, List[int]]:
+    grouped: Dict[str, List[int]] = {}
+    for document_id, page_number, _ in pages:
+        grouped.setdefault(document_id, []).append(page_number)
+    return grouped
+
+
+async def ingest_documents(
+    documents: AsyncIterable[Tuple[str, AsyncIterable[Dict[str, Any]]]],
+    store: VectorStore,
+    app: FastAPI,
+    namespace: str = "",
+    progress: Optional[ProgressCallback] = None,
+    on_document: Optional[DocumentCallback] = None,
+    fail_fast: bool = True,
+    max_pages: int = 0,
+) -> IngestionStats:
+    """
+    Batch-embed the pages of OCR documents and bulk-upsert their embeddings.
+
+    Ingestion is incremental: each page's content hash is compared with the
+    manifest stored for its document, and unchanged pages never reach the
+    embeddings API or the vector store. Pages missing from a document's new
+    upload are deleted in bulk once the whole document has been read, unless
+    reading stopped at ``max_pages``. Pages without text are never embedded
+    and count as missing. A document ID repeated within the call
+    is rejected as a duplicate, so a document is never ingested twice over
+    itself.
+
+    Documents are read one after another, but their pages share embedding
+    and upsert batches. Pages flow through three stages connected by bounded
+    queues: parsing and packing, ``EMBEDDING_CONCURRENCY`` embedding workers
+    (skipping pages found in the embedding cache) and ``UPSERT_CONCURRENCY``
+    upsert workers. A full queue pauses the stage feeding it, so at most
+    ``INGEST_EMBED_QUEUE_SIZE`` plus ``INGEST_UPSERT_QUEUE_SIZE`` batches wait
+    between stages and memory is bounded by that window rather than by the
+    size or number of documents.
+
+    Page text is compressed into the content store, keyed by vector ID, and
+    vector metadata only holds the document ID and page number.
+
+    If any vectors were upserted or deleted, the namespace's index generation
+    is bumped so cached query results for it are no longer served.
+
+    Args:
+        documents (AsyncIterable[tuple]): The ``(document_id, pages)`` of each
+            document, where ``pages`` yields the page objects of its OCR
+            analyze result. Each document's pages are read before the next
+            document is requested.
+        store (VectorStore): The vector store where embeddings are upserted.
+        app: The FastAPI application object for accessing external services.
+        namespace (str): The vector store namespace to write to.
+        progress (Optional[callable]): Awaited after each batch, once per
+            document in it, with the document ID, the document's page numbers
+            in the batch and the error the batch failed with, if any.
+        on_document (Optional[callable]): Awaited once each document is fully
+            processed, with its ID, page counts and the error that stopped
+            reading it, if any.
+        fail_fast (bool): Abort on the first error. When False, failed batches
+            are counted in ``failed_pages``, documents that cannot be read are
+            reported through ``on_document``, and ingestion continues.
+        max_pages (int): Read at most this many pages of each document (0
+            means no limit). The pages of a truncated document past the limit
+            are kept as stored.
+
+    Returns:
+        IngestionStats: The request counts and added, updated, deleted,
+        skipped and failed page counts over all documents.
+
+    Raises:
+        Exception: The first error, when ``fail_fast`` is set.
+    """
+    state = app.state
+    redis_client = state.redis_client
+    content_store = state.content_store
+    scope = state.manifest_scope
+    model = state.embedder.identity
+    batch_size = state.pinecone_upsert_batch_size
+    totals = IngestionStats()
+    documents_in_flight: Dict[str, DocumentState] = {}
+    documents_seen: Set[str] = set()
+    embed_queue: "asyncio.Queue[Optional[List[DocumentPage]]]" = asyncio.Queue(
+        state.ingest_embed_queue_size
+    )
+    upsert_queue: "asyncio.Queue[Optional[EmbeddedBatch]]" = asyncio.Queue(
+        state.ingest_upsert_queue_size
+    )
+    embed_workers = state.embedding_concurrency
+    upsert_workers = state.upsert_concurrency
+    running_embedders = embed_workers
+
+    async def finish(document: DocumentState) -> None:
+        if not document.parsed or document.pending:
+            return
+        del documents_in_flight[document.document_id]
+        stats = document.stats
+        totals.pages += stats.pages
+        totals.added_pages += stats.added_pages
+        totals.updated_pages += stats.updated_pages
+        totals.deleted_pages += stats.deleted_pages
+        totals.skipped_pages += stats.skipped_pages
+        totals.empty_pages += stats.empty_pages
+        totals.failed_pages += stats.failed_pages
+        if on_document is not None:
+            await on_document(document.document_id, stats, document.error)
+
+    async def end_document(document: DocumentState) -> None:
+        removed = sorted(set(document.manifest) - document.seen)
+        if removed and document.error is None and not document.truncated:
+            delete_requests = await delete_pages(
+                store, namespace, document.document_id, removed, batch_size
+            )
+            totals.delete_requests += delete_requests
+            with metrics.stage("content_delete"):
+                await content_store.delete_many(
+                    namespace,
+                    [
+                        get_vector_id(document.document_id, number)
+                        for number in removed
+                    ],
+                )
+            await remove_pages(
+                redis_client, scope, namespace, document.document_id, removed
+            )
+            document.stats.deleted_pages = len(removed)
+        document.manifest = {}
+        document.seen = set()
+        document.parsed = True
+        await finish(document)
+
+    async def changed_pages() -> AsyncIterator[DocumentPage]:
+        async for document_id, pages in documents:
+            if document_id in documents_seen:
+                error = ValueError(f"Duplicate document: {document_id}")
+                if fail_fast:
+                    raise error
+                if on_document is not None:
+                    await on_document(document_id, IngestionStats(), error)
+                continue
+            manifest = await load_manifest(
+                redis_client, scope, namespace, document_id
+            )
+            document = DocumentState(document_id, manifest)
+            documents_in_flight[document_id] = document
+            documents_seen.add(document_id)
+            try:
+                read = 0
+                async for page_number, content in iter_page_texts(pages):
+                    if max_pages and read >= max_pages:
+                        document.truncated = True
+                        break
+                    read += 1
+                    if not content.strip():
+                        # Embeddings APIs reject empty input, failing the
+                        # whole batch; the page counts as removed instead
+                        document.stats.empty_pages += 1
+                        continue
+                    document.seen.add(page_number)
+                    page_hash = get_page_hash(content, model)
+                    if manifest.get(page_number) == page_hash:
+                        document.stats.skipped_pages += 1
+                        continue
+                    document.hashes[page_number] = page_hash
+                    if page_number in manifest:
+                        document.replaced.add(page_number)
+                    document.pending += 1
+                    yield document_id, page_number, content
+            except Exception as e:
+                if fail_fast:
+                    raise
+                print(f"Error reading document {document_id}: {e}")
+                document.error = e
+            await end_document(document)
+
+    async def completed(
+        pages: List[DocumentPage], error: Optional[Exception] = None
+    ) -> None:
+        if error is not None:
+            if fail_fast:
+                raise error
+            print(f"Error processing {len(pages)} pages: {error}")
+        for document_id, page_numbers in _group_pages(pages).items():
+            document = documents_in_flight[document_id]
+            document.pending -= len(page_numbers)
+            if error is not None:
+                document.stats.failed_pages += len(page_numbers)
+                for page_number in page_numbers:
+                    document.hashes.pop(page_number, None)
+                    document.replaced.discard(page_number)
+            else:
+                document.stats.pages += len(page_numbers)
+                for page_number in page_numbers:
+                    # The manifest is released once the document is read
+                    if page_number in document.replaced:
+                        document.replaced.remove(page_number)
+                        document.stats.updated_pages += 1
+                    else:
+                        document.stats.added_pages += 1
+            if progress is not None:
+                await progress(document_id, page_numbers, error)
+            await finish(document)
+
+    async def parse() -> None:
+        async for batch in pack_batches(
+            changed_pages(), state.embedding_batch_size, state.embedding_batch_tokens
+        ):
+            await embed_queue.put(batch)
+        for _ in range(embed_workers):
+            await embed_queue.put(None)
+
+    async def embed() -> None:
+        nonlocal running_embedders
+        while (batch := await embed_queue.get()) is not None:
+            try:
+                vectors, cached = await embed_batch(batch, app)
+            except Exception as e:
+                await completed(batch, e)
+                continue
+            totals.cached_pages += cached
+            if cached < len(batch):
+                totals.embedding_requests += 1
+            await upsert_queue.put((batch, vectors))
+        running_embedders -= 1
+        if running_embedders == 0:
+            for _ in range(upsert_workers):
+                await upsert_queue.put(None)
+
+    async def upsert() -> None:
+        while (item := await upsert_queue.get()) is not None:
+            batch, vectors = item
+            try:
+                # Store page text first, so every searchable vector has a snippet
+                with metrics.stage("content_put"):
+                    await content_store.put_many(
+                        namespace,
+                        [
+                            (vector[0], content)
+                            for vector, (_, _, content) in zip(vectors, batch)
+                        ],
+                    )
+                upsert_requests = await upsert_vectors(
+                    vectors, store, namespace, batch_size
+                )
+                totals.upsert_requests += upsert_requests
+                for document_id, page_numbers in _group_pages(batch).items():
+                    hashes = documents_in_flight[document_id].hashes
+                    page_hashes = {
+                        page_number: hashes[page_number] for page_number in page_numbers
+                    }
+                    await record_pages(
+                        redis_client, scope, namespace, document_id, page_hashes
+                    )
+                    for page_number in page_numbers:
+                        del hashes[page_number]
+            except Exception as e:
+                await completed(batch, e)
+                continue
+            await completed(batch)
+
+    try:
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(parse())
+                for _ in range(embed_workers):
+                    group.create_task(embed())
+                for _ in range(upsert_workers):
+                    group.create_task(upsert())
+        except ExceptionGroup as e:
+            raise e.exceptions[0]
+    finally:
+        # Invalidate cached query results whenever vectors were written,
+        # including by an ingestion that failed part way
+        if totals.upsert_requests or totals.delete_requests:
+            await state.generations.bump(namespace)
+
+    totals.requests_saved = (
+        2 * (totals.pages + totals.skipped_pages)
+        - totals.embedding_requests
+        - totals.upsert_requests
+        - totals.delete_requests
+    )
+    return totals
+
+
+async def ingest_pages(
+    pages: AsyncIterable[Dict[str, Any]],
+    store: VectorStore,
+    app: FastAPI,
+    document_id: str,
+    namespace: str = "",
+    progress: Optional[ProgressCallback] = None,
+    fail_fast: bool = True,
+    max_pages: int = 0,
+) -> IngestionStats:
+    """
+    Batch-embed the pages of one OCR document and bulk-upsert the embeddings.
+
+    See ``ingest_documents`` for how pages are diffed, batched and pipelined.
+
+    Args:
+        pages (AsyncIterable[dict]): The page objects from the OCR analyze result.
+        store (VectorStore): The vector store where embeddings are upserted.
+        app: The FastAPI application object for accessing external services.
+        document_id (str): The identifier of the document; vector IDs are
+            prefixed with it so documents never overwrite each other's pages.
+        namespace (str): The vector store namespace to write to.
+        progress (Optional[callable]): Awaited after each batch with the
+            document ID, the batch's page numbers and the error it failed
+            with, if any.
+        fail_fast (bool): Abort on the first failed batch. When False, failed
+            batches are counted in ``failed_pages`` and ingestion continues.
+        max_pages (int): Read at most this many pages (0 means no limit).
+
+    Returns:
+        IngestionStats: The request counts and added, updated, deleted and
+        skipped page counts for the ingestion.
+
+    Raises:
+        Exception: The first error raised while parsing, or while embedding
+        or upserting when ``fail_fast`` is set.
+    """
+    errors: List[Exception] = []
+
+    async def documents() -> AsyncIterator[Tuple[str, AsyncIterable[Dict[str, Any]]]]:
+        yield document_id, pages
+
+    async def on_document(
+        _: str, stats: IngestionStats, error: Optional[Exception]
+    ) -> None:
+        if error is not None:
+            errors.append(error)
+
+    stats = await ingest_documents(
+        documents(),
+        store,
+        app,
+        namespace=namespace,
+        progress=progress,
+        on_document=on_document,
+        fail_fast=fail_fast,
+        max_pages=max_pages,
+    )
+    if errors:
+        raise errors[0]
+    return stats
@@ -0,0 +1,210 @@
+import json
+import time
+import redis.asyncio as redis
+from typing import Any, Dict, List, Optional, Tuple
+from ocr.models import DocumentStatus, IngestionJob, IngestionStats
+
+TERMINAL_STATUSES = ("completed", "failed")
+
+COUNTERS = ("pages_done", "pages_failed", "documents_done", "documents_failed")
+
+
+def job_key(job_id: str) -> str:
+    """
+    Return the Redis key of the hash holding a job's state.
+
+    Args:
+        job_id (str): The job identifier.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"ingest:job:{job_id}"
+
+
+def events_key(job_id: str) -> str:
+    """
+    Return the Redis key of the list holding a job's progress events.
+
+    Args:
+        job_id (str): The job identifier.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"ingest:job:{job_id}:events"
+
+
+def documents_key(job_id: str) -> str:
+    """
+    Return the Redis key of the hash holding a bulk job's document statuses.
+
+    Args:
+        job_id (str): The job identifier.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"ingest:job:{job_id}:documents"
+
+
+async def create_job(
+    redis_client: redis.Redis,
+    job_id: str,
+    user: str,
+    document_id: str,
+    filename: str,
+    ttl: int,
+) -> None:
+    """
+    Record a newly queued ingestion job.
+
+    Args:
+        redis_client: The Redis client.
+        job_id (str): The job identifier.
+        user (str): The user that submitted the job.
+        document_id (str): The identifier of the document being ingested.
+        filename (str): The name of the uploaded OCR file.
+        ttl (int): How long, in seconds, the job state is kept.
+    """
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.hset(
+            job_key(job_id),
+            mapping={
+                "status": "queued",
+                "user": user,
+                "document_id": document_id,
+                "filename": filename,
+                "pages_done": 0,
+                "pages_failed": 0,
+                "documents_done": 0,
+                "documents_failed": 0,
+                "created_at": time.time(),
+            },
+        )
+        pipe.expire(job_key(job_id), ttl)
+        await pipe.execute()
+
+
+async def get_job(
+    redis_client: redis.Redis, job_id: str
+) -> Optional[Tuple[str, IngestionJob]]:
+    """
+    Load the state of an ingestion job.
+
+    Args:
+        redis_client: The Redis client.
+        job_id (str): The job identifier.
+
+    Returns:
+        tuple: The submitting user and the job state, or None if the job is
+        unknown or has expired.
+    """
+    fields: Dict[str, str] = await redis_client.hgetall(  # type: ignore[misc]
+        job_key(job_id)
+    )
+    if not fields:
+        return None
+    stats = fields.get("stats")
+    job = IngestionJob(
+        job_id=job_id,
+        document_id=fields.get("document_id", ""),
+        status=fields["status"],
+        filename=fields.get("filename", ""),
+        pages_done=int(fields.get("pages_done", 0)),
+        pages_failed=int(fields.get("pages_failed", 0)),
+        documents_done=int(fields.get("documents_done", 0)),
+        documents_failed=int(fields.get("documents_failed", 0)),
+        error=fields.get("error"),
+        stats=IngestionStats.model_validate_json(stats) if stats else None,
+    )
+    return fields.get("user", ""), job
+
+
+async def record_event(
+    redis_client: redis.Redis,
+    job_id: str,
+    event: Optional[Dict[str, Any]],
+    ttl: int,
+    document: Optional[DocumentStatus] = None,
+    **fields: Any,
+) -> None:
+    """
+    Append a progress event to a job and update its state in one round trip.
+
+    Integer ``pages_done``/``pages_failed``/``documents_done``/
+    ``documents_failed`` fields are added to the stored counters; all other
+    fields overwrite the stored values.
+
+    Args:
+        redis_client: The Redis client.
+        job_id (str): The job identifier.
+        event (Optional[dict]): The JSON-serialisable progress event, or None
+            to only update the job state.
+        ttl (int): How long, in seconds, the job state is kept.
+        document (Optional[DocumentStatus]): The outcome of a bulk job's
+            document to record.
+        **fields: Job state fields to update.
+    """
+    async with redis_client.pipeline(transaction=True) as pipe:
+        for counter in COUNTERS:
+            if counter in fields:
+                pipe.hincrby(job_key(job_id), counter, fields.pop(counter))
+        if fields:
+            pipe.hset(job_key(job_id), mapping=fields)
+        if document is not None:
+            pipe.hset(
+                documents_key(job_id),
+                document.document_id,
+                document.model_dump_json(),
+            )
+            pipe.expire(documents_key(job_id), ttl)
+        if event is not None:
+            pipe.rpush(events_key(job_id), json.dumps(event))
+            pipe.expire(events_key(job_id), ttl)
+        await pipe.execute()
+
+
+async def read_events(
+    redis_client: redis.Redis, job_id: str, start: int
+) -> List[str]:
+    """
+    Read the JSON-encoded progress events of a job from a given offset.
+
+    Args:
+        redis_client: The Redis client.
+        job_id (str): The job identifier.
+        start (int): The index of the first event to read.
+
+    Returns:
+        list: The JSON-encoded events.
+    """
+    events: List[str] = await redis_client.lrange(  # type: ignore[misc]
+        events_key(job_id), start, -1
+    )
+    return events
+
+
+async def read_documents(
+    redis_client: redis.Redis, job_id: str, cursor: int, count: int
+) -> Tuple[int, List[DocumentStatus]]:
+    """
+    Read a page of the document statuses of a bulk job.
+
+    Args:
+        redis_client: The Redis client.
+        job_id (str): The job identifier.
+        cursor (int): The cursor returned by the previous call, or 0.
+        count (int): The approximate number of statuses to read.
+
+    Returns:
+        tuple: The cursor of the next page, 0 once all statuses were read,
+        and the statuses.
+    """
+    next_cursor, fields = await redis_client.hscan(
+        documents_key(job_id), cursor, count=count
+    )
+    documents = [
+        DocumentStatus.model_validate_json(value) for value in fields.values()
+    ]
+    return int(next_cursor), documents
@@ -0,0 +1,110 @@
+import redis.asyncio as redis
+from typing import Dict, Iterable
+from caching.embeddings import get_embedding_cache_key
+
+# Version of the stored page layout, bumped whenever it changes so pages stored
+# by an older layout are rewritten on their next ingestion. Version 2 moved page
+# text from vector metadata to the content store.
+PAGE_LAYOUT_VERSION = 2
+
+
+def manifest_key(scope: str, namespace: str, document_id: str) -> str:
+    """
+    Return the Redis key of the hash mapping a document's pages to content hashes.
+
+    Args:
+        scope (str): The vector store backend, index and index version the
+            pages were written to.
+        namespace (str): The vector store namespace of the document.
+        document_id (str): The identifier of the document.
+
+    Returns:
+        str: The Redis key.
+    """
+    return f"ocr:manifest:{scope}:{namespace}:{document_id}"
+
+
+def get_page_hash(content: str, model: str) -> str:
+    """
+    Return the manifest hash of a page's content.
+
+    The hash covers the embedding model and dimension and the page layout
+    version as well as the content, so a page is only skipped if storing it
+    again would write exactly what is already stored.
+
+    Args:
+        content (str): The page text.
+        model (str): The embedding model's ``identity``.
+
+    Returns:
+        str: The page hash.
+    """
+    return f"{PAGE_LAYOUT_VERSION}:{get_embedding_cache_key(content, model)}"
+
+
+async def load_manifest(
+    redis_client: redis.Redis, scope: str, namespace: str, document_id: str
+) -> Dict[int, str]:
+    """
+    Load the content hash of every page stored for a document.
+
+    Args:
+        redis_client: The Redis client.
+        scope (str): The vector store the pages were written to.
+        namespace (str): The vector store namespace of the document.
+        document_id (str): The identifier of the document.
+
+    Returns:
+        dict: The content hash of each stored page, by page number.
+    """
+    fields: Dict[str, str] = await redis_client.hgetall(  # type: ignore[misc]
+        manifest_key(scope, namespace, document_id)
+    )
+    return {int(page_number): page_hash for page_number, page_hash in fields.items()}
+
+
+async def record_pages(
+    redis_client: redis.Redis,
+    scope: str,
+    namespace: str,
+    document_id: str,
+    hashes: Dict[int, str],
+) -> None:
+    """
+    Record the content hashes of pages that were stored for a document.
+
+    Args:
+        redis_client: The Redis client.
+        scope (str): The vector store the pages were written to.
+        namespace (str): The vector store namespace of the document.
+        document_id (str): The identifier of the document.
+        hashes (dict): The content hash of each stored page, by page number.
+    """
+    if hashes:
+        await redis_client.hset(  # type: ignore[misc]
+            manifest_key(scope, namespace, document_id), mapping=hashes
+        )
+
+
+async def remove_pages(
+    redis_client: redis.Redis,
+    scope: str,
+    namespace: str,
+    document_id: str,
+    page_numbers: Iterable[int],
+) -> None:
+    """
+    Forget pages that were deleted from a document.
+
+    Args:
+        redis_client: The Redis client.
+        scope (str): The vector store the pages were written to.
+        namespace (str): The vector store namespace of the document.
+        document_id (str): The identifier of the document.
+        page_numbers (Iterable[int]): The numbers of the deleted pages.
+    """
+    fields = [str(page_number) for page_number in page_numbers]
+    if fields:
+        await redis_client.hdel(  # type: ignore[misc]
+            manifest_key(scope, namespace, document_id), *fields
+        )
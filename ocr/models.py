@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 
 class OCRPage(BaseModel):
@@ -26,3 +26,102 @@ class OCRDocument(BaseModel):
 
     document_id: str
     pages: List[OCRPage]
+
+
+class IngestionStats(BaseModel):
+    """
+    Model summarising the outbound requests made while ingesting a document.
+
+    Attributes:
+        pages (int): The number of pages embedded and upserted.
+        added_pages (int): Pages that were not stored for the document before.
+        updated_pages (int): Stored pages whose content changed.
+        deleted_pages (int): Stored pages missing from the new upload.
+        skipped_pages (int): Stored pages whose content did not change.
+        empty_pages (int): Pages without text, which are not embedded; a
+            stored copy of such a page is deleted.
+        failed_pages (int): The number of pages that could not be embedded or
+            upserted.
+        cached_pages (int): The number of pages whose embedding came from
+            the embedding cache.
+        embedding_requests (int): The number of embeddings API requests made.
+        upsert_requests (int): The number of vector store upsert requests made.
+        delete_requests (int): The number of vector store delete requests made.
+        requests_saved (int): Requests avoided compared to one embedding and
+            one upsert request per page.
+    """
+
+    pages: int = 0
+    added_pages: int = 0
+    updated_pages: int = 0
+    deleted_pages: int = 0
+    skipped_pages: int = 0
+    empty_pages: int = 0
+    failed_pages: int = 0
+    cached_pages: int = 0
+    embedding_requests: int = 0
+    upsert_requests: int = 0
+    delete_requests: int = 0
+    requests_saved: int = 0
+
+
+class IngestionJob(BaseModel):
+    """
+    Model representing the state of a background ingestion job.
+
+    Attributes:
+        job_id (str): The unique identifier of the job.
+        document_id (str): The identifier of the document being ingested.
+        status (str): One of "queued", "running", "completed" or "failed".
+        filename (str): The name of the uploaded OCR file.
+        pages_done (int): The number of pages embedded and upserted so far.
+        pages_failed (int): The number of pages that failed so far.
+        documents_done (int): Bulk jobs only: documents fully ingested so far.
+        documents_failed (int): Bulk jobs only: documents that could not be
+            read or had failed pages.
+        error (Optional[str]): The error that failed the job, if any.
+        stats (Optional[IngestionStats]): The final ingestion statistics.
+    """
+
+    job_id: str
+    document_id: str = ""
+    status: str
+    filename: str = ""
+    pages_done: int = 0
+    pages_failed: int = 0
+    documents_done: int = 0
+    documents_failed: int = 0
+    error: Optional[str] = None
+    stats: Optional[IngestionStats] = None
+
+
+class DocumentStatus(BaseModel):
+    """
+    Model representing the outcome of one document of a bulk ingestion job.
+
+    Attributes:
+        document_id (str): The identifier of the document.
+        status (str): "completed" or "failed".
+        error (Optional[str]): Why the document failed, if it did.
+        stats (IngestionStats): The document's page counts.
+    """
+
+    document_id: str
+    status: str
+    error: Optional[str] = None
+    stats: IngestionStats = IngestionStats()
+
+
+class BatchQuery(BaseModel):
+    """
+    Model for a batch of OCR queries answered in one request.
+
+    Attributes:
+        queries (List[str]): The query texts.
+        document_id (Optional[str]): Limit the search to this document.
+        snippets (bool): Add a text snippet of each matching page.
+    """
+
+    queries: List[str]
+    document_id: Optional[str] = None
+    snippets: bool = False
@@ -1,83 +1,219 @@
-import json
 import asyncio
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, Request
-from fastapi.responses import JSONResponse, StreamingResponse
+import os
+import uuid
+import aiofiles
+import orjson
+from fastapi import (
+    APIRouter,
+    UploadFile,
+    File,
+    Form,
+    HTTPException,
+    Depends,
+    Request,
+)
+from fastapi.responses import Response, StreamingResponse
 from fastapi_limiter.depends import RateLimiter
-from ocr.utils import embed_and_upsert_page, create_query_embedding
+from ocr.ingest import ingest_pages, iter_ocr_pages
+from ocr.jobs import (
+    TERMINAL_STATUSES,
+    create_job,
+    get_job,
+    read_documents,
+    read_events,
+)
+from ocr.models import BatchQuery, IngestionJob
+from ocr.tasks import ingest_bulk, ingest_document
+from ocr.utils import (
+    add_snippets,
+    build_cached_results,
+    encode_ndjson,
+    create_query_embedding,
+    create_query_embeddings,
+    summarize_matches,
+)
 from auth.utils import get_current_user
-from caching.cache import get_cache_key
-from typing import Dict, Generator, Any
-from pinecone import Index
-from aiocache import Cache
+from caching.cache import get_cache_key, get_cache_scope, normalize_query
+from caching.semantic import SemanticCache
+from caching.singleflight import SingleFlight
+from caching.tiered import TieredCache
+from core.metrics import metrics
+from typing import AsyncIterator, Dict, List, Optional, Any
+from vectorstore.base import VectorStore
 
 ocr_router = APIRouter()
 
 
-def get_pinecone_index(request: Request) -> Index:
+def get_vector_store(request: Request) -> VectorStore:
     """
-    Dependency to retrieve the Pinecone index from the application state.
+    Dependency to retrieve the vector store from the application state.
 
     Args:
         request (Request): The FastAPI request object.
 
     Returns:
-        Pinecone index: The Pinecone index instance.
+        VectorStore: The configured vector store.
     """
-    return request.app.state.pinecone_index
+    vector_store: VectorStore = request.app.state.vector_store
+    return vector_store
 
 
-def get_caches_obj(request: Request) -> Cache:
+def get_query_cache(request: Request) -> TieredCache:
     """
-    Dependency to retrieve the cache object from the application state.
+    Dependency to retrieve the query result cache from the application state.
 
     Args:
         request (Request): The FastAPI request object.
 
     Returns:
-        aiocache.Cache: The cache object instance.
+        TieredCache: The two-tier query result cache.
+    """
+    query_cache: TieredCache = request.app.state.query_cache
+    return query_cache
+
+
+def get_semantic_cache(request: Request) -> SemanticCache:
+    """
+    Dependency to retrieve the semantic query cache from the application state.
+
+    Args:
+        request (Request): The FastAPI request object.
+
+    Returns:
+        SemanticCache: The cache matching rephrased queries by embedding.
+    """
+    semantic_cache: SemanticCache = request.app.state.semantic_cache
+    return semantic_cache
+
+
+def get_query_flight(request: Request) -> SingleFlight:
+    """
+    Dependency to retrieve the query coalescer from the application state.
+
+    Args:
+        request (Request): The FastAPI request object.
+
+    Returns:
+        SingleFlight: The coalescer for concurrent identical queries.
+    """
+    query_flight: SingleFlight = request.app.state.query_flight
+    return query_flight
+
+
+def get_document_id(file: UploadFile, document_id: Optional[str]) -> str:
+    """
+    Resolve the identifier of an uploaded OCR document.
+
+    Args:
+        file (UploadFile): The uploaded file containing OCR data.
+        document_id (Optional[str]): The identifier given by the client.
+
+    Returns:
+        str: The given identifier, or the file name without its extension.
+
+    Raises:
+        HTTPException: If no identifier can be determined.
     """
-    return request.app.state.caches
+    if document_id:
+        return document_id
+    if file.filename:
+        return os.path.splitext(os.path.basename(file.filename))[0]
+    raise HTTPException(status_code=400, detail="A document_id is required")
+
+
+def require_shared_vector_store(request: Request) -> None:
+    """
+    Dependency rejecting background jobs when vectors are stored locally.
+
+    The local vector store is owned by the API process, so Celery workers
+    cannot write to it.
+
+    Args:
+        request (Request): The FastAPI request object.
+
+    Raises:
+        HTTPException: If the local vector store is configured.
+    """
+    if request.app.state.vector_store_backend == "local":
+        raise HTTPException(
+            status_code=400,
+            detail="Background ingestion is not available with VECTOR_STORE=local; "
+            "use /ocr/processOCR",
+        )
+
+
+def get_search_filter(document_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Build the vector store filter limiting a search to one document.
+
+    Args:
+        document_id (Optional[str]): The document to search, if any.
+
+    Returns:
+        Optional[dict]: The metadata filter, or None to search all documents.
+    """
+    if document_id is None:
+        return None
+    return {"document_id": {"$eq": document_id}}
 
 
 @ocr_router.post(
-    "/processOCR", dependencies=[Depends(RateLimiter(times=1, seconds=180)),
-                                 Depends(get_current_user)]
+    "/processOCR", dependencies=[Depends(RateLimiter(times=1, seconds=180))]
 )
 async def process_ocr_document(
     request: Request,
     file: UploadFile = File(...),
-    pinecone_index: Index = Depends(get_pinecone_index),
-) -> Dict[str, str]:
+    document_id: Optional[str] = Form(None),
+    vector_store: VectorStore = Depends(get_vector_store),
+    current_user: str = Depends(get_current_user),
+) -> Dict[str, Any]:
     """
     Process and embed OCR data from an uploaded file and
-    upsert the embeddings into Pinecone.
+    upsert the embeddings into the vector store.
+
+    The upload is parsed incrementally, one page at a time, and pages are
+    packed into as few embeddings requests as the configured token and item
+    limits allow. Batches are embedded and bulk-upserted while later pages
+    are still being parsed, through bounded queues, so every page of a
+    document is ingested with memory independent of its length.
+
+    Vectors are written to the current user's namespace with IDs prefixed by
+    the document ID, so documents never overwrite each other's pages.
 
     Args:
         request (Request): The FastAPI request object.
         file (UploadFile): The uploaded file containing OCR data.
-        pinecone_index: Dependency to get the Pinecone index.
+        document_id (Optional[str]): The document identifier; defaults to the
+            file name without its extension.
+        vector_store: Dependency to get the vector store.
+        current_user (str): The username of the currently authenticated user.
 
     Returns:
-        dict: A status message indicating completion.
+        dict: A status message, the document ID and the ingestion request
+        statistics.
 
     Raises:
         HTTPException: If an error occurs during processing.
     """
+    document_id = get_document_id(file, document_id)
     try:
-        content = await file.read()
-        ocr_data = json.loads(content)
-        page_count = request.app.state.pinecone_page_count
-        pages = ocr_data["analyzeResult"]["pages"][:page_count]
-
-        # Process embeddings asynchronously for all pages
-        await asyncio.gather(
-            *(
-                embed_and_upsert_page(page, pinecone_index, request.app)
-                for page in pages
-            )
+        pages = iter_ocr_pages(file)
+
+        # Embed pages in batches and upsert them in bulk as they are parsed
+        stats = await ingest_pages(
+            pages,
+            vector_store,
+            request.app,
+            document_id,
+            namespace=current_user,
+            max_pages=request.app.state.ingest_max_pages,
         )
 
-        return {"status": "OCR processing and embedding completed successfully."}
+        return {
+            "status": "OCR processing and embedding completed successfully.",
+            "document_id": document_id,
+            "stats": stats.model_dump(),
+        }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -86,65 +222,488 @@ async def process_ocr_document(
 async def query_ocr_data(
     request: Request,
     query: str,
-    pinecone_index: Index = Depends(get_pinecone_index),
-    caches: Cache = Depends(get_caches_obj),
+    document_id: Optional[str] = None,
+    snippets: bool = False,
+    vector_store: VectorStore = Depends(get_vector_store),
+    query_cache: TieredCache = Depends(get_query_cache),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    query_flight: SingleFlight = Depends(get_query_flight),
     current_user: str = Depends(get_current_user)
-) -> Any:
+) -> Response:
     """
-    Query OCR data using the provided query text and return results from Pinecone index.
+    Query OCR data using the provided query text and return results from the
+    vector store.
+
+    Only the current user's namespace is searched, optionally limited to one
+    document. Results are cached under the normalized query text, index
+    version, index generation and search scope, and the cache is checked
+    before the query is embedded. Ingestion bumps the generation, so results
+    cached before the namespace changed are never served. The encoded
+    response body is cached with the results, so a cache hit is sent without
+    any JSON parsing or encoding.
+
+    Concurrent misses on the same key are coalesced: requests in this worker
+    share one computation, and other workers wait for the cached result while
+    one of them holds a short Redis lease. After embedding, a query close
+    enough to a recent one in the same scope reuses its results instead of
+    searching the vector store.
+
+    Cached results never hold page text; when snippets are requested, they
+    are loaded from the content store for the returned matches only.
 
     Args:
         request (Request): The FastAPI request object.
         query (str): The query text for searching.
-        pinecone_index: Dependency to get the Pinecone index.
-        caches: Dependency to get the cache object.
+        document_id (Optional[str]): Limit the search to this document.
+        snippets (bool): Add a text snippet of each matching page.
+        vector_store: Dependency to get the vector store.
+        query_cache: Dependency to get the query result cache.
+        semantic_cache: Dependency to get the semantic query cache.
+        query_flight: Dependency to get the query coalescer.
 
     Returns:
-        StreamingResponse: A streaming response of the search results in JSON format.
+        Response: The search results as NDJSON, one match per line.
 
     Raises:
         HTTPException: If an error occurs during querying or caching.
     """
     try:
-        query = query.strip().lower()
-        query_embedding = await create_query_embedding(query, request.app)
-        cache_key = await get_cache_key(query_embedding)
-
-        # Attempt to fetch cached results
-        cached_results = await caches.get(cache_key)
-        if cached_results:
-            return JSONResponse(cached_results)
-
-        # Perform similarity search in Pinecone index
-        search_results = pinecone_index.query(
-            vector=query_embedding, top_k=10, include_metadata=True
-        )
+        query = normalize_query(query)
+        state = request.app.state
+        generation = await state.generations.get(current_user)
+        scope_args = (state.index_version, current_user, document_id, generation)
+        cache_key = get_cache_key(query, *scope_args)
+        scope = get_cache_scope(*scope_args)
 
-        # Prepare results to be cached
-        results = [
-            {"score": match["score"], "page_number": match["metadata"]["page_number"]}
-            for match in search_results["matches"]
-        ]
+        async def respond(entry: Dict[str, Any]) -> Response:
+            body = entry["body"]
+            if snippets:
+                results = await add_snippets(
+                    [entry["results"]], [query], current_user, request.app
+                )
+                body = encode_ndjson(results[0])
+            return Response(body, media_type="application/x-ndjson")
 
-        # Cache the results
-        await caches.set(cache_key, results, ttl=60 * 5)  # Cache for 5 minutes
+        # Attempt to fetch cached results before embedding the query
+        cached = await query_cache.get(cache_key)
+        if cached is not None:
+            semantic_cache.record_hit()
+            return await respond(cached)
 
-        async def result_generator() -> Generator[bytes, None, None]:  # type: ignore
-            """
-            Generator to yield search results as JSON strings.
+        async def compute() -> Dict[str, Any]:
+            query_embedding = await create_query_embedding(query, request.app)
 
+            # Reuse the results of a near-identical recent query
+            similar = semantic_cache.lookup(scope, query_embedding)
+            if similar is not None:
+                await query_cache.set(cache_key, similar)
+                similar_results: Dict[str, Any] = similar
+                return similar_results
 
-            Yields:
-                bytes: A JSON-encoded result string for each match.
-            """
-            for match in search_results["matches"]:
-                result = {
-                    "score": match["score"],
-                    "page_number": match["metadata"]["page_number"],
-                }
-                yield json.dumps(result, ensure_ascii=False).encode("utf-8") + b"\n"
+            # Perform similarity search in the vector store
+            with metrics.stage("vector_query"):
+                matches = await vector_store.query(
+                    query_embedding,
+                    top_k=10,
+                    namespace=current_user,
+                    filter=get_search_filter(document_id),
+                )
 
-        return StreamingResponse(result_generator(), media_type="application/json")
+            # Cache the results together with the encoded response body
+            results = build_cached_results(summarize_matches(matches))
+            semantic_cache.add(scope, query_embedding, results)
+            await query_cache.set(cache_key, results)
+            return results
+
+        async def lookup() -> Any:
+            return await query_cache.get(cache_key)
+
+        cached = await query_flight.run(cache_key, compute, lookup)
+        return await respond(cached)
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@ocr_router.post("/queryOCR/batch", response_model=None)
+async def batch_query_ocr_data(
+    request: Request,
+    batch: BatchQuery,
+    vector_store: VectorStore = Depends(get_vector_store),
+    query_cache: TieredCache = Depends(get_query_cache),
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    current_user: str = Depends(get_current_user),
+) -> StreamingResponse:
+    """
+    Answer a batch of OCR queries and stream the results as NDJSON.
+
+    Cached results for all queries are fetched with one multi-get and
+    streamed first. The remaining queries are embedded with a single
+    embeddings request; those close to a recent query reuse its results,
+    and the rest are searched together in the current user's namespace.
+    Results are streamed as they are ready. Each line holds the query's
+    position in the batch, the query text, and either its results or an error.
+    With ``snippets`` set, each group of lines is given page text snippets
+    from one content store lookup.
+
+    Args:
+        request (Request): The FastAPI request object.
+        batch (BatchQuery): The queries to answer.
+        vector_store: Dependency to get the vector store.
+        query_cache: Dependency to get the query result cache.
+        semantic_cache: Dependency to get the semantic query cache.
+
+    Returns:
+        StreamingResponse: One JSON object per query, one per line.
+
+    Raises:
+        HTTPException: If the batch is too large or the cache lookup fails.
+    """
+    state = request.app.state
+    if len(batch.queries) > state.query_batch_max:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {state.query_batch_max} queries are allowed per batch",
+        )
+
+    queries = [normalize_query(query) for query in batch.queries]
+    unique = list(dict.fromkeys(queries))
+    try:
+        generation = await state.generations.get(current_user)
+        scope_args = (state.index_version, current_user, batch.document_id, generation)
+        keys = [get_cache_key(query, *scope_args) for query in unique]
+        cache_keys = dict(zip(unique, keys))
+        scope = get_cache_scope(*scope_args)
+        cached = await query_cache.get_many(keys)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    results: Dict[str, Optional[List[Dict[str, Any]]]] = {
+        query: None if entry is None else entry["results"]
+        for query, entry in zip(unique, cached)
+    }
+    pending = [query for query in unique if results[query] is None]
+    semantic_cache.record_hit(len(unique) - len(pending))
+
+    def encode(position: int, payload: Dict[str, Any]) -> bytes:
+        line = {"index": position, "query": batch.queries[position], **payload}
+        encoded: bytes = orjson.dumps(line, option=orjson.OPT_APPEND_NEWLINE)
+        return encoded
+
+    async def encode_results(positions: List[int]) -> List[bytes]:
+        found = [results[queries[position]] or [] for position in positions]
+        if batch.snippets:
+            texts = [queries[position] for position in positions]
+            found = await add_snippets(found, texts, current_user, request.app)
+        with metrics.stage("serialize"):
+            return [
+                encode(position, {"results": matches})
+                for position, matches in zip(positions, found)
+            ]
+
+    async def result_generator() -> AsyncIterator[bytes]:
+        done = [i for i, query in enumerate(queries) if query not in pending]
+        for line in await encode_results(done):
+            yield line
+        if not pending:
+            return
+
+        try:
+            embeddings = await create_query_embeddings(pending, request.app)
+            entries: List[Any] = semantic_cache.lookup_many(scope, embeddings)
+            searched = [i for i, entry in enumerate(entries) if entry is None]
+            if searched:
+                with metrics.stage("vector_query"):
+                    all_matches = await vector_store.query_many(
+                        [embeddings[i] for i in searched],
+                        top_k=10,
+                        namespace=current_user,
+                        filter=get_search_filter(batch.document_id),
+                    )
+                for i, matches in zip(searched, all_matches):
+                    entries[i] = build_cached_results(summarize_matches(matches))
+                    semantic_cache.add(scope, embeddings[i], entries[i])
+            results.update(
+                (query, entry["results"]) for query, entry in zip(pending, entries)
+            )
+        except Exception as e:
+            metrics.record_failures("batch_query", len(pending))
+            error = e.detail if isinstance(e, HTTPException) else str(e)
+            for position, query in enumerate(queries):
+                if results[query] is None:
+                    yield encode(position, {"error": error})
+            return
+
+        try:
+            await query_cache.set_many(
+                [(cache_keys[query], entry) for query, entry in zip(pending, entries)]
+            )
+        except Exception:
+            metrics.record_failures("batch_query_cache_set")
+
+        searched = [i for i, query in enumerate(queries) if query in pending]
+        for line in await encode_results(searched):
+            yield line
+
+    return StreamingResponse(result_generator(), media_type="application/x-ndjson")
+
+
+@ocr_router.get("/queryOCR/stats")
+async def get_query_cache_stats(
+    semantic_cache: SemanticCache = Depends(get_semantic_cache),
+    current_user: str = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """
+    Return this worker's query cache hit, near-hit and miss counters.
+
+    Args:
+        semantic_cache: Dependency to get the semantic query cache.
+        current_user (str): The username of the currently authenticated user.
+
+    Returns:
+        dict: The counters, the number of semantic entries and the hit rate.
+    """
+    return semantic_cache.stats()
+
+
+async def spool_upload(file: UploadFile, directory: str, filename: str) -> str:
+    """
+    Copy an upload to the spool directory shared with the ingestion workers.
+
+    Args:
+        file (UploadFile): The uploaded file.
+        directory (str): The spool directory.
+        filename (str): The name of the spooled file.
+
+    Returns:
+        str: The path of the spooled file.
+    """
+    path = os.path.join(directory, filename)
+    os.makedirs(directory, exist_ok=True)
+    async with aiofiles.open(path, "wb") as spool:
+        while chunk := await file.read(1024 * 1024):
+            await spool.write(chunk)
+    return path
+
+
+def discard_spooled_upload(directory: str, filename: str) -> None:
+    """
+    Remove a spooled upload whose job could not be queued, if it was written.
+
+    Args:
+        directory (str): The spool directory.
+        filename (str): The name of the spooled file.
+    """
+    try:
+        os.remove(os.path.join(directory, filename))
+    except FileNotFoundError:
+        pass
+
+
+@ocr_router.post(
+    "/jobs",
+    status_code=202,
+    dependencies=[
+        Depends(require_shared_vector_store),
+        Depends(RateLimiter(times=10, seconds=60)),
+    ],
+)
+async def submit_ocr_job(
+    request: Request,
+    file: UploadFile = File(...),
+    document_id: Optional[str] = Form(None),
+    current_user: str = Depends(get_current_user),
+) -> Dict[str, str]:
+    """
+    Queue an OCR document for background ingestion and return its job ID.
+
+    The upload is spooled to storage shared with the ingestion workers and
+    processed by a Celery task, so the request returns immediately.
+
+    Args:
+        request (Request): The FastAPI request object.
+        file (UploadFile): The uploaded file containing OCR data.
+        document_id (Optional[str]): The document identifier; defaults to the
+            file name without its extension.
+        current_user (str): The username of the currently authenticated user.
+
+    Returns:
+        dict: The job ID, document ID and initial status.
+
+    Raises:
+        HTTPException: If the upload cannot be spooled or queued.
+    """
+    state = request.app.state
+    document_id = get_document_id(file, document_id)
+    job_id = uuid.uuid4().hex
+    filename = f"{job_id}.json"
+    try:
+        path = await spool_upload(file, state.ingest_spool_dir, filename)
+        await create_job(
+            state.redis_client,
+            job_id,
+            current_user,
+            document_id,
+            file.filename or "",
+            state.ingest_job_ttl,
+        )
+        # Publishing to the broker is a blocking network call
+        await asyncio.to_thread(
+            ingest_document.delay, job_id, path, document_id, current_user
+        )
+    except Exception as e:
+        discard_spooled_upload(state.ingest_spool_dir, filename)
+        raise HTTPException(status_code=500, detail=f"Failed to queue job: {e}")
+
+    return {"job_id": job_id, "document_id": document_id, "status": "queued"}
+
+
+@ocr_router.post(
+    "/bulk",
+    status_code=202,
+    dependencies=[
+        Depends(require_shared_vector_store),
+        Depends(RateLimiter(times=10, seconds=60)),
+    ],
+)
+async def submit_bulk_ocr_job(
+    request: Request,
+    file: UploadFile = File(...),
+    current_user: str = Depends(get_current_user),
+) -> Dict[str, str]:
+    """
+    Queue many OCR documents for background ingestion as one job.
+
+    The upload is either NDJSON with one OCR result per line, named by its
+    ``document_id`` field, or a zip or tar archive of OCR JSON files, named
+    by their paths. Pages of all documents share embedding and upsert
+    batches, and each document's outcome is recorded separately.
+
+    Args:
+        request (Request): The FastAPI request object.
+        file (UploadFile): The NDJSON or archive upload.
+        current_user (str): The username of the currently authenticated user.
+
+    Returns:
+        dict: The job ID and initial status.
+
+    Raises:
+        HTTPException: If the upload cannot be spooled or queued.
+    """
+    state = request.app.state
+    job_id = uuid.uuid4().hex
+    filename = f"{job_id}.bulk"
+    try:
+        path = await spool_upload(file, state.ingest_spool_dir, filename)
+        await create_job(
+            state.redis_client,
+            job_id,
+            current_user,
+            "",
+            file.filename or "",
+            state.ingest_job_ttl,
+        )
+        # Publishing to the broker is a blocking network call
+        await asyncio.to_thread(ingest_bulk.delay, job_id, path, current_user)
+    except Exception as e:
+        discard_spooled_upload(state.ingest_spool_dir, filename)
+        raise HTTPException(status_code=500, detail=f"Failed to queue job: {e}")
+
+    return {"job_id": job_id, "status": "queued"}
+
+
+async def get_user_job(
+    request: Request, job_id: str, current_user: str = Depends(get_current_user)
+) -> IngestionJob:
+    """
+    Dependency to load an ingestion job owned by the current user.
+
+    Args:
+        request (Request): The FastAPI request object.
+        job_id (str): The job identifier.
+        current_user (str): The username of the currently authenticated user.
+
+    Returns:
+        IngestionJob: The job state.
+
+    Raises:
+        HTTPException: If the job does not exist or belongs to another user.
+    """
+    found = await get_job(request.app.state.redis_client, job_id)
+    if found is None or found[0] != current_user:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return found[1]
+
+
+@ocr_router.get("/jobs/{job_id}", response_model=IngestionJob)
+async def get_ocr_job(job: IngestionJob = Depends(get_user_job)) -> IngestionJob:
+    """
+    Return the progress of a background ingestion job.
+
+    Args:
+        job (IngestionJob): The job state of the requested job.
+
+    Returns:
+        IngestionJob: Page counters, status and, once finished, the
+        final ingestion statistics or error.
+    """
+    return job
+
+
+@ocr_router.get("/jobs/{job_id}/events")
+async def stream_ocr_job_events(
+    request: Request, job: IngestionJob = Depends(get_user_job)
+) -> StreamingResponse:
+    """
+    Stream the progress events of a background ingestion job as NDJSON.
+
+    Events already recorded are sent first; the stream then follows the job
+    until it completes or fails.
+
+    Args:
+        request (Request): The FastAPI request object.
+        job (IngestionJob): The job state of the requested job.
+
+    Returns:
+        StreamingResponse: One JSON event per line.
+    """
+    redis_client = request.app.state.redis_client
+    interval = request.app.state.ingest_job_poll_interval
+
+    async def event_generator() -> AsyncIterator[bytes]:
+        sent = 0
+        while True:
+            found = await get_job(redis_client, job.job_id)
+            for event in await read_events(redis_client, job.job_id, sent):
+                sent += 1
+                yield event.encode("utf-8") + b"\n"
+            if found is None or found[1].status in TERMINAL_STATUSES:
+                return
+            await asyncio.sleep(interval)
+
+    return StreamingResponse(event_generator(), media_type="application/x-ndjson")
+
+
+@ocr_router.get("/jobs/{job_id}/documents")
+async def get_ocr_job_documents(
+    request: Request,
+    cursor: int = 0,
+    count: int = 1000,
+    job: IngestionJob = Depends(get_user_job),
+) -> Dict[str, Any]:
+    """
+    Return a page of the per-document outcomes of a bulk ingestion job.
+
+    Args:
+        request (Request): The FastAPI request object.
+        cursor (int): The cursor returned by the previous page, or 0.
+        count (int): The approximate number of documents per page.
+        job (IngestionJob): The job state of the requested job.
+
+    Returns:
+        dict: The finished documents' statuses and the cursor of the next
+        page, which is 0 once every recorded document was returned.
+    """
+    next_cursor, documents = await read_documents(
+        request.app.state.redis_client, job.job_id, cursor, count
+    )
+    return {"cursor": next_cursor, "documents": documents}
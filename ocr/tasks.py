@@ -0,0 +1,215 @@
+import contextlib
+import os
+import aiofiles
+from fastapi import FastAPI, HTTPException
+from typing import Any, Dict, List, Optional
+from core.worker import celery_app, run_in_worker
+from ocr.bulk import iter_bulk_documents
+from ocr.ingest import ingest_documents, ingest_pages, iter_ocr_pages
+from ocr.jobs import record_event
+from ocr.models import DocumentStatus, IngestionStats
+
+
+def get_error_detail(error: Exception) -> str:
+    """
+    Return the message of an ingestion error for job events.
+
+    Args:
+        error (Exception): The error.
+
+    Returns:
+        str: The ``HTTPException`` detail, or the error message.
+    """
+    return str(error.detail if isinstance(error, HTTPException) else error)
+
+
+async def run_ingestion_job(
+    app: FastAPI, job_id: str, path: str, document_id: str, namespace: str
+) -> None:
+    """
+    Ingest a spooled OCR file and record per-batch progress for the job.
+
+    Batches that fail are recorded and skipped; the job only fails when the
+    file cannot be parsed or the job cannot continue.
+
+    Args:
+        app: The worker application state holder.
+        job_id (str): The job identifier.
+        path (str): The path of the spooled OCR JSON file.
+        document_id (str): The identifier of the document being ingested.
+        namespace (str): The vector store namespace to write to.
+    """
+    redis_client = app.state.redis_client
+    ttl = app.state.ingest_job_ttl
+
+    async def progress(
+        _: str, page_numbers: List[int], error: Optional[Exception]
+    ) -> None:
+        event = {"event": "batch", "pages": page_numbers, "status": "ok"}
+        if error is None:
+            await record_event(
+                redis_client, job_id, event, ttl, pages_done=len(page_numbers)
+            )
+            return
+        event.update(status="failed", error=get_error_detail(error))
+        await record_event(
+            redis_client, job_id, event, ttl, pages_failed=len(page_numbers)
+        )
+
+    await record_event(
+        redis_client, job_id, {"event": "started"}, ttl, status="running"
+    )
+    try:
+        async with aiofiles.open(path, "rb") as file:
+            pages = iter_ocr_pages(file)
+            stats = await ingest_pages(
+                pages,
+                app.state.vector_store,
+                app,
+                document_id,
+                namespace=namespace,
+                progress=progress,
+                fail_fast=False,
+                max_pages=app.state.ingest_max_pages,
+            )
+    except Exception as e:
+        print(f"Ingestion job {job_id} failed: {e}")
+        await record_event(
+            redis_client,
+            job_id,
+            {"event": "failed", "error": str(e)},
+            ttl,
+            status="failed",
+            error=str(e),
+        )
+        return
+    finally:
+        # Already gone when a redelivered task ran before
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+    await record_event(
+        redis_client,
+        job_id,
+        {"event": "completed", "stats": stats.model_dump()},
+        ttl,
+        status="completed",
+        stats=stats.model_dump_json(),
+    )
+
+
+@celery_app.task(name="ocr.ingest_document")  # type: ignore[misc]
+def ingest_document(job_id: str, path: str, document_id: str, namespace: str) -> None:
+    """
+    Celery task running a background ingestion job.
+
+    Args:
+        job_id (str): The job identifier.
+        path (str): The path of the spooled OCR JSON file, on storage shared
+            between the API and the workers.
+        document_id (str): The identifier of the document being ingested.
+        namespace (str): The vector store namespace to write to.
+    """
+    run_in_worker(
+        lambda app: run_ingestion_job(app, job_id, path, document_id, namespace)
+    )
+
+
+async def run_bulk_ingestion_job(
+    app: FastAPI, job_id: str, path: str, namespace: str
+) -> None:
+    """
+    Ingest a spooled bulk upload and record per-document status for the job.
+
+    Pages of all documents share embedding and upsert batches. Page counters
+    are updated after every batch, and one event is recorded per finished
+    document; a document that cannot be read or has failed pages is marked
+    failed without stopping the others.
+
+    Args:
+        app: The worker application state holder.
+        job_id (str): The job identifier.
+        path (str): The path of the spooled NDJSON, zip or tar upload.
+        namespace (str): The vector store namespace to write to.
+    """
+    redis_client = app.state.redis_client
+    ttl = app.state.ingest_job_ttl
+
+    async def progress(
+        _: str, page_numbers: List[int], error: Optional[Exception]
+    ) -> None:
+        counters: Dict[str, Any] = {
+            "pages_done" if error is None else "pages_failed": len(page_numbers)
+        }
+        await record_event(redis_client, job_id, None, ttl, **counters)
+
+    async def on_document(
+        document_id: str, stats: IngestionStats, error: Optional[Exception]
+    ) -> None:
+        detail = get_error_detail(error) if error is not None else None
+        if detail is None and stats.failed_pages:
+            detail = f"{stats.failed_pages} pages failed"
+        status = "completed" if detail is None else "failed"
+        counters: Dict[str, Any] = {
+            "documents_done" if detail is None else "documents_failed": 1
+        }
+        document = DocumentStatus(
+            document_id=document_id, status=status, error=detail, stats=stats
+        )
+        event = {"event": "document", "document_id": document_id, "status": status}
+        await record_event(
+            redis_client, job_id, event, ttl, document=document, **counters
+        )
+
+    await record_event(
+        redis_client, job_id, {"event": "started"}, ttl, status="running"
+    )
+    try:
+        stats = await ingest_documents(
+            iter_bulk_documents(path),
+            app.state.vector_store,
+            app,
+            namespace=namespace,
+            progress=progress,
+            on_document=on_document,
+            fail_fast=False,
+            max_pages=app.state.ingest_max_pages,
+        )
+    except Exception as e:
+        print(f"Bulk ingestion job {job_id} failed: {e}")
+        await record_event(
+            redis_client,
+            job_id,
+            {"event": "failed", "error": str(e)},
+            ttl,
+            status="failed",
+            error=str(e),
+        )
+        return
+    finally:
+        # Already gone when a redelivered task ran before
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+    await record_event(
+        redis_client,
+        job_id,
+        {"event": "completed", "stats": stats.model_dump()},
+        ttl,
+        status="completed",
+        stats=stats.model_dump_json(),
+    )
+
+
+@celery_app.task(name="ocr.ingest_bulk")  # type: ignore[misc]
+def ingest_bulk(job_id: str, path: str, namespace: str) -> None:
+    """
+    Celery task running a background bulk ingestion job.
+
+    Args:
+        job_id (str): The job identifier.
+        path (str): The path of the spooled bulk upload, on storage shared
+            between the API and the workers.
+        namespace (str): The vector store namespace to write to.
+    """
+    run_in_worker(lambda app: run_bulk_ingestion_job(app, job_id, path, namespace))
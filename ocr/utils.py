@@ -1,44 +1,86 @@
+import orjson
 from fastapi import HTTPException, FastAPI
-from typing import Dict, Any
-from pinecone import Index
+from typing import Dict, List, Any, Optional, Sequence
+from core.metrics import metrics
 
 
-async def embed_and_upsert_page(
-    page: Dict[str, Any], index: Index, app: FastAPI
-) -> None:
+def get_page_content(page: Dict[str, Any]) -> str:
     """
-    Embeds the content of a single page and upserts
-    the embedding into the Pinecone index.
+    Combine the words of an OCR page into a single content string.
 
     Args:
-        page (dict): The page object containing content and metadata.
-        index: The Pinecone index object where embeddings are upserted.
-        app: The FastAPI application object for accessing external services.
+        page (dict): The page object from the OCR analyze result.
 
-    Raises:
-        HTTPException: If an error occurs during embedding or upserting.
+    Returns:
+        str: The page content with words separated by single spaces.
     """
-    try:
-        # Combine words into a single page content string
-        page_content = " ".join([word["content"] for word in page["words"]])
-        print(f"Processing page {page['pageNumber']}")
+    return " ".join([word["content"] for word in page["words"]])
 
-        # Create embeddings for the page content
-        response = await app.state.aclient.embeddings.create(
-            input=page_content, model="text-embedding-ada-002"
-        )
-        page_embedding = response.data[0].embedding
 
-        # Upsert the embedding with metadata
-        metadata = {"page_number": page["pageNumber"], "content": page_content}
+def get_vector_id(document_id: str, page_number: int) -> str:
+    """
+    Build the vector ID of a document page.
+
+    Args:
+        document_id (str): The identifier of the document.
+        page_number (int): The number of the page within the document.
+
+    Returns:
+        str: The ID, ``"<document_id>#<page_number>"``.
+    """
+    return f"{document_id}#{page_number}"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of model tokens in a text.
+
+    Uses a conservative three-characters-per-token heuristic so that
+    batches packed against the estimate stay under the provider limit.
+
+    Args:
+        text (str): The text to estimate.
+
+    Returns:
+        int: The estimated token count (at least 1).
+    """
+    return len(text) // 3 + 1
+
+
+async def create_embeddings(
+    texts: List[str], app: FastAPI, priority: str = "bulk"
+) -> List[List[float]]:
+    """
+    Creates embeddings for several texts with a single embeddings request
+    to the configured embedding provider.
+
+    The request is admitted by the embedding scheduler, which keeps all
+    workers under the provider's rate limits and retries transient failures.
 
-        index.upsert(vectors=[(f"{page['pageNumber']}", page_embedding, metadata)])
+    Args:
+        texts (list): The texts to embed.
+        app: The FastAPI application object for accessing external services.
+        priority (str): "interactive" for queries a user is waiting on,
+            "bulk" for ingestion.
+
+    Returns:
+        list: One embedding vector per input text, in input order.
+
+    Raises:
+        HTTPException: If an error occurs during embedding creation.
+    """
+    try:
+        with metrics.stage("embed"):
+            embeddings: List[List[float]] = await app.state.embedding_scheduler.run(
+                lambda: app.state.embedder.embed(texts),
+                tokens=sum(estimate_tokens(text) for text in texts),
+                priority=priority,
+            )
+        return embeddings
 
     except Exception as e:
-        print(f"Error processing page {page['pageNumber']}: {e}")
         raise HTTPException(
-            status_code=500,
-            detail=f"Error processing page {page['pageNumber']}: {str(e)}",
+            status_code=500, detail=f"Failed to create embeddings: {str(e)}"
         )
 
 
@@ -46,6 +88,9 @@ async def create_query_embedding(query_text: str, app: FastAPI) -> Any:
     """
     Creates an embedding for the provided query text.
 
+    The embedding cache is checked first, so a repeated query never calls
+    the embeddings API even after its cached results have expired.
+
     Args:
         query_text (str): The text to create an embedding for.
         app: The FastAPI application object for accessing external services.
@@ -56,13 +101,157 @@ async def create_query_embedding(query_text: str, app: FastAPI) -> Any:
     Raises:
         HTTPException: If an error occurs during embedding creation.
     """
-    try:
-        response = await app.state.aclient.embeddings.create(
-            input=query_text, model="text-embedding-ada-002"
-        )
-        return response.data[0].embedding
+    model = app.state.embedder.identity
+    cached = await app.state.embedding_cache.get_many([query_text], model)
+    if cached[0] is not None:
+        return cached[0]
 
-    except Exception as e:
-        raise HTTPException(
-            status_code=500, detail=f"Failed to create query embedding: {str(e)}"
+    embedding = (await create_embeddings([query_text], app, "interactive"))[0]
+
+    await app.state.embedding_cache.set_many([query_text], [embedding], model)
+    return embedding
+
+
+async def create_query_embeddings(
+    query_texts: Sequence[str], app: FastAPI
+) -> List[List[float]]:
+    """
+    Creates embeddings for several query texts.
+
+    Cached embeddings are fetched with one multi-get, and all remaining
+    queries are embedded with a single embeddings request.
+
+    Args:
+        query_texts (Sequence[str]): The texts to create embeddings for.
+        app: The FastAPI application object for accessing external services.
+
+    Returns:
+        list: One embedding vector per query text, in input order.
+
+    Raises:
+        HTTPException: If an error occurs during embedding creation.
+    """
+    model = app.state.embedder.identity
+    embeddings = await app.state.embedding_cache.get_many(query_texts, model)
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    if missing:
+        texts = [query_texts[i] for i in missing]
+        created = await create_embeddings(texts, app, "interactive")
+        for i, embedding in zip(missing, created):
+            embeddings[i] = embedding
+        await app.state.embedding_cache.set_many(texts, created, model)
+    return list(embeddings)
+
+
+def summarize_matches(matches: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Reduce vector store matches to the fields returned to clients.
+
+    Args:
+        matches (Sequence[dict]): The vector store matches.
+
+    Returns:
+        list: The score, document ID and page number of each match.
+    """
+    return [
+        {
+            "score": match["score"],
+            "document_id": match["metadata"].get("document_id"),
+            "page_number": match["metadata"]["page_number"],
+        }
+        for match in matches
+    ]
+
+
+def encode_ndjson(rows: Sequence[Dict[str, Any]]) -> bytes:
+    """
+    Encode rows as newline-delimited JSON.
+
+    Args:
+        rows (Sequence[dict]): The rows to encode.
+
+    Returns:
+        bytes: One UTF-8 JSON object per line.
+    """
+    with metrics.stage("serialize"):
+        return b"".join(
+            orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE) for row in rows
         )
+
+
+def build_cached_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the query cache entry for a list of results.
+
+    The entry holds the structured results, used by batch queries, and the
+    NDJSON response body, which single queries send as-is on a cache hit.
+
+    Args:
+        results (list): The summarized matches of a query.
+
+    Returns:
+        dict: The results and their encoded response body.
+    """
+    return {"results": results, "body": encode_ndjson(results)}
+
+
+def make_snippet(content: str, query: str, length: int) -> str:
+    """
+    Cut the part of a page's text that best shows why it matched a query.
+
+    The snippet is centred on the first occurrence of any query word, or
+    taken from the start of the page when none occurs.
+
+    Args:
+        content (str): The page text.
+        query (str): The query text.
+        length (int): The maximum snippet length in characters.
+
+    Returns:
+        str: The snippet.
+    """
+    lowered = content.lower()
+    positions = [lowered.find(word) for word in query.lower().split()]
+    found = [position for position in positions if position >= 0]
+    start = max(0, min(found) - length // 3) if found else 0
+    return content[start:start + length]
+
+
+async def add_snippets(
+    results: Sequence[Sequence[Dict[str, Any]]],
+    queries: Sequence[str],
+    namespace: str,
+    app: FastAPI,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Add page text snippets to the results of one or more queries.
+
+    Page text is loaded from the content store with a single lookup for all
+    matches. Matches whose text is not stored get a ``null`` snippet.
+
+    Args:
+        results (Sequence[list]): The summarized matches of each query.
+        queries (Sequence[str]): The query texts, used to place the snippets.
+        namespace (str): The namespace the matches were searched in.
+        app: The FastAPI application object for accessing external services.
+
+    Returns:
+        list: Copies of the matches of each query with a ``snippet`` field.
+    """
+    ids = [
+        get_vector_id(match["document_id"], match["page_number"])
+        for matches in results
+        for match in matches
+    ]
+    with metrics.stage("content_get"):
+        contents = iter(await app.state.content_store.get_many(namespace, ids))
+    length = app.state.query_snippet_chars
+    with_snippets: List[List[Dict[str, Any]]] = []
+    for matches, query in zip(results, queries):
+        rows = []
+        for match in matches:
+            content: Optional[str] = next(contents)
+            snippet = None if content is None else make_snippet(content, query, length)
+            rows.append({**match, "snippet": snippet})
+        with_snippets.append(rows)
+    return with_snippets
@@ -0,0 +1,40 @@
+import fakeredis.aioredis
+import pytest
+from aiocache import Cache
+from fastapi import FastAPI
+from pathlib import Path
+from typing import Iterator
+from caching.embeddings import EmbeddingCache
+from caching.generation import GenerationCache
+from core.config import (
+    setup_content_store,
+    setup_embedder,
+    setup_embedding_scheduler,
+    setup_env,
+    setup_vector_store,
+)
+
+
+@pytest.fixture
+def app(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[FastAPI]:
+    """An application that ingests offline: local stores, embedder and Redis."""
+    monkeypatch.setenv("VECTOR_STORE", "local")
+    monkeypatch.setenv("LOCAL_VECTOR_STORE_PATH", str(tmp_path / "vectors"))
+    monkeypatch.setenv("CONTENT_STORE_PATH", str(tmp_path / "content.db"))
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "local")
+    monkeypatch.setenv("EMBEDDING_DIMENSION", "64")
+    monkeypatch.setenv("LOCAL_EMBEDDING_WORKERS", "0")
+    monkeypatch.delenv("EMBEDDING_RPM", raising=False)
+    monkeypatch.delenv("EMBEDDING_TPM", raising=False)
+    app = FastAPI()
+    setup_env(app)
+    setup_vector_store(app)
+    setup_content_store(app)
+    setup_embedder(app)
+    app.state.redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    setup_embedding_scheduler(app)
+    app.state.embedding_cache = EmbeddingCache(Cache(Cache.MEMORY), 0, None)
+    app.state.generations = GenerationCache(app.state.redis_client, 1)
+    yield app
+    app.state.vector_store.close()
+    app.state.content_store.close()
@@ -0,0 +1,18 @@
+from openai import AsyncOpenAI
+from embedding.local import HashingEmbeddingProvider
+from embedding.openai_provider import OpenAIEmbeddingProvider
+
+
+def test_identity_includes_configurable_dimension() -> None:
+    client = AsyncOpenAI(api_key="test")
+    small = OpenAIEmbeddingProvider(client, "text-embedding-3-small", 512)
+    large = OpenAIEmbeddingProvider(client, "text-embedding-3-small", 1536)
+    assert small.identity != large.identity
+    assert small.model == large.model == "text-embedding-3-small"
+
+
+def test_identity_of_fixed_size_models_is_the_model() -> None:
+    client = AsyncOpenAI(api_key="test")
+    provider = OpenAIEmbeddingProvider(client, "text-embedding-ada-002", 1536)
+    assert provider.identity == "text-embedding-ada-002"
+    assert HashingEmbeddingProvider(64, 0).identity == "local-hashing-64"
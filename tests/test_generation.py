@@ -0,0 +1,61 @@
+import asyncio
+import fakeredis.aioredis
+import pytest
+from typing import Any, List
+from caching.generation import GenerationCache, bump_generation
+
+
+def count_reads(
+    monkeypatch: pytest.MonkeyPatch, redis_client: fakeredis.aioredis.FakeRedis
+) -> List[str]:
+    reads: List[str] = []
+    get = redis_client.get
+
+    async def counted_get(key: str) -> Any:
+        reads.append(key)
+        return await get(key)
+
+    monkeypatch.setattr(redis_client, "get", counted_get)
+    return reads
+
+
+def test_generation_is_reused_until_it_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def main() -> None:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        reads = count_reads(monkeypatch, redis_client)
+        generations = GenerationCache(redis_client, 0.05)
+        assert await generations.get("alice") == 0
+        # Bumped by another worker: not seen until the cached value expires
+        await bump_generation(redis_client, "alice")
+        assert await generations.get("alice") == 0
+        assert len(reads) == 1
+        await asyncio.sleep(0.06)
+        assert await generations.get("alice") == 1
+        assert len(reads) == 2
+
+    asyncio.run(main())
+
+
+def test_own_bump_is_seen_at_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def main() -> None:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        reads = count_reads(monkeypatch, redis_client)
+        generations = GenerationCache(redis_client, 60)
+        assert await generations.get("alice") == 0
+        assert await generations.bump("alice") == 1
+        assert await generations.get("alice") == 1
+        assert len(reads) == 1
+
+    asyncio.run(main())
+
+
+def test_zero_ttl_reads_redis_every_time(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def main() -> None:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        reads = count_reads(monkeypatch, redis_client)
+        generations = GenerationCache(redis_client, 0)
+        await generations.get("alice")
+        await generations.get("alice")
+        assert len(reads) == 2
+
+    asyncio.run(main())
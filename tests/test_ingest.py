@@ -0,0 +1,107 @@
+import asyncio
+from fastapi import FastAPI
+from typing import Any, AsyncIterator, Dict, List, Set
+from ocr.ingest import ingest_pages
+from ocr.manifest import load_manifest
+from ocr.models import IngestionStats
+
+
+async def iter_pages(texts: Dict[int, str]) -> AsyncIterator[Dict[str, Any]]:
+    for page_number, text in texts.items():
+        yield {"pageNumber": page_number, "words": [{"content": text}]}
+
+
+def ingest(app: FastAPI, texts: Dict[int, str], max_pages: int = 0) -> IngestionStats:
+    return asyncio.run(
+        ingest_pages(
+            iter_pages(texts),
+            app.state.vector_store,
+            app,
+            "doc",
+            namespace="alice",
+            max_pages=max_pages,
+        )
+    )
+
+
+def stored_pages(app: FastAPI) -> Set[int]:
+    matches: List[Dict[str, Any]] = asyncio.run(
+        app.state.vector_store.query(
+            [1.0] * 64, top_k=10, namespace="alice", filter={"document_id": "doc"}
+        )
+    )
+    return {match["metadata"]["page_number"] for match in matches}
+
+
+def manifest_pages(app: FastAPI) -> Set[int]:
+    manifest = asyncio.run(
+        load_manifest(
+            app.state.redis_client, app.state.manifest_scope, "alice", "doc"
+        )
+    )
+    return set(manifest)
+
+
+PAGES = {1: "invoice total due", 2: "payment terms net", 3: "shipping address"}
+
+
+def test_unchanged_pages_are_skipped(app: FastAPI) -> None:
+    first = ingest(app, PAGES)
+    assert (first.added_pages, first.skipped_pages) == (3, 0)
+
+    second = ingest(app, PAGES)
+    assert (second.added_pages, second.updated_pages, second.skipped_pages) == (
+        0,
+        0,
+        3,
+    )
+    assert second.upsert_requests == 0
+    assert stored_pages(app) == {1, 2, 3}
+
+
+def test_changed_pages_are_updated_and_missing_pages_deleted(app: FastAPI) -> None:
+    ingest(app, PAGES)
+
+    stats = ingest(app, {1: PAGES[1], 2: "payment terms changed"})
+    assert stats.updated_pages == 1
+    assert stats.skipped_pages == 1
+    assert stats.deleted_pages == 1
+    assert stored_pages(app) == {1, 2}
+    assert manifest_pages(app) == {1, 2}
+
+
+def test_truncated_document_keeps_pages_past_the_cap(app: FastAPI) -> None:
+    ingest(app, PAGES)
+
+    stats = ingest(app, PAGES, max_pages=2)
+    assert stats.skipped_pages == 2
+    assert stats.deleted_pages == 0
+    assert stored_pages(app) == {1, 2, 3}
+    assert manifest_pages(app) == {1, 2, 3}
+
+
+def test_document_of_exactly_the_cap_deletes_missing_pages(app: FastAPI) -> None:
+    ingest(app, PAGES)
+
+    stats = ingest(app, {1: PAGES[1], 2: PAGES[2]}, max_pages=2)
+    assert stats.deleted_pages == 1
+    assert stored_pages(app) == {1, 2}
+
+
+def test_manifest_is_scoped_to_the_vector_store(app: FastAPI) -> None:
+    ingest(app, PAGES)
+
+    # A new index has none of the pages, so none of them may be skipped
+    app.state.manifest_scope = "local:/elsewhere:1"
+    stats = ingest(app, PAGES)
+    assert (stats.added_pages, stats.skipped_pages) == (3, 0)
+
+
+def test_empty_pages_are_not_embedded(app: FastAPI) -> None:
+    ingest(app, PAGES)
+
+    stats = ingest(app, {1: PAGES[1], 2: "  ", 3: "shipping address changed"})
+    assert stats.empty_pages == 1
+    assert stats.updated_pages == 1
+    assert stats.deleted_pages == 1
+    assert stored_pages(app) == {1, 3}
@@ -0,0 +1,55 @@
+import asyncio
+import pytest
+from pathlib import Path
+from typing import Any
+from vectorstore.local import LocalVectorStore
+
+
+def test_second_process_cannot_open_store(tmp_path: Path) -> None:
+    store = LocalVectorStore(str(tmp_path), 4)
+    with pytest.raises(RuntimeError):
+        LocalVectorStore(str(tmp_path), 4)
+    store.close()
+    LocalVectorStore(str(tmp_path), 4).close()
+
+
+@pytest.mark.parametrize(
+    "namespace, vector_id, metadata",
+    [
+        ("bob", "job#1", {"document_id": "job"}),
+        ("alice", "other#1", {"document_id": "other"}),
+        ("alice", "doc#2", {"document_id": "doc"}),
+    ],
+)
+def test_search_skips_rows_reused_while_scoring(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    namespace: str,
+    vector_id: str,
+    metadata: Any,
+) -> None:
+    store = LocalVectorStore(str(tmp_path), 4)
+    asyncio.run(
+        store.upsert([("doc#1", [1.0, 0, 0, 0], {"document_id": "doc"})], "alice")
+    )
+    score = store._score
+
+    def score_and_reuse_row(*args: Any) -> Any:
+        # Scoring runs outside the lock: delete the scored row and hand it to
+        # another vector before the matches are resolved
+        scores = score(*args)
+        store._delete(["doc#1"], "alice")
+        store._upsert([(vector_id, [1.0, 0, 0, 0], metadata)], namespace)
+        return scores
+
+    monkeypatch.setattr(store, "_score", score_and_reuse_row)
+    matches = asyncio.run(
+        store.query(
+            [1.0, 0, 0, 0],
+            top_k=5,
+            namespace="alice",
+            filter={"document_id": {"$eq": "doc"}},
+        )
+    )
+    store.close()
+    assert matches == []
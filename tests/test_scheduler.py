@@ -0,0 +1,78 @@
+import asyncio
+import fakeredis.aioredis
+import pytest
+from fastapi import FastAPI
+from typing import Any, Dict, List
+from core.config import setup_env
+from embedding.scheduler import RateLimitScheduler
+
+
+def make_scheduler(
+    redis_client: Any, requests_per_minute: int, tokens_per_minute: int
+) -> RateLimitScheduler:
+    return RateLimitScheduler(
+        redis_client,
+        "embeddings:test",
+        requests_per_minute=requests_per_minute,
+        tokens_per_minute=tokens_per_minute,
+        bulk_reserve=0.5,
+        max_retries=0,
+        base_delay=0.0,
+        max_delay=0.0,
+    )
+
+
+@pytest.mark.parametrize(
+    "provider, limits", [("local", (0, 0)), ("openai", (3000, 1000000))]
+)
+def test_limits_default_by_provider(
+    monkeypatch: pytest.MonkeyPatch, provider: str, limits: Any
+) -> None:
+    monkeypatch.setenv("EMBEDDING_PROVIDER", provider)
+    monkeypatch.delenv("EMBEDDING_RPM", raising=False)
+    monkeypatch.delenv("EMBEDDING_TPM", raising=False)
+    app = FastAPI()
+    setup_env(app)
+    assert (app.state.embedding_rpm, app.state.embedding_tpm) == limits
+
+
+def test_unlimited_scheduler_never_calls_redis(app: FastAPI) -> None:
+    scheduler = app.state.embedding_scheduler
+    calls: List[Any] = []
+
+    async def counted_eval(*args: Any) -> int:
+        calls.append(args)
+        return 0
+
+    scheduler.redis_client.eval = counted_eval
+    asyncio.run(scheduler.acquire(100000, "bulk"))
+    assert calls == []
+    assert scheduler.stats() == {"throttled": 0, "retries": 0}
+
+
+def test_calls_take_their_tokens_from_the_buckets() -> None:
+    async def main() -> Dict[str, float]:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        # 1 token and 0.01 requests per ms; buckets of 10000 tokens, 100 calls
+        scheduler = make_scheduler(redis_client, 600, 60000)
+        await scheduler.acquire(6000)
+        await scheduler.acquire(1000)
+        state = await redis_client.hgetall(scheduler.key)  # type: ignore[misc]
+        return {name: float(value) for name, value in state.items()}
+
+    state = asyncio.run(main())
+    assert 3000 <= state["tokens"] < 3100
+    assert 98 <= state["requests"] < 99
+
+
+def test_bulk_calls_leave_the_reserve_and_wait() -> None:
+    async def main() -> Dict[str, int]:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        scheduler = make_scheduler(redis_client, 600, 60000)
+        # Half of the 10000 token bucket is reserved for interactive calls
+        await scheduler.acquire(4950, "bulk")
+        assert scheduler.stats()["throttled"] == 0
+        await scheduler.acquire(100, "bulk")
+        return scheduler.stats()
+
+    assert asyncio.run(main())["throttled"] >= 1
@@ -0,0 +1,65 @@
+import asyncio
+import numpy as np
+import pytest
+from aiocache import Cache
+from typing import List, Optional
+from caching.embeddings import EmbeddingCache
+from caching.serializers import (
+    BinarySerializer,
+    decode_vector,
+    encode_vector,
+    is_exact_vector,
+)
+
+VECTOR = [0.5, -0.25, 0.125, 0.9, -1.0, 0.0, 0.333]
+
+
+def test_float32_round_trip_is_exact() -> None:
+    data = encode_vector(VECTOR)
+    assert is_exact_vector(data)
+    assert len(data) == 1 + 4 * len(VECTOR)
+    assert decode_vector(data) == np.asarray(VECTOR, dtype=np.float32).tolist()
+
+
+@pytest.mark.parametrize(
+    "quantization, size, tolerance",
+    [("float16", 2 * len(VECTOR), 1e-3), ("int8", 4 + len(VECTOR), 1 / 127)],
+)
+def test_quantized_round_trip_is_close(
+    quantization: str, size: int, tolerance: float
+) -> None:
+    data = encode_vector(VECTOR, quantization)
+    assert not is_exact_vector(data)
+    assert len(data) == 1 + size
+    assert np.allclose(decode_vector(data), VECTOR, atol=tolerance)
+
+
+def test_int8_round_trip_of_zero_vector() -> None:
+    assert decode_vector(encode_vector([0.0, 0.0], "int8")) == [0.0, 0.0]
+
+
+def test_binary_serializer_round_trips_arrays() -> None:
+    serializer = BinarySerializer()
+    matrix = np.arange(6, dtype=np.float32).reshape(2, 3)
+    loaded = serializer.loads(serializer.dumps({"ids": ["a", "b"], "matrix": matrix}))
+    assert loaded["ids"] == ["a", "b"]
+    assert loaded["matrix"].dtype == np.float32
+    assert np.array_equal(loaded["matrix"], matrix)
+    assert serializer.loads(serializer.dumps(None)) is None
+
+
+def test_exact_lookups_skip_quantized_entries() -> None:
+    async def main() -> List[List[Optional[List[float]]]]:
+        cache = EmbeddingCache(Cache(Cache.MEMORY), 0, None, quantization="int8")
+        await cache.set_many(["query"], [VECTOR], "model")
+        await cache.set_many(["page"], [VECTOR], "model", exact=True)
+        texts = ["query", "page"]
+        return [
+            await cache.get_many(texts, "model"),
+            await cache.get_many(texts, "model", exact=True),
+        ]
+
+    lossy, exact = asyncio.run(main())
+    assert lossy[0] is not None and np.allclose(lossy[0], VECTOR, atol=1 / 127)
+    assert lossy[1] == np.asarray(VECTOR, dtype=np.float32).tolist()
+    assert exact == [None, lossy[1]]
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from typing import Any, Dict, List
+from caching.singleflight import SingleFlight
+
+
+class Leases:
+    """Holds leases in memory in place of Redis."""
+
+    def __init__(self) -> None:
+        self.values: Dict[str, str] = {}
+
+    async def set(self, key: str, value: str, nx: bool, px: int) -> bool:
+        if nx and key in self.values:
+            return False
+        self.values[key] = value
+        return True
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.values)
+
+    async def eval(self, script: str, keys: int, key: str, token: str) -> int:
+        if self.values.get(key) != token:
+            return 0
+        del self.values[key]
+        return 1
+
+
+def make_flight() -> SingleFlight:
+    return SingleFlight(Leases(), 5, 5, 0.01)  # type: ignore[arg-type]
+
+
+async def missing() -> Any:
+    return None
+
+
+def test_followers_take_over_when_leader_is_cancelled() -> None:
+    async def main() -> List[Any]:
+        flight = make_flight()
+        calls = 0
+        started = asyncio.Event()
+
+        async def compute() -> Any:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                started.set()
+                await asyncio.sleep(10)
+            await asyncio.sleep(0.01)
+            return calls
+
+        leader = asyncio.create_task(flight.run("key", compute, missing))
+        await started.wait()
+        followers = [
+            asyncio.create_task(flight.run("key", compute, missing))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    # One follower recomputes and the others share its result
+    assert asyncio.run(main()) == [2, 2, 2]
+
+
+def test_followers_share_leader_exception() -> None:
+    async def main() -> List[Any]:
+        flight = make_flight()
+        started = asyncio.Event()
+
+        async def compute() -> Any:
+            started.set()
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+
+        leader = asyncio.create_task(flight.run("key", compute, missing))
+        await started.wait()
+        follower = asyncio.create_task(flight.run("key", compute, missing))
+        return list(await asyncio.gather(leader, follower, return_exceptions=True))
+
+    results = asyncio.run(main())
+    assert [type(result) for result in results] == [ValueError, ValueError]
+
+
+def test_cancelled_follower_leaves_leader_running() -> None:
+    async def main() -> Any:
+        flight = make_flight()
+        started = asyncio.Event()
+
+        async def compute() -> Any:
+            started.set()
+            await asyncio.sleep(0.01)
+            return "value"
+
+        leader = asyncio.create_task(flight.run("key", compute, missing))
+        await started.wait()
+        follower = asyncio.create_task(flight.run("key", compute, missing))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == "value"
@@ -0,0 +1,84 @@
+import asyncio
+import time
+import pytest
+from datetime import timedelta
+from jose import JWTError
+from types import SimpleNamespace
+from typing import List, Tuple
+from auth import tokens
+from auth.tokens import JWKSCache, TokenVerifier
+from auth.utils import create_access_token
+
+SECRET_KEY = "test-secret"
+
+
+def make_verifier(cognito: bool, cache_size: int = 10) -> TokenVerifier:
+    jwks = JWKSCache("https://cognito.invalid/jwks.json", 3600) if cognito else None
+    return TokenVerifier(
+        jwks, "https://cognito.invalid", "client", SECRET_KEY, cache_size
+    )
+
+
+def count_decodes(
+    monkeypatch: pytest.MonkeyPatch, verifier: TokenVerifier
+) -> List[str]:
+    decoded: List[str] = []
+    decode = verifier._decode
+
+    async def counted_decode(token: str) -> Tuple[str, float]:
+        decoded.append(token)
+        return await decode(token)
+
+    monkeypatch.setattr(verifier, "_decode", counted_decode)
+    return decoded
+
+
+def test_hs256_tokens_are_rejected_under_cognito() -> None:
+    token = create_access_token({"sub": "alice"}, SECRET_KEY)
+    with pytest.raises(JWTError):
+        asyncio.run(make_verifier(cognito=True).verify(token))
+
+
+def test_hs256_tokens_are_verified_without_cognito() -> None:
+    token = create_access_token({"sub": "alice"}, SECRET_KEY)
+    assert asyncio.run(make_verifier(cognito=False).verify(token)) == "alice"
+    forged = create_access_token({"sub": "alice"}, "another-secret")
+    with pytest.raises(JWTError):
+        asyncio.run(make_verifier(cognito=False).verify(forged))
+
+
+def test_cached_token_is_decoded_again_after_it_expires(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    verifier = make_verifier(cognito=False)
+    decoded = count_decodes(monkeypatch, verifier)
+    token = create_access_token({"sub": "alice"}, SECRET_KEY, timedelta(minutes=1))
+
+    async def main() -> None:
+        assert await verifier.verify(token) == "alice"
+        assert await verifier.verify(token) == "alice"
+        assert len(decoded) == 1
+        # Past the token's exp, the cached entry is dropped and checked anew
+        later = time.time() + 120
+        monkeypatch.setattr(tokens, "time", SimpleNamespace(time=lambda: later))
+        assert await verifier.verify(token) == "alice"
+        assert len(decoded) == 2
+
+    asyncio.run(main())
+
+
+def test_cache_evicts_least_recently_used_tokens(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    verifier = make_verifier(cognito=False, cache_size=2)
+    decoded = count_decodes(monkeypatch, verifier)
+    first, second, third = (
+        create_access_token({"sub": name}, SECRET_KEY) for name in ("a", "b", "c")
+    )
+
+    async def main() -> None:
+        for token in (first, second, first, third, first, second):
+            await verifier.verify(token)
+
+    asyncio.run(main())
+    assert decoded == [first, second, third, second]
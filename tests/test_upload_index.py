@@ -0,0 +1,84 @@
+import asyncio
+import fakeredis.aioredis
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from files.index import UploadIndex
+
+
+class Paginator:
+    """Lists fixed pages of object keys, running a callback between pages."""
+
+    def __init__(
+        self,
+        pages: List[List[str]],
+        between: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> None:
+        self.pages = pages
+        self.between = between
+
+    async def paginate(self, Bucket: str, Prefix: str) -> AsyncIterator[Any]:
+        for number, page in enumerate(self.pages):
+            if number and self.between is not None:
+                await self.between()
+            yield {"Contents": [{"Key": key} for key in page if key.startswith(Prefix)]}
+
+
+class S3:
+    def __init__(self, paginator: Paginator) -> None:
+        self.paginator = paginator
+
+    def get_paginator(self, operation: str) -> Paginator:
+        return self.paginator
+
+
+def test_reconcile_keeps_keys_added_while_listing() -> None:
+    async def main() -> Dict[str, Any]:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        index = UploadIndex(redis_client)
+
+        async def upload() -> None:
+            await index.add_many(["new/c.pdf"])
+
+        s3 = S3(Paginator([["a/a.pdf"], ["b/b.pdf"]], upload))
+        count = await index.reconcile(s3)
+        indexed = await redis_client.smembers(index.key)  # type: ignore[misc]
+        return {
+            "count": count,
+            "members": indexed,
+            "keys": await redis_client.keys("*"),
+        }
+
+    result = asyncio.run(main())
+    assert result["count"] == 2
+    assert result["members"] == {"a/a.pdf", "b/b.pdf", "new/c.pdf"}
+    # The staging set, journal and marker are gone
+    assert result["keys"] == ["s3:uploaded:tek-file-bucket"]
+
+
+def test_reconcile_drops_keys_no_longer_listed() -> None:
+    async def main() -> Any:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        index = UploadIndex(redis_client)
+        await index.add_many(["gone/x.pdf"])
+        assert await index.contains_many(None, ["gone/x.pdf"]) == [True]
+        await index.reconcile(S3(Paginator([["a/a.pdf"]])))
+        return await index.contains_many(None, ["gone/x.pdf", "a/a.pdf"])
+
+    assert asyncio.run(main()) == [False, True]
+
+
+def test_prefixes_have_separate_indexes() -> None:
+    async def main() -> Any:
+        redis_client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        whole = UploadIndex(redis_client)
+        await whole.add_many(["a/a.pdf", "b/b.pdf"])
+        index = UploadIndex(redis_client, prefix="a")
+        await index.add_many(["a/new.pdf", "b/new.pdf"])
+        await index.reconcile(S3(Paginator([["a/a.pdf", "b/b.pdf"]])))
+        return (
+            await redis_client.smembers(whole.key),  # type: ignore[misc]
+            await redis_client.smembers(index.key),  # type: ignore[misc]
+        )
+
+    whole, prefixed = asyncio.run(main())
+    assert whole == {"a/a.pdf", "b/b.pdf"}
+    assert prefixed == {"a/a.pdf"}
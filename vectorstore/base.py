@@ -0,0 +1,99 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+Vector = Tuple[str, List[float], Dict[str, Any]]
+Match = Dict[str, Any]
+
+
+class VectorStore(ABC):
+    """
+    Interface of the vector stores used for OCR page retrieval.
+
+    Vectors are ``(id, embedding, metadata)`` tuples. Query matches are
+    dictionaries with ``id``, ``score`` and ``metadata`` keys, ordered by
+    descending dot-product score.
+    """
+
+    @abstractmethod
+    async def upsert(self, vectors: Sequence[Vector], namespace: str = "") -> None:
+        """
+        Insert vectors, replacing any existing vectors with the same IDs.
+
+        Args:
+            vectors (Sequence[tuple]): The ``(id, embedding, metadata)`` vectors.
+            namespace (str): The namespace to write to.
+        """
+
+    @abstractmethod
+    async def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> List[Match]:
+        """
+        Return the stored vectors with the highest dot product to a vector.
+
+        Args:
+            vector (Sequence[float]): The query embedding.
+            top_k (int): The maximum number of matches to return.
+            namespace (str): The namespace to search.
+            filter (Optional[dict]): Metadata equality filter, in Pinecone
+                syntax (``{"field": value}``, ``{"field": {"$eq": value}}`` or
+                ``{"field": {"$in": [values]}}``).
+            include_metadata (bool): Whether to return each match's metadata.
+
+        Returns:
+            list: The matches, best first.
+        """
+
+    async def query_many(
+        self,
+        vectors: Sequence[Sequence[float]],
+        top_k: int,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> List[List[Match]]:
+        """
+        Run several queries with the same parameters.
+
+        The default implementation issues the queries concurrently; stores
+        that can search many vectors at once override it.
+
+        Args:
+            vectors (Sequence[Sequence[float]]): The query embeddings.
+            top_k (int): The maximum number of matches per query.
+            namespace (str): The namespace to search.
+            filter (Optional[dict]): Metadata equality filter.
+            include_metadata (bool): Whether to return each match's metadata.
+
+        Returns:
+            list: The matches of each query, in query order.
+        """
+        return list(
+            await asyncio.gather(
+                *(
+                    self.query(vector, top_k, namespace, filter, include_metadata)
+                    for vector in vectors
+                )
+            )
+        )
+
+    @abstractmethod
+    async def delete(self, ids: Sequence[str], namespace: str = "") -> None:
+        """
+        Delete vectors by ID. Unknown IDs are ignored.
+
+        Args:
+            ids (Sequence[str]): The IDs of the vectors to delete.
+            namespace (str): The namespace to delete from.
+        """
+
+    def close(self) -> None:
+        """
+        Release the resources held by the store.
+        """
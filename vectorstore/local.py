@@ -0,0 +1,382 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import numpy as np
+from numpy.typing import NDArray
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from vectorstore.base import Match, Vector, VectorStore
+
+DTYPES: Dict[str, "np.dtype[Any]"] = {
+    "float32": np.dtype("<f4"),
+    "float16": np.dtype("<f2"),
+}
+
+# Rows scored per matmul, bounding the float32 copies made for float16 storage
+SCORE_BLOCK_ROWS = 8192
+
+
+def _matches(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """
+    Whether metadata satisfies a filter in the syntax of ``_candidates``.
+
+    Args:
+        metadata (dict): The metadata of a row.
+        filter (Optional[dict]): The metadata equality filter.
+
+    Returns:
+        bool: True if every condition of the filter holds.
+    """
+    for field, condition in (filter or {}).items():
+        value = metadata.get(field)
+        if isinstance(condition, dict):
+            if "$in" in condition:
+                if value not in condition["$in"]:
+                    return False
+            elif value != condition.get("$eq"):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def _indexable(value: Any) -> bool:
+    """
+    Whether a metadata value is small enough to be indexed for filtering.
+
+    Args:
+        value: The metadata value.
+
+    Returns:
+        bool: True for booleans, numbers and strings of up to 256 characters.
+    """
+    if isinstance(value, str):
+        return len(value) <= 256
+    return isinstance(value, (bool, int, float))
+
+
+class LocalVectorStore(VectorStore):
+    """
+    In-process vector store with exact dot-product search.
+
+    Embeddings are rows of a memory-mapped float32 (or float16) matrix in
+    ``vectors.bin``. IDs, namespaces and metadata form a side table kept in
+    memory and persisted as an append-only log, ``records.jsonl``, which is
+    replayed on open. Deleted rows are reused by later inserts.
+
+    Queries score all candidate rows with blocked matrix products (one pass
+    for a whole batch of queries) and select the top k with ``argpartition``.
+    Namespace and metadata filters narrow the candidates through posting sets
+    before any scoring happens.
+
+    The store supports a single process: row allocation and the side table
+    live in memory, so two processes writing the same files would hand the
+    same rows to different vectors. Opening takes an exclusive lock on the
+    directory, and a second process opening it fails instead.
+
+    Attributes:
+        path (str): The directory holding the store's files.
+        dimension (int): The embedding dimension.
+        dtype (np.dtype): The on-disk element type.
+    """
+
+    def __init__(self, path: str, dimension: int, dtype: str = "float32") -> None:
+        self.path = path
+        self.dimension = dimension
+        self.dtype = DTYPES[dtype]
+        self._lock = threading.Lock()
+        self._matrix_path = os.path.join(path, "vectors.bin")
+        self._records_path = os.path.join(path, "records.jsonl")
+
+        self._count = 0
+        self._keys: List[Optional[Tuple[str, str]]] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self._free: List[int] = []
+        self._namespaces: Dict[str, Set[int]] = {}
+        self._postings: Dict[Tuple[str, Any], Set[int]] = {}
+
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, "lock"), "w")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock_file.close()
+            raise RuntimeError(
+                f"The local vector store at {path} is open in another process; "
+                "it can only be used by one process"
+            )
+        if not os.path.exists(self._matrix_path):
+            open(self._matrix_path, "wb").close()
+        self._capacity = os.path.getsize(self._matrix_path) // self._row_bytes
+        self._matrix = self._map(self._capacity)
+        self._live: NDArray[np.bool_] = np.zeros(self._capacity, dtype=bool)
+        self._load()
+        self._records = open(self._records_path, "a", encoding="utf-8")
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dimension * self.dtype.itemsize
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def _map(self, capacity: int) -> "Optional[np.memmap[Any, np.dtype[Any]]]":
+        if capacity == 0:
+            return None
+        matrix: "np.memmap[Any, np.dtype[Any]]" = np.memmap(
+            self._matrix_path,
+            dtype=self.dtype,
+            mode="r+",
+            shape=(capacity, self.dimension),
+        )
+        return matrix
+
+    def _ensure_capacity(self, rows: int) -> None:
+        if rows <= self._capacity:
+            return
+        capacity = max(rows, 2 * self._capacity, 1024)
+        with open(self._matrix_path, "r+b") as f:
+            f.truncate(capacity * self._row_bytes)
+        self._matrix = self._map(capacity)
+        self._capacity = capacity
+        live = np.zeros(capacity, dtype=bool)
+        live[: len(self._live)] = self._live
+        self._live = live
+
+    def _load(self) -> None:
+        if not os.path.exists(self._records_path):
+            return
+        with open(self._records_path, encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                key = (record["ns"], record["id"])
+                if record["op"] == "put":
+                    self._put_record(key, record["row"], record["metadata"])
+                else:
+                    self._delete_record(key)
+        self._free = sorted(
+            (row for row in range(self._count) if self._keys[row] is None),
+            reverse=True,
+        )
+
+    def _put_record(
+        self, key: Tuple[str, str], row: int, metadata: Dict[str, Any]
+    ) -> None:
+        self._delete_record(key)
+        while len(self._keys) <= row:
+            self._keys.append(None)
+            self._metadata.append({})
+        self._ensure_capacity(row + 1)
+        self._count = max(self._count, row + 1)
+        self._keys[row] = key
+        self._metadata[row] = metadata
+        self._rows[key] = row
+        self._live[row] = True
+        self._namespaces.setdefault(key[0], set()).add(row)
+        for field, value in metadata.items():
+            if _indexable(value):
+                self._postings.setdefault((field, value), set()).add(row)
+
+    def _delete_record(self, key: Tuple[str, str]) -> Optional[int]:
+        row = self._rows.pop(key, None)
+        if row is None:
+            return None
+        self._keys[row] = None
+        self._live[row] = False
+        self._namespaces[key[0]].discard(row)
+        for field, value in self._metadata[row].items():
+            if _indexable(value):
+                self._postings.get((field, value), set()).discard(row)
+        self._metadata[row] = {}
+        return row
+
+    def _upsert(self, vectors: Sequence[Vector], namespace: str) -> None:
+        with self._lock:
+            lines = []
+            for vector_id, embedding, metadata in vectors:
+                key = (namespace, vector_id)
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._free.pop() if self._free else self._count
+                self._put_record(key, row, dict(metadata))
+                assert self._matrix is not None
+                self._matrix[row] = np.asarray(embedding, dtype=np.float32)
+                record = {
+                    "op": "put",
+                    "ns": namespace,
+                    "id": vector_id,
+                    "row": row,
+                    "metadata": metadata,
+                }
+                lines.append(json.dumps(record))
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._append_records(lines)
+
+    def _delete(self, ids: Sequence[str], namespace: str) -> None:
+        with self._lock:
+            lines = []
+            for vector_id in ids:
+                row = self._delete_record((namespace, vector_id))
+                if row is None:
+                    continue
+                self._free.append(row)
+                record = {"op": "del", "ns": namespace, "id": vector_id}
+                lines.append(json.dumps(record))
+            self._append_records(lines)
+
+    def _append_records(self, lines: List[str]) -> None:
+        if lines:
+            self._records.write("\n".join(lines) + "\n")
+            self._records.flush()
+
+    def _candidates(
+        self, namespace: str, filter: Optional[Dict[str, Any]]
+    ) -> Optional[Set[int]]:
+        """
+        Return the rows matching a namespace and filter.
+
+        Returns None when every live row matches, so the caller can scan the
+        matrix without gathering rows.
+        """
+        rows = self._namespaces.get(namespace, set())
+        if not filter and len(rows) == len(self._rows):
+            return None
+        candidates = set(rows)
+        for field, condition in (filter or {}).items():
+            if isinstance(condition, dict):
+                if set(condition) == {"$eq"}:
+                    values = [condition["$eq"]]
+                elif set(condition) == {"$in"}:
+                    values = list(condition["$in"])
+                else:
+                    raise ValueError(f"Unsupported filter on {field}: {condition}")
+            else:
+                values = [condition]
+            matching: Set[int] = set()
+            for value in values:
+                matching |= self._postings.get((field, value), set())
+            candidates &= matching
+        return candidates
+
+    def _score(
+        self,
+        matrix: NDArray[Any],
+        rows: Optional[NDArray[np.int64]],
+        count: int,
+        queries: NDArray[np.float32],
+    ) -> NDArray[np.float32]:
+        total = count if rows is None else len(rows)
+        scores = np.empty((total, queries.shape[1]), dtype=np.float32)
+        for start in range(0, total, SCORE_BLOCK_ROWS):
+            stop = min(start + SCORE_BLOCK_ROWS, total)
+            block = matrix[start:stop] if rows is None else matrix[rows[start:stop]]
+            scores[start:stop] = block.astype(np.float32, copy=False) @ queries
+        return scores
+
+    def _top_k(
+        self, scores: NDArray[np.float32], rows: NDArray[np.int64], top_k: int
+    ) -> List[Tuple[int, float]]:
+        k = min(top_k, len(scores))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            (int(rows[i]), float(scores[i]))
+            for i in best
+            if scores[i] != -np.inf
+        ]
+
+    def _search(
+        self,
+        queries: NDArray[np.float32],
+        top_k: int,
+        namespace: str,
+        filter: Optional[Dict[str, Any]],
+        include_metadata: bool,
+    ) -> List[List[Match]]:
+        with self._lock:
+            matrix, count = self._matrix, self._count
+            candidates = self._candidates(namespace, filter)
+            live = self._live[:count].copy()
+            keys = self._keys[:count]
+            if candidates is not None:
+                rows: Optional[NDArray[np.int64]] = np.fromiter(
+                    sorted(candidates), dtype=np.int64, count=len(candidates)
+                )
+            else:
+                rows = None
+
+        if matrix is None or count == 0 or (rows is not None and len(rows) == 0):
+            return [[] for _ in range(queries.shape[1])]
+
+        scores = self._score(matrix, rows, count, queries)
+        if rows is None:
+            scores[~live] = -np.inf
+            rows = np.arange(count, dtype=np.int64)
+
+        top = [
+            self._top_k(scores[:, column], rows, top_k)
+            for column in range(queries.shape[1])
+        ]
+        results = []
+        with self._lock:
+            for column_top in top:
+                matches = []
+                for row, score in column_top:
+                    # The row may have been deleted and reused for another
+                    # vector while it was scored outside the lock
+                    key = keys[row]
+                    if key is None or key != self._keys[row] or key[0] != namespace:
+                        continue
+                    if filter and not _matches(self._metadata[row], filter):
+                        continue
+                    metadata = self._metadata[row] if include_metadata else {}
+                    matches.append({"id": key[1], "score": score, "metadata": metadata})
+                results.append(matches)
+        return results
+
+    async def upsert(self, vectors: Sequence[Vector], namespace: str = "") -> None:
+        await asyncio.to_thread(self._upsert, vectors, namespace)
+
+    async def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> List[Match]:
+        queries = np.asarray(vector, dtype=np.float32).reshape(-1, 1)
+        results = await asyncio.to_thread(
+            self._search, queries, top_k, namespace, filter, include_metadata
+        )
+        return results[0]
+
+    async def query_many(
+        self,
+        vectors: Sequence[Sequence[float]],
+        top_k: int,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> List[List[Match]]:
+        if not vectors:
+            return []
+        queries = np.asarray(vectors, dtype=np.float32).T
+        return await asyncio.to_thread(
+            self._search, queries, top_k, namespace, filter, include_metadata
+        )
+
+    async def delete(self, ids: Sequence[str], namespace: str = "") -> None:
+        await asyncio.to_thread(self._delete, ids, namespace)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+            self._records.close()
+            self._lock_file.close()
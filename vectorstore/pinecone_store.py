@@ -0,0 +1,46 @@
+from typing import Any, Dict, List, Optional, Sequence
+from core.adapters import AsyncClientAdapter
+from vectorstore.base import Match, Vector, VectorStore
+
+
+class PineconeVectorStore(VectorStore):
+    """
+    Vector store backed by a remote Pinecone index.
+
+    Attributes:
+        index (AsyncClientAdapter): The async adapter around the Pinecone index.
+    """
+
+    def __init__(self, index: AsyncClientAdapter) -> None:
+        self.index = index
+
+    async def upsert(self, vectors: Sequence[Vector], namespace: str = "") -> None:
+        await self.index.upsert(vectors=list(vectors), namespace=namespace)
+
+    async def query(
+        self,
+        vector: Sequence[float],
+        top_k: int,
+        namespace: str = "",
+        filter: Optional[Dict[str, Any]] = None,
+        include_metadata: bool = True,
+    ) -> List[Match]:
+        response = await self.index.query(
+            vector=list(vector),
+            top_k=top_k,
+            namespace=namespace,
+            filter=filter,
+            include_metadata=include_metadata,
+        )
+        return [
+            {
+                "id": match["id"],
+                "score": match["score"],
+                "metadata": match.get("metadata") or {},
+            }
+            for match in response["matches"]
+        ]
+
+    async def delete(self, ids: Sequence[str], namespace: str = "") -> None:
+        if ids:
+            await self.index.delete(ids=list(ids), namespace=namespace)